@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Read-only HTTP/JSON API for the Glyco Interactome data.
+
+Serves the pairs, phenotype values, interactome queries, subnetworks and
+pair figures to scripts and pipelines without a Streamlit session per
+client. The handlers use the same cached data layer as the app
+(``load_quant_data``, ``load_interactome``, ``load_protein_index``), so
+data is loaded once per process and reloaded when its files change.
+
+Data loads (which reload changed files), figure rendering, GraphML
+serialization and exports run in the thread pool so they never block other
+requests; lookups on the loaded data answer directly on the event loop.
+
+Endpoints (all ``GET``):
+
+- ``/api/conditions``: subnetwork conditions, phenotypes and DataS4 flags
+- ``/api/proteins``: proteins with their bait flag and degree
+- ``/api/proteins/{protein}/neighbors?condition=HM_Up``: interaction partners
+- ``/api/pairs?protein=CD44&bait=CD44``: quantified pairs
+- ``/api/pairs/{pair}``: replicate values, TopS scores, conditions and figure URLs
+- ``/api/search?q=lamp&limit=20``: protein search by name or UniProt ID
+  (``limit`` up to ``MAX_SEARCH_LIMIT``)
+- ``/api/subnetwork?bait=CD44&condition=HM_Up&condition=S_Down&format=graphml``:
+  filtered subnetwork as JSON (default) or GraphML
+- ``/api/figures/{figure_type}/{pair}.png?width=960``: rendered pair figure
+  (``width`` from ``MIN_FIGURE_WIDTH`` to ``MAX_FIGURE_WIDTH``)
+- ``/api/export?pair=BSG_LAMP1&network=HM_Enhanced``: streamed zip archive
+  (see ``export.py``); the app links to it when ``GLYCO_EXPORT_API_URL`` is set
+- ``/api/metrics``: request, data load and rendering timings of this server
+  as JSON (``?source=app`` for the snapshot written by the Streamlit app)
+- ``/metrics``: the same in the Prometheus text format
+
+Usage:
+    python api_server.py [--host 0.0.0.0] [--port 8503] [--workers 1]
+"""
+
+import sys
+import logging
+import argparse
+import os
+import json
+import functools
+import contextlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from config import FIGURE_TYPES
+from figure_engine import QuantData, load_quant_data, render_figure
+from interactome import Interactome, load_interactome
+from protein_search import load_protein_index
+from metrics import METRICS_PATH, page_context, record_bytes, render_prometheus, snapshot
+
+logger = logging.getLogger(__name__)
+
+# Smallest and largest figure width served (pixels); below about 32 px the
+# font rasterizer fails
+MIN_FIGURE_WIDTH = 64
+MAX_FIGURE_WIDTH = 2400
+
+# Default figure width (pixels)
+DEFAULT_FIGURE_WIDTH = 960
+
+# Default and largest number of search hits
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+
+def _values(array: np.ndarray) -> list:
+    """Convert an array to nested lists with NaN as None."""
+    return np.where(np.isnan(array), None, array).tolist()
+
+
+async def _quant_data() -> QuantData:
+    """Return the quant data or fail with 503."""
+    data = await run_in_threadpool(load_quant_data)
+    if data is None:
+        raise HTTPException(503, "Quant data is not available")
+    return data
+
+
+async def _interactome() -> Interactome:
+    """Return the interactome or fail with 503."""
+    interactome = await run_in_threadpool(load_interactome)
+    if interactome is None:
+        raise HTTPException(503, "Interactome is not available")
+    return interactome
+
+
+def _int_param(request: Request, name: str, default: int, minimum: int, maximum: int) -> int:
+    """Return an integer query parameter in ``minimum..maximum``, or fail with 400."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise HTTPException(400, f"{name} must be between {minimum} and {maximum}")
+    return value
+
+
+def _conditions(request: Request, interactome: Interactome) -> Optional[List[str]]:
+    """Return the ``condition`` query parameters, validated, or None."""
+    conditions = request.query_params.getlist('condition')
+    if not conditions:
+        return None
+    try:
+        interactome.condition_mask(conditions)
+    except KeyError as e:
+        raise HTTPException(400, str(e).strip("'"))
+    return conditions
+
+
+def _pair_conditions(interactome: Optional[Interactome], bait: str, prey: str) -> List[str]:
+    """Return the conditions of a pair, or an empty list if it is not in the interactome."""
+    if interactome is None:
+        return []
+    edge = interactome.edge_id(bait, prey)
+    return interactome.edge_conditions(edge) if edge is not None else []
+
+
+def _figure_urls(request: Request, data: QuantData, pair: str) -> Dict[str, str]:
+    """Return the API URL of every figure available for a pair."""
+    has_tops = not np.isnan(data.tops[data.index[pair]]).all()
+    return {
+        figure_type: str(request.url_for('figure', figure_type=figure_type, pair=pair))
+        for figure_type in FIGURE_TYPES
+        if figure_type != 'tops_score' or has_tops
+    }
+
+
+async def conditions(request: Request) -> JSONResponse:
+    interactome = await _interactome()
+    return JSONResponse({
+        'conditions': interactome.conditions,
+        'phenotypes': interactome.phenotypes,
+        'flags': interactome.flags,
+    })
+
+
+async def proteins(request: Request) -> JSONResponse:
+    interactome = await _interactome()
+    degrees = np.diff(interactome.indptr).tolist()
+    return JSONResponse({'proteins': [
+        {'protein': protein, 'bait': bool(interactome.is_bait[i]), 'degree': degrees[i]}
+        for i, protein in enumerate(interactome.proteins)
+    ]})
+
+
+async def neighbors(request: Request) -> JSONResponse:
+    interactome = await _interactome()
+    protein = request.path_params['protein']
+    if protein not in interactome:
+        raise HTTPException(404, f"Unknown protein: {protein}")
+    selected = _conditions(request, interactome)
+    return JSONResponse({
+        'protein': protein,
+        'conditions': selected,
+        'neighbors': interactome.neighbors(protein, selected),
+    })
+
+
+async def pairs(request: Request) -> JSONResponse:
+    data = await _quant_data()
+    protein = request.query_params.get('protein')
+    bait = request.query_params.get('bait')
+    keep = np.ones(len(data.pairs), dtype=bool)
+    if protein:
+        keep &= (data.bait == protein) | (data.prey == protein)
+    if bait:
+        keep &= data.bait == bait
+    return JSONResponse({'pairs': [
+        {
+            'pair': data.pairs[row],
+            'bait': data.bait[row],
+            'prey': data.prey[row],
+            'bait_id': data.bait_id[row],
+            'prey_id': data.prey_id[row],
+        }
+        for row in np.flatnonzero(keep)
+    ]})
+
+
+async def pair(request: Request) -> JSONResponse:
+    data = await _quant_data()
+    name = request.path_params['pair']
+    if name not in data:
+        raise HTTPException(404, f"Unknown pair: {name}")
+    row = data.index[name]
+    interactome = await run_in_threadpool(load_interactome)
+    return JSONResponse({
+        'pair': name,
+        'bait': data.bait[row],
+        'prey': data.prey[row],
+        'bait_id': data.bait_id[row],
+        'prey_id': data.prey_id[row],
+        'phenotypes': data.phenotypes,
+        'normalized': _values(data.normalized[row]),
+        'relative': _values(data.relative[row]),
+        'tops': dict(zip(data.phenotypes, _values(data.tops[row]))),
+        'conditions': _pair_conditions(interactome, data.bait[row], data.prey[row]),
+        'figures': _figure_urls(request, data, name),
+    })
+
+
+async def search(request: Request) -> JSONResponse:
+    index = await run_in_threadpool(load_protein_index)
+    if index is None:
+        raise HTTPException(503, "Protein index is not available")
+    limit = _int_param(request, 'limit', DEFAULT_SEARCH_LIMIT, 1, MAX_SEARCH_LIMIT)
+    hits = index.search(request.query_params.get('q', ''), limit=limit)
+    return JSONResponse({'hits': [
+        {
+            'protein': hit.protein,
+            'uniprot_id': hit.uniprot_id,
+            'matched': hit.matched,
+            'fuzzy': hit.fuzzy,
+            'pairs': [
+                {'bait': bait, 'prey': prey, 'conditions': list(pair_conditions)}
+                for (bait, prey), pair_conditions in zip(hit.pairs, hit.conditions)
+            ],
+        }
+        for hit in hits
+    ]})
+
+
+async def subnetwork(request: Request) -> Response:
+    interactome = await _interactome()
+    params = request.query_params
+    selected = _conditions(request, interactome)
+    edges = interactome.select(
+        params.getlist('protein'), params.getlist('bait'), selected,
+        params.get('match_all', '').lower() in ('1', 'true', 'yes'),
+    )
+
+    if params.get('format', 'json') == 'graphml':
+        import networkx as nx
+        from subnetworks import build_subgraph
+
+        def write_graphml() -> str:
+            return '\n'.join(nx.generate_graphml(build_subgraph(interactome, edges)))
+
+        graphml = await run_in_threadpool(write_graphml)
+        return Response(graphml, media_type='application/xml')
+
+    pair_names = interactome.pairs(edges)
+    nodes = sorted({protein for pair_name in pair_names for protein in pair_name})
+    return JSONResponse({
+        'nodes': [
+            {'protein': protein, 'bait': bool(interactome.is_bait[interactome.index[protein]])}
+            for protein in nodes
+        ],
+        'edges': [
+            {'bait': bait, 'prey': prey, 'conditions': interactome.edge_conditions(edge)}
+            for edge, (bait, prey) in zip(edges.tolist(), pair_names)
+        ],
+    })
+
+
+async def figure(request: Request) -> Response:
+    figure_type = request.path_params['figure_type']
+    name = request.path_params['pair']
+    if figure_type not in FIGURE_TYPES:
+        raise HTTPException(404, f"Unknown figure type: {figure_type}")
+    width = _int_param(request, 'width', DEFAULT_FIGURE_WIDTH, MIN_FIGURE_WIDTH, MAX_FIGURE_WIDTH)
+
+    figure_bytes = await run_in_threadpool(render_figure, figure_type, name, width)
+    if figure_bytes is None:
+        raise HTTPException(404, f"No {figure_type} figure for {name}")
+    return Response(figure_bytes, media_type='image/png',
+                    headers={'Cache-Control': 'public, max-age=3600'})
+
+
+async def export(request: Request) -> StreamingResponse:
+    from export import ExportSelection, iter_export
+
+    params = request.query_params
+    selection = ExportSelection(
+        pairs=tuple(params.getlist('pair')),
+        networks=tuple(params.getlist('network')),
+        figures=params.get('figures', 'true').lower() not in ('0', 'false', 'no'),
+    )
+    if not selection.pairs and not selection.networks:
+        raise HTTPException(400, "Select at least one pair or network")
+    # A sync iterator is consumed in the thread pool by StreamingResponse
+    return StreamingResponse(
+        iter_export(selection), media_type='application/zip',
+        headers={'Content-Disposition': 'attachment; filename="glyco_export.zip"'},
+    )
+
+
+async def metrics_json(request: Request) -> JSONResponse:
+    if request.query_params.get('source') == 'app':
+        if not os.path.exists(METRICS_PATH):
+            raise HTTPException(404, f"No app metrics at {METRICS_PATH}")
+        with open(METRICS_PATH, 'r', encoding='utf-8') as metrics_file:
+            return JSONResponse(json.load(metrics_file))
+    return JSONResponse(snapshot())
+
+
+async def metrics_text(request: Request) -> Response:
+    return Response(render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+def instrumented(path: str, endpoint: Callable) -> Callable:
+    """Time an endpoint and count its response bytes under its route path."""
+    @functools.wraps(endpoint)
+    async def wrapper(request: Request) -> Response:
+        with page_context(path):
+            response = await endpoint(request)
+            if hasattr(response, 'body'):
+                record_bytes(response.media_type or 'unknown', len(response.body))
+            return response
+    return wrapper
+
+
+async def http_error(request: Request, exc: HTTPException) -> JSONResponse:
+    return JSONResponse({'error': exc.detail}, status_code=exc.status_code)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    """Load the shared data before accepting requests."""
+    await run_in_threadpool(load_quant_data)
+    await run_in_threadpool(load_interactome)
+    await run_in_threadpool(load_protein_index)
+    yield
+
+
+endpoints = {
+    '/api/conditions': conditions,
+    '/api/proteins': proteins,
+    '/api/proteins/{protein}/neighbors': neighbors,
+    '/api/pairs': pairs,
+    '/api/pairs/{pair}': pair,
+    '/api/search': search,
+    '/api/subnetwork': subnetwork,
+    '/api/figures/{figure_type}/{pair}.png': figure,
+    '/api/export': export,
+}
+routes = [
+    Route(path, instrumented(path, endpoint), name=endpoint.__name__)
+    for path, endpoint in endpoints.items()
+] + [
+    Route('/api/metrics', metrics_json),
+    Route('/metrics', metrics_text),
+]
+
+app = Starlette(routes=routes, exception_handlers={HTTPException: http_error}, lifespan=lifespan)
+
+
+def main() -> int:
+    """Run the API server."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the interactome data as a JSON API.")
+    parser.add_argument('--host', default='0.0.0.0', help="interface to bind")
+    parser.add_argument('--port', type=int, default=8503, help="port to listen on")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"🌐 Serving the Glyco Interactome API on http://{args.host}:{args.port}/api/")
+    uvicorn.run('api_server:app', host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Glyco Interactome Network
+
+Times the app's data and render paths on datasets scaled to 1x, 10x and
+100x the shipped 156 interactions:
+
+- catalog: network condition and protein pair scans, catalog build,
+  data fingerprint
+- tables: DataS3/DataS4 CSV parsing and Parquet store reads
+- data: quant data, interactome and protein index builds, differential
+  statistics, interactome queries
+- files: figure PNG and network HTML reads
+- render: pair figure, comparison heatmap and network page generation
+
+Scaled datasets are written to a temporary directory by tiling the shipped
+data: copy ``k`` renames every protein ``NAME-k`` (and its UniProt ID), so
+the tables, GraphML subnetworks and figure directories grow together while
+keeping their real structure. Figures are hard links to the shipped PNGs.
+With ``--synthetic``, datasets come from ``synthetic_data.py`` instead
+(4 baits per scale step, with prey shared across baits and no figures).
+
+Each benchmark runs until ``--min-time`` has passed (at least once, at most
+``MAX_ROUNDS`` times) with garbage collection disabled, and reports the
+best and median round. ``slope`` is the log-log growth from the smallest to
+the largest scale (1.0 = linear). Results can be saved and compared with a
+baseline to catch regressions before redeploying.
+
+Usage:
+    python benchmarks.py [--scales 1 10 100] [--filter catalog] [--min-time 0.5]
+                         [--save results.json] [--compare baseline.json] [--threshold 1.25]
+                         [--synthetic]
+"""
+
+import gc
+import io
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from config import DATA_PATHS, FIGURE_TYPES, GRAPHML_PATH
+
+# Dataset sizes as multiples of the shipped data
+BENCHMARK_SCALES = (1, 10, 100)
+
+# Default seconds spent per benchmark and scale
+MIN_TIME = 0.5
+
+# Rounds per benchmark and scale at most
+MAX_ROUNDS = 50
+
+# Slowdown (best round vs. baseline) reported as a regression
+REGRESSION_THRESHOLD = 1.25
+
+# Header rows of the tiled CSV tables
+_CSV_HEADER_LINES = {'quant_data': 2, 'clustering_data': 1}
+
+# DataS3 identifier columns renamed per copy (Pair is rebuilt from Bait/Prey)
+_RENAMED_COLUMNS = {'quant_data': (1, 2, 3, 4), 'clustering_data': (0, 1)}
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A timed operation; ``setup`` prepares it on a dataset and returns it."""
+    group: str
+    name: str
+    setup: Callable[[Dict[str, str]], Callable[[], object]]
+    max_scale: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}.{self.name}"
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(group: str, name: str, max_scale: Optional[int] = None):
+    """Register a benchmark setup function, skipped on datasets above ``max_scale``."""
+    def register(setup: Callable[[Dict[str, str]], Callable[[], object]]):
+        BENCHMARKS.append(Benchmark(group, name, setup, max_scale))
+        return setup
+    return register
+
+
+def _copy_name(name: str, copy: int) -> str:
+    """Return the name of a protein (or ID) in copy ``copy`` of the data."""
+    return name if copy == 0 or not name else f"{name}-{copy}"
+
+
+def _tile_table(source_path: str, output_path: str, table: str, scale: int) -> None:
+    """Write ``scale`` renamed copies of the rows of a CSV table."""
+    with open(source_path, 'r', encoding='utf-8-sig') as source_file:
+        lines = source_file.read().splitlines()
+    header_lines = _CSV_HEADER_LINES[table]
+    rows = [line.split(',') for line in lines[header_lines:] if line]
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        output_file.write('\n'.join(lines[:header_lines]) + '\n')
+        for copy in range(scale):
+            for row in rows:
+                row = list(row)
+                for column in _RENAMED_COLUMNS[table]:
+                    row[column] = _copy_name(row[column], copy)
+                if table == 'quant_data':
+                    row[0] = f"{row[1]}_{row[2]}"
+                output_file.write(','.join(row) + '\n')
+
+
+def _link(source_path: str, output_path: str) -> None:
+    """Hard-link a file, falling back to a copy across file systems."""
+    try:
+        os.link(source_path, output_path)
+    except OSError:
+        shutil.copyfile(source_path, output_path)
+
+
+def write_scaled_dataset(scale: int, root: str,
+                         data_paths: Dict[str, str] = DATA_PATHS) -> Dict[str, str]:
+    """
+    Write a dataset of ``scale`` copies of the shipped data.
+
+    Args:
+        scale (int): Number of copies
+        root (str): Output directory
+        data_paths (Dict[str, str]): Shipped data paths
+
+    Returns:
+        Dict[str, str]: ``DATA_PATHS``-style paths of the new dataset, plus
+        ``graphml``
+    """
+    import networkx as nx
+    from interactome import read_graphml_edges
+
+    paths = {name: os.path.join(root, path) for name, path in data_paths.items()}
+    paths['graphml'] = os.path.join(root, GRAPHML_PATH)
+    for name, path in paths.items():
+        os.makedirs(path if path.endswith('/') else os.path.dirname(path), exist_ok=True)
+
+    for table in _CSV_HEADER_LINES:
+        _tile_table(data_paths[table], paths[table], table, scale)
+
+    for filename in sorted(os.listdir(GRAPHML_PATH)):
+        if not filename.endswith('.graphml'):
+            continue
+        edges = read_graphml_edges(os.path.join(GRAPHML_PATH, filename))
+        graph = nx.Graph()
+        for copy in range(scale):
+            graph.add_edges_from((_copy_name(a, copy), _copy_name(b, copy)) for a, b in edges)
+        nx.write_graphml(graph, os.path.join(paths['graphml'], filename))
+
+    # Network pages are only scanned by name; render.network_page writes the
+    # scaled Total page over the shipped one
+    html_dir = data_paths['network_html']
+    for filename in os.listdir(html_dir):
+        if os.path.isfile(os.path.join(html_dir, filename)):
+            shutil.copyfile(os.path.join(html_dir, filename), os.path.join(paths['network_html'], filename))
+
+    for figure_type in FIGURE_TYPES:
+        figure_dir = data_paths[figure_type]
+        if not os.path.isdir(figure_dir):
+            continue
+        for filename in os.listdir(figure_dir):
+            if not filename.endswith('.png') or '_' not in filename:
+                continue
+            bait, prey = filename[:-len('.png')].split('_', 1)
+            for copy in range(scale):
+                _link(os.path.join(figure_dir, filename), os.path.join(
+                    paths[figure_type], f"{_copy_name(bait, copy)}_{_copy_name(prey, copy)}.png"
+                ))
+    return paths
+
+
+def write_synthetic_dataset(scale: int, root: str) -> Dict[str, str]:
+    """
+    Write a synthetic dataset the size of ``scale`` copies of the shipped data.
+
+    Args:
+        scale (int): Dataset size as a multiple of the shipped 156 pairs
+        root (str): Output directory
+
+    Returns:
+        Dict[str, str]: Same keys as ``write_scaled_dataset``; the network
+        page and figure directories are empty
+    """
+    from synthetic_data import SyntheticSpec, generate_dataset
+
+    paths = {name: os.path.join(root, path) for name, path in DATA_PATHS.items()}
+    paths.update(generate_dataset(SyntheticSpec(baits=4 * scale, prey_per_bait=39), root)['paths'])
+    for name in ['network_html'] + FIGURE_TYPES:
+        os.makedirs(paths[name], exist_ok=True)
+    return paths
+
+
+def _quant_data(paths: Dict[str, str]):
+    from figure_engine import _build_quant_data
+    return _build_quant_data(paths['quant_data'], paths['clustering_data'], ())
+
+
+def _graphml_files(paths: Dict[str, str]) -> List[str]:
+    return sorted(
+        os.path.join(paths['graphml'], name) for name in os.listdir(paths['graphml'])
+        if name.endswith('.graphml')
+    )
+
+
+@benchmark('catalog', 'network_conditions')
+def _network_conditions(paths):
+    from data_catalog import get_network_conditions
+    return lambda: get_network_conditions(paths['network_html'])
+
+
+@benchmark('catalog', 'protein_pairs')
+def _protein_pairs(paths):
+    from data_catalog import get_protein_pairs
+    return lambda: get_protein_pairs(paths['boxplot_normalized'])
+
+
+@benchmark('catalog', 'build_catalog')
+def _build_catalog(paths):
+    from data_catalog import build_catalog
+    data_paths = {name: paths[name] for name in DATA_PATHS}
+    return lambda: build_catalog(data_paths)
+
+
+@benchmark('catalog', 'fingerprint')
+def _fingerprint(paths):
+    from data_catalog import data_fingerprint
+    data_paths = {name: paths[name] for name in DATA_PATHS}
+    return lambda: data_fingerprint(data_paths)
+
+
+@benchmark('tables', 'parse_quant_csv')
+def _parse_quant_csv(paths):
+    from quant_store import parse_quant_table
+    return lambda: parse_quant_table(paths['quant_data'])
+
+
+@benchmark('tables', 'parse_clustering_csv')
+def _parse_clustering_csv(paths):
+    from quant_store import clustering_frame
+    return lambda: clustering_frame(paths['clustering_data'])
+
+
+@benchmark('tables', 'read_quant_store')
+def _read_quant_store(paths):
+    from quant_store import load_quant_table, parse_quant_table, quant_frame, write_store
+    write_store(quant_frame(parse_quant_table(paths['quant_data'])), paths['quant_data'])
+    return lambda: load_quant_table(paths['quant_data'])
+
+
+@benchmark('tables', 'read_clustering_store')
+def _read_clustering_store(paths):
+    from quant_store import clustering_frame, load_clustering_table, write_store
+    write_store(clustering_frame(paths['clustering_data']), paths['clustering_data'])
+    return lambda: load_clustering_table(paths['clustering_data'])
+
+
+@benchmark('data', 'quant_data')
+def _load_quant_data(paths):
+    return lambda: _quant_data(paths)
+
+
+@benchmark('data', 'interactome')
+def _load_interactome(paths):
+    from interactome import _build_interactome
+    graphml_files = _graphml_files(paths)
+    return lambda: _build_interactome(graphml_files, paths['clustering_data'], ())
+
+
+@benchmark('data', 'protein_index')
+def _protein_index(paths):
+    from protein_search import build_protein_index
+    data = _quant_data(paths)
+    rows = list(zip(data.bait, data.prey, data.bait_id, data.prey_id))
+    return lambda: build_protein_index(rows)
+
+
+@benchmark('data', 'diff_stats')
+def _diff_stats(paths):
+    from diff_stats import call_effects, compute_stats
+    data = _quant_data(paths)
+    return lambda: call_effects(compute_stats(data))
+
+
+@benchmark('data', 'interactome_queries')
+def _interactome_queries(paths):
+    from interactome import _build_interactome
+    interactome = _build_interactome(_graphml_files(paths), paths['clustering_data'], ())
+    bait = interactome.proteins[interactome.source[0]]
+
+    def run():
+        interactome.select(baits=[bait], conditions=['HM_Enhanced', 'S_Suppressed'])
+        interactome.compare('HM_Enhanced', 'S_Enhanced')
+        interactome.neighbors(bait, 'Total')
+    return run
+
+
+# The pairwise distances take O(n²) memory: about 1 GB for the pairs at 100x
+@benchmark('data', 'profile_linkage', max_scale=10)
+def _profile_linkage(paths):
+    from clustering import ClusteringParams, _build_profiles, compute_linkage, scale_rows
+    scaled = scale_rows(_build_profiles(paths['clustering_data'], ()).values, 'zscore')
+    params = ClusteringParams.create()
+    return lambda: compute_linkage(scaled, params)
+
+
+@benchmark('files', 'figure_read')
+def _figure_read(paths):
+    figure_dir = paths['boxplot_normalized']
+    names = sorted(os.listdir(figure_dir))[:20] if os.path.isdir(figure_dir) else []
+
+    def run():
+        for name in names:
+            for figure_type in FIGURE_TYPES:
+                path = os.path.join(paths[figure_type], name)
+                if os.path.exists(path):
+                    with open(path, 'rb') as figure_file:
+                        figure_file.read()
+    return run
+
+
+@benchmark('render', 'pair_figure')
+def _pair_figure(paths):
+    from matplotlib.figure import Figure
+    from figure_engine import plot_pair
+    data = _quant_data(paths)
+
+    def run():
+        figure = Figure(figsize=(8, 6))
+        plot_pair(figure.add_subplot(), data, 'boxplot_relative', len(data.pairs) // 2)
+        figure.savefig(io.BytesIO(), format='png', dpi=120)
+    return run
+
+
+@benchmark('render', 'comparison_heatmap')
+def _comparison_heatmap(paths):
+    import numpy as np
+    from matplotlib.figure import Figure
+    from figure_engine import plot_heatmap
+    data = _quant_data(paths)
+    rows = np.arange(min(len(data.pairs), 40))
+
+    def run():
+        figure = Figure(figsize=(8, 1.5 + 0.28 * len(rows)), layout='constrained')
+        ax = figure.add_subplot()
+        figure.colorbar(plot_heatmap(ax, data, 'tops_score', rows), ax=ax)
+        figure.savefig(io.BytesIO(), format='png', dpi=120)
+    return run
+
+
+# The spring layout is quadratic in the number of nodes: about 0.5 s at 1x
+# and 13 s at 10x, so 100x would take hours
+@benchmark('render', 'network_page', max_scale=10)
+def _network_page(paths):
+    from build_networks import NETWORK_OPTIONS, render_network
+    graphml_path = os.path.join(paths['graphml'], 'Total.graphml')
+    options = dict(NETWORK_OPTIONS, baits=sorted(set(_quant_data(paths).bait)))
+
+    def run():
+        html, _, _ = render_network(graphml_path, options)
+        with open(os.path.join(paths['network_html'], 'Total.html'), 'w', encoding='utf-8') as html_file:
+            html_file.write(html)
+    return run
+
+
+@benchmark('files', 'network_html_read', max_scale=10)
+def _network_html_read(paths):
+    from build_networks import inline_local_assets
+    html_path = os.path.join(paths['network_html'], 'Total.html')
+
+    def run():
+        with open(html_path, 'r', encoding='utf-8') as html_file:
+            inline_local_assets(html_file.read(), paths['network_html'])
+    return run
+
+
+def measure(func: Callable[[], object], min_time: float = MIN_TIME,
+            max_rounds: int = MAX_ROUNDS) -> Dict[str, float]:
+    """
+    Time a function over several rounds.
+
+    A first round shorter than ``min_time`` is discarded as a warm-up
+    (lazy imports, file system caches).
+
+    Args:
+        func (Callable[[], object]): Function to time
+        min_time (float): Keep running rounds until this many seconds passed
+        max_rounds (int): Stop after this many rounds
+
+    Returns:
+        Dict[str, float]: ``rounds``, ``best`` and ``median`` (seconds)
+    """
+    times: List[float] = []
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        warmup = time.perf_counter() - start
+        if warmup >= min_time:
+            times.append(warmup)
+        started = time.perf_counter()
+        while not times or (len(times) < max_rounds and time.perf_counter() - started < min_time):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {'rounds': len(times), 'best': min(times), 'median': statistics.median(times)}
+
+
+def run_benchmarks(scales: List[int], selected: List[Benchmark], min_time: float = MIN_TIME,
+                   keep_dir: Optional[str] = None,
+                   synthetic: bool = False) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Run benchmarks on every scale.
+
+    Args:
+        scales (List[int]): Dataset scales
+        selected (List[Benchmark]): Benchmarks to run, in order
+        min_time (float): Seconds per benchmark and scale
+        keep_dir (str): Write the datasets here and keep them (default: a
+            temporary directory that is removed)
+        synthetic (bool): Generate synthetic datasets instead of tiling the
+            shipped data
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: Benchmark key -> scale ->
+        timings (see ``measure``)
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {bench.key: {} for bench in selected}
+    root = keep_dir or tempfile.mkdtemp(prefix='glyco_bench_')
+    write_dataset = write_synthetic_dataset if synthetic else write_scaled_dataset
+    try:
+        for scale in scales:
+            start = time.perf_counter()
+            paths = write_dataset(scale, os.path.join(root, f"x{scale}"))
+            print(f"📦 {scale}x dataset ({156 * scale} interactions) written in "
+                  f"{time.perf_counter() - start:.1f} s")
+            for bench in selected:
+                if bench.max_scale is not None and scale > bench.max_scale:
+                    continue
+                try:
+                    timings = measure(bench.setup(paths), min_time)
+                except Exception as e:
+                    print(f"  ❌ {bench.key}: {e}")
+                    continue
+                results[bench.key][str(scale)] = timings
+                print(f"  {bench.key:<32} {_format(timings['best']):>10}  ({timings['rounds']} rounds)")
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def _format(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    return f"{seconds * 1000:.2f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+def scaling_slope(timings: Dict[str, Dict[str, float]]) -> Optional[float]:
+    """Return the log-log slope of the best times from the smallest to the largest scale."""
+    scales = sorted(timings, key=int)
+    if len(scales) < 2:
+        return None
+    low, high = scales[0], scales[-1]
+    return math.log(timings[high]['best'] / timings[low]['best']) / math.log(int(high) / int(low))
+
+
+def compare_results(results: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    List the benchmarks slower than the baseline.
+
+    Args:
+        results (Dict): Benchmark key -> scale -> timings
+        baseline (Dict): Saved results of an earlier run
+        threshold (float): Slowdown ratio reported as a regression
+
+    Returns:
+        List[str]: One description per regression
+    """
+    regressions = []
+    for key, by_scale in results.items():
+        for scale, timings in by_scale.items():
+            reference = baseline.get(key, {}).get(scale)
+            if reference and timings['best'] > reference['best'] * threshold:
+                regressions.append(
+                    f"{key} at {scale}x: {_format(timings['best'])} vs "
+                    f"{_format(reference['best'])} ({timings['best'] / reference['best']:.2f}x)"
+                )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark the data and render paths at several scales.")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(BENCHMARK_SCALES),
+                        help="dataset sizes as multiples of the shipped data")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="seconds per benchmark and scale")
+    parser.add_argument('--save', help="write the results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio reported as a regression")
+    parser.add_argument('--keep', metavar='DIR', help="write the scaled datasets to DIR and keep them")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="benchmark generated datasets instead of copies of the shipped data")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    selected = [bench for bench in BENCHMARKS if args.filter in bench.key]
+    if args.list:
+        for bench in selected:
+            print(bench.key)
+        return 0
+
+    print("🧬 Glyco Interactome Network - Benchmarks")
+    print("=" * 50)
+    results = run_benchmarks(sorted(args.scales), selected, args.min_time, args.keep, args.synthetic)
+
+    scales = [str(scale) for scale in sorted(args.scales)]
+    print()
+    print(f"{'benchmark':<32}" + ''.join(f"{scale + 'x':>12}" for scale in scales) + f"{'slope':>8}")
+    for key, by_scale in results.items():
+        slope = scaling_slope(by_scale)
+        print(f"{key:<32}" + ''.join(f"{_format(by_scale.get(s, {}).get('best')):>12}" for s in scales)
+              + (f"{slope:>8.2f}" if slope is not None else f"{'-':>8}"))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as results_file:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'time': time.time(),
+                'results': results,
+            }, results_file, indent=1)
+        print(f"\n💾 Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions (slower than {args.threshold:.2f}x the baseline):")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"\n✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
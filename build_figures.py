@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Figure Build Pipeline for Glyco Interactome Network
+
+Regenerates the pre-rendered pair figures (normalized abundance, relative
+abundance and TopS score) from the quant data. This replaces the plotting
+cells of ``pyvis_html.ipynb``:
+
+- DataS3/DataS4 are read once and shared with the worker processes
+- figures are rendered in parallel over a process pool
+- each figure's inputs are content-hashed, and figures whose hash matches
+  the build manifest (and whose file still exists) are skipped
+- per-figure render times are reported
+- ``data/manifest.json`` is rewritten at the end (see health_check.py)
+
+Usage:
+    python build_figures.py [--force] [--workers N] [--dpi 800] [--pairs BSG_ADAM9 ...]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import DATA_PATHS, FIGURE_BUILD_MANIFEST, FIGURE_TYPES
+from figure_engine import (
+    FIGURE_MEASURES,
+    FIGURE_STYLE_VERSION,
+    QuantData,
+    load_quant_data,
+    plot_pair,
+)
+
+# Build manifest: figure path -> content hash of its inputs
+MANIFEST_PATH = FIGURE_BUILD_MANIFEST
+
+DEFAULT_DPI = 800
+
+_worker_data: Optional[QuantData] = None
+
+
+def figure_hash(data: QuantData, figure_type: str, row: int, dpi: int) -> str:
+    """
+    Hash everything that determines the content of one figure.
+
+    Args:
+        data (QuantData): Loaded quant data
+        figure_type (str): One of ``FIGURE_MEASURES``
+        row (int): Row of the pair in ``data``
+        dpi (int): Output resolution
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    measure, _ = FIGURE_MEASURES[figure_type]
+    digest = hashlib.sha256()
+    digest.update(f"{FIGURE_STYLE_VERSION}|{figure_type}|{dpi}|{data.pairs[row]}|".encode())
+    digest.update(",".join(data.phenotypes).encode())
+    digest.update(np.ascontiguousarray(data.measure(measure)[row]).tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, str]:
+    """Load the build manifest, or an empty one if it is missing or invalid."""
+    try:
+        with open(path, 'r', encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, str], path: str = MANIFEST_PATH) -> None:
+    """Write the build manifest atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(dict(sorted(manifest.items())), manifest_file, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(data: QuantData) -> None:
+    """Receive the quant data once per worker process."""
+    global _worker_data
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_data = data
+
+
+def render_to_file(figure_type: str, row: int, output_path: str, dpi: int) -> float:
+    """
+    Render one figure to ``output_path`` in a worker process.
+
+    Args:
+        figure_type (str): One of ``FIGURE_MEASURES``
+        row (int): Row of the pair in the worker's quant data
+        output_path (str): Destination PNG path
+        dpi (int): Output resolution
+
+    Returns:
+        float: Render time in seconds
+    """
+    from matplotlib.figure import Figure
+
+    start = time.perf_counter()
+    figure = Figure(figsize=(8, 6))
+    plot_pair(figure.add_subplot(), _worker_data, figure_type, row)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    figure.savefig(tmp_path, format='png', dpi=dpi)
+    os.replace(tmp_path, output_path)
+    return time.perf_counter() - start
+
+
+def plan_build(data: QuantData, manifest: Dict[str, str], dpi: int, force: bool = False,
+               pairs: Optional[List[str]] = None) -> Tuple[List[Tuple[str, int, str, str]], int]:
+    """
+    Work out which figures need rendering.
+
+    Args:
+        data (QuantData): Loaded quant data
+        manifest (Dict[str, str]): Previous build manifest
+        dpi (int): Output resolution
+        force (bool): Render everything regardless of the manifest
+        pairs (List[str]): Restrict the build to these pairs
+
+    Returns:
+        Tuple[List[Tuple[str, int, str, str]], int]: ``(figure_type, row,
+        output_path, hash)`` jobs and the number of up-to-date figures
+    """
+    rows = range(len(data.pairs)) if not pairs else [data.index[p] for p in pairs if p in data]
+    jobs = []
+    skipped = 0
+    for figure_type in FIGURE_TYPES:
+        for row in rows:
+            if figure_type == 'tops_score' and np.isnan(data.tops[row]).all():
+                continue
+            output_path = os.path.join(DATA_PATHS[figure_type], f"{data.pairs[row]}.png")
+            content_hash = figure_hash(data, figure_type, row, dpi)
+            if not force and manifest.get(output_path) == content_hash and os.path.exists(output_path):
+                skipped += 1
+                continue
+            jobs.append((figure_type, row, output_path, content_hash))
+    return jobs, skipped
+
+
+def main() -> int:
+    """Build the pair figures incrementally."""
+    from health_check import refresh_data_manifest
+
+    parser = argparse.ArgumentParser(description="Render pair figures from the quant data.")
+    parser.add_argument('--force', action='store_true', help="re-render up-to-date figures")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help="output resolution")
+    parser.add_argument('--pairs', nargs='*', help="only build these pairs (e.g. BSG_ADAM9)")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Figure Build")
+    print("=" * 50)
+
+    data = load_quant_data()
+    if data is None:
+        print(f"❌ Could not load {DATA_PATHS['quant_data']}")
+        return 1
+
+    manifest = load_manifest()
+    jobs, skipped = plan_build(data, manifest, args.dpi, args.force, args.pairs)
+    print(f"📊 {len(data.pairs)} pairs: {len(jobs)} figures to render, {skipped} up to date")
+    if not jobs:
+        return 0 if refresh_data_manifest() else 1
+
+    for figure_type in FIGURE_TYPES:
+        os.makedirs(DATA_PATHS[figure_type], exist_ok=True)
+
+    start = time.perf_counter()
+    timings: List[float] = []
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(data,)) as executor:
+        futures = {
+            executor.submit(render_to_file, figure_type, row, output_path, args.dpi):
+                (output_path, content_hash)
+            for figure_type, row, output_path, content_hash in jobs
+        }
+        for future in as_completed(futures):
+            output_path, content_hash = futures[future]
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"  ❌ {output_path}: {e}")
+                continue
+            timings.append(elapsed)
+            manifest[output_path] = content_hash
+            print(f"  ✅ {output_path} ({elapsed * 1000:.0f} ms)")
+
+    save_manifest(manifest)
+
+    wall = time.perf_counter() - start
+    if timings:
+        print(f"\n⏱️  Rendered {len(timings)} figures in {wall:.1f} s "
+              f"(per figure: mean {np.mean(timings) * 1000:.0f} ms, "
+              f"max {np.max(timings) * 1000:.0f} ms)")
+    if failures:
+        print(f"❌ {failures} figures failed")
+        return 1
+    return 0 if refresh_data_manifest() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Network Build Pipeline for Glyco Interactome Network
+
+Renders the pyvis network pages in ``data/Total_html`` from the GraphML
+subnetworks in ``data/graphml``. This replaces ``create_html`` in
+``pyvis_html.ipynb``:
+
+- each GraphML file is hashed together with the rendering options, and only
+  networks whose hash changed (or whose page is missing) are re-rendered
+- renders run in parallel over a process pool
+- a manifest (``data/Total_html/manifest.json``) lists every page with its
+  source, hashes and size; the app reads it instead of scanning the directory
+  and uses the content hash to version the page URLs
+- node positions are computed here once (seeded spring layout) and written
+  into the pages with physics disabled, so browsers draw the final layout
+  immediately instead of running vis-network's stabilization on every view
+- with ``--assets local`` the pages load vis-network and the pyvis bindings
+  from the vendored, shared files in ``lib/`` instead of cdnjs/jsdelivr, so
+  they render without any external request (restricted egress, air-gapped
+  machines) and the browser caches the libraries once for all pages
+- gzip/brotli copies of the pages, the manifest and ``lib/`` are written
+  next to them (see precompress.py) for ``static_server.py`` to send
+- ``data/manifest.json`` is rewritten at the end (see health_check.py)
+
+Usage:
+    python build_networks.py [--force] [--workers N] [--assets cdn|local] [--layout spring|kamada_kawai|physics]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from config import DATA_PATHS, GRAPHML_PATH, NETWORK_MANIFEST
+
+# Bump whenever render_network changes so every page is rebuilt
+NETWORK_BUILD_VERSION = 3
+
+DEFAULT_BAITS = ['BSG', 'CD44', 'EGFR', 'SLC3A2']
+
+# Vendored assets used by pages built with ``--assets local``, relative to
+# the repository root. Pages reference them relative to their own location,
+# which works both from disk and through static_server.py.
+LIB_PATH = 'lib/'
+LOCAL_STYLESHEETS = ['vis-9.1.2/vis-network.css', 'glyco/network.css']
+LOCAL_SCRIPTS = ['vis-9.1.2/vis-network.min.js', 'bindings/utils.js']
+
+_REMOTE_LINK = re.compile(r'<link\b[^>]*\bhref="https?://[^"]*"[^>]*>', re.S)
+_REMOTE_SCRIPT = re.compile(r'<script\b[^>]*\bsrc="https?://[^"]*"[^>]*>\s*</script>', re.S)
+
+# Rendering options; they are part of every network's content hash
+NETWORK_OPTIONS = {
+    'height': '750px',
+    'width': '100%',
+    'font_size': 14,
+    'bait_shape': 'diamond',
+    'bait_size': 20,
+    'prey_size': 12,
+    'prey_color': '#FE81B8',
+    'edge_color': '#929292',
+    'assets': 'cdn',
+    'layout': 'spring',
+    'layout_seed': 42,
+    # Pixel distance between neighbouring nodes in the precomputed layout
+    'layout_spacing': 90,
+}
+
+
+def network_options(**overrides: object) -> Dict[str, object]:
+    """
+    Return the rendering options, including the bait list.
+
+    Baits are taken from the quant data so new baits are drawn as baits
+    without editing this script.
+
+    Args:
+        **overrides: Options replacing the defaults in ``NETWORK_OPTIONS``
+
+    Returns:
+        Dict[str, object]: Rendering options
+    """
+    from figure_engine import load_quant_data
+
+    data = load_quant_data()
+    baits = sorted(set(data.bait)) if data is not None else DEFAULT_BAITS
+    options = dict(NETWORK_OPTIONS, baits=baits, **overrides)
+    if options['assets'] == 'local':
+        # Vendored asset URLs are versioned, so pages change with the assets
+        options['asset_tags'] = [tag for _, tag in _local_asset_tags('')]
+    return options
+
+
+def _lib_prefix(html_dir: str) -> str:
+    """Return the relative URL from ``html_dir`` to the vendored ``lib/``."""
+    return os.path.relpath(LIB_PATH, html_dir).replace(os.sep, '/') + '/'
+
+
+def _local_asset_tags(lib_prefix: str) -> List[Tuple[str, str]]:
+    """
+    Return ``(path, tag)`` for every vendored asset, in load order.
+
+    URLs carry a content-hash version (see static_server.py), so the shared
+    files can be cached as immutable and are re-fetched only when they change.
+    """
+    tags = []
+    for path in LOCAL_STYLESHEETS + LOCAL_SCRIPTS:
+        with open(os.path.join(LIB_PATH, path), 'rb') as asset_file:
+            url = f"{lib_prefix}{path}?v={hashlib.sha256(asset_file.read()).hexdigest()[:16]}"
+        if path.endswith('.css'):
+            tags.append((path, f'<link rel="stylesheet" href="{url}" />'))
+        else:
+            tags.append((path, f'<script src="{url}"></script>'))
+    return tags
+
+
+def localize_assets(html: str, lib_prefix: str) -> str:
+    """
+    Point a pyvis page at the vendored libraries instead of the CDNs.
+
+    The CDN ``<link>``/``<script>`` tags and the inlined pyvis bindings are
+    replaced by references to the shared files in ``lib/``. Bootstrap is
+    dropped: the pages only use its card styles, which
+    ``lib/glyco/network.css`` provides.
+
+    Args:
+        html (str): Page source generated by pyvis
+        lib_prefix (str): URL of ``lib/`` relative to the page
+
+    Returns:
+        str: Page source without external requests
+    """
+    html = _REMOTE_LINK.sub('', html)
+    html = _REMOTE_SCRIPT.sub('', html)
+
+    with open(os.path.join(LIB_PATH, 'bindings', 'utils.js'), 'r', encoding='utf-8') as utils_file:
+        html = html.replace(f"<script>{utils_file.read()}</script>", '')
+
+    tags = '\n        '.join(tag for _, tag in _local_asset_tags(lib_prefix))
+    return html.replace('<meta charset="utf-8">', '<meta charset="utf-8">\n        ' + tags, 1)
+
+
+def inline_local_assets(html: str, html_dir: str) -> str:
+    """
+    Inline the vendored libraries referenced by a ``--assets local`` page.
+
+    Used when a page cannot be loaded by URL (``components.html`` renders
+    it from a string, where relative references do not resolve).
+
+    Args:
+        html (str): Page source
+        html_dir (str): Directory the page was loaded from
+
+    Returns:
+        str: Self-contained page source
+    """
+    lib_prefix = _lib_prefix(html_dir)
+    if f'"{lib_prefix}' not in html:
+        return html
+    for path, tag in _local_asset_tags(lib_prefix):
+        if tag not in html:
+            continue
+        with open(os.path.join(LIB_PATH, path), 'r', encoding='utf-8') as asset_file:
+            content = asset_file.read()
+        inline = f"<style>{content}</style>" if path.endswith('.css') else f"<script>{content}</script>"
+        html = html.replace(tag, inline)
+    return html
+
+
+def network_hash(graphml_path: str, options: Dict[str, object]) -> str:
+    """
+    Hash a GraphML file together with the rendering options.
+
+    Args:
+        graphml_path (str): Path to the GraphML file
+        options (Dict[str, object]): Rendering options
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{NETWORK_BUILD_VERSION}|".encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    with open(graphml_path, 'rb') as graphml_file:
+        for chunk in iter(lambda: graphml_file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_layout(graph, options: Dict[str, object]) -> Dict[str, Tuple[float, float]]:
+    """
+    Compute fixed node coordinates for a network.
+
+    Args:
+        graph: NetworkX graph
+        options (Dict[str, object]): Rendering options (``layout``,
+            ``layout_seed`` and ``layout_spacing``)
+
+    Returns:
+        Dict[str, Tuple[float, float]]: Node -> (x, y) in pixels, or an empty
+        dict when the layout is left to vis-network physics
+    """
+    import networkx as nx
+
+    if options['layout'] == 'physics' or graph.number_of_nodes() == 0:
+        return {}
+    if options['layout'] == 'kamada_kawai':
+        positions = nx.kamada_kawai_layout(graph)
+    else:
+        positions = nx.spring_layout(graph, seed=options['layout_seed'], iterations=200)
+
+    # spring/kamada-kawai coordinates lie in [-1, 1]; grow the canvas with
+    # the square root of the node count to keep a constant node density
+    scale = options['layout_spacing'] * graph.number_of_nodes() ** 0.5
+    return {
+        node: (round(float(x) * scale, 1), round(float(y) * scale, 1))
+        for node, (x, y) in positions.items()
+    }
+
+
+def render_network(graphml_path: str, options: Dict[str, object]) -> Tuple[str, int, int]:
+    """
+    Render a GraphML network to a pyvis HTML page.
+
+    Args:
+        graphml_path (str): Path to the GraphML file
+        options (Dict[str, object]): Rendering options
+
+    Returns:
+        Tuple[str, int, int]: HTML source, node count and edge count
+    """
+    import networkx as nx
+
+    graph = nx.read_graphml(graphml_path)
+    return render_graph(graph, options), graph.number_of_nodes(), graph.number_of_edges()
+
+
+def render_graph(graph, options: Dict[str, object]) -> str:
+    """
+    Render a NetworkX graph to a pyvis HTML page.
+
+    Args:
+        graph: NetworkX graph; a ``name`` node/edge attribute overrides the
+            label/tooltip
+        options (Dict[str, object]): Rendering options
+
+    Returns:
+        str: HTML source
+    """
+    from pyvis.network import Network
+
+    net = Network(height=options['height'], width=options['width'], cdn_resources='remote')
+
+    positions = compute_layout(graph, options)
+    baits = set(options['baits'])
+    font = dict(size=options['font_size'])
+    for node, attrs in graph.nodes(data=True):
+        label = attrs.get('name', node)
+        position = {'x': positions[node][0], 'y': positions[node][1]} if positions else {}
+        if label in baits:
+            net.add_node(node, label=label, shape=options['bait_shape'],
+                         size=options['bait_size'], font=font, **position)
+        else:
+            net.add_node(node, label=label, size=options['prey_size'], font=font,
+                         color=options['prey_color'], **position)
+
+    for source, target, attrs in graph.edges(data=True):
+        title = attrs.get('name', f"{source}_{target}").replace(' (interacts with) ', '_')
+        net.add_edge(source, target, title=title, color=options['edge_color'])
+
+    if positions:
+        # Coordinates are final: skip the force simulation and its stabilization
+        net.toggle_physics(False)
+        net.options.physics.stabilization.enabled = False
+        net.set_edge_smooth('continuous')
+
+    return net.generate_html()
+
+
+def _build_one(graphml_path: str, html_path: str,
+               options: Dict[str, object]) -> Tuple[int, int, int, str, float]:
+    """Render one network to ``html_path`` in a worker process."""
+    start = time.perf_counter()
+    html, nodes, edges = render_network(graphml_path, options)
+    if options['assets'] == 'local':
+        html = localize_assets(html, _lib_prefix(os.path.dirname(html_path)))
+    data = html.encode('utf-8')
+    tmp_path = f"{html_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as html_file:
+        html_file.write(data)
+    os.replace(tmp_path, html_path)
+    return nodes, edges, len(data), hashlib.sha256(data).hexdigest(), time.perf_counter() - start
+
+
+def html_name(network: str, existing: List[str]) -> str:
+    """
+    Choose the page filename for a network.
+
+    Published pages keep their filename even when its case differs from the
+    GraphML file (``F_Suppressed.graphml`` -> ``F_suppressed.html``).
+
+    Args:
+        network (str): GraphML file stem
+        existing (List[str]): Filenames already in the output directory
+
+    Returns:
+        str: HTML filename
+    """
+    by_lower = {name.lower(): name for name in existing}
+    return by_lower.get(f"{network}.html".lower(), f"{network}.html")
+
+
+def load_manifest(path: str = NETWORK_MANIFEST) -> Dict[str, object]:
+    """Load the network manifest, or an empty one if it is missing or invalid."""
+    try:
+        with open(path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+        return manifest if isinstance(manifest.get('networks'), dict) else {'networks': {}}
+    except (OSError, ValueError, AttributeError):
+        return {'networks': {}}
+
+
+def save_manifest(manifest: Dict[str, object], path: str = NETWORK_MANIFEST) -> None:
+    """Write the network manifest atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_networks(force: bool = False, workers: Optional[int] = None,
+                   graphml_dir: str = GRAPHML_PATH,
+                   html_dir: str = DATA_PATHS['network_html'],
+                   assets: str = NETWORK_OPTIONS['assets'],
+                   layout: str = NETWORK_OPTIONS['layout']) -> int:
+    """
+    Render every changed network and update the manifest.
+
+    Args:
+        force (bool): Re-render networks whose hash is unchanged
+        workers (int): Number of worker processes
+        graphml_dir (str): Directory of GraphML inputs
+        html_dir (str): Output directory for the HTML pages
+        assets (str): ``cdn`` or ``local`` JavaScript/CSS references
+        layout (str): ``spring``, ``kamada_kawai`` or ``physics`` (client-side)
+
+    Returns:
+        int: Number of failed networks
+    """
+    options = network_options(assets=assets, layout=layout)
+    manifest_path = os.path.join(html_dir, os.path.basename(NETWORK_MANIFEST))
+    manifest = load_manifest(manifest_path)
+    previous = manifest['networks']
+
+    os.makedirs(html_dir, exist_ok=True)
+    existing = [name for name in os.listdir(html_dir) if name.endswith('.html')]
+    sources = sorted(name for name in os.listdir(graphml_dir) if name.endswith('.graphml'))
+
+    networks: Dict[str, Dict[str, object]] = {}
+    jobs = []
+    for source in sources:
+        graphml_path = os.path.join(graphml_dir, source)
+        html_file = html_name(source[:-len('.graphml')], existing)
+        network = html_file[:-len('.html')]
+        html_path = os.path.join(html_dir, html_file)
+        content_hash = network_hash(graphml_path, options)
+
+        entry = previous.get(network)
+        if not force and entry and entry.get('hash') == content_hash and os.path.exists(html_path):
+            networks[network] = entry
+            continue
+        networks[network] = {'source': graphml_path, 'html': html_file, 'hash': content_hash}
+        jobs.append((network, graphml_path, html_path))
+
+    print(f"🌐 {len(sources)} networks: {len(jobs)} to render, {len(sources) - len(jobs)} up to date")
+
+    failures = 0
+    start = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_build_one, graphml_path, html_path, options): network
+                for network, graphml_path, html_path in jobs
+            }
+            for future in as_completed(futures):
+                network = futures[future]
+                try:
+                    nodes, edges, size, sha256, elapsed = future.result()
+                except Exception as e:
+                    failures += 1
+                    del networks[network]
+                    print(f"  ❌ {network}: {e}")
+                    continue
+                networks[network].update(nodes=nodes, edges=edges, bytes=size, sha256=sha256)
+                print(f"  ✅ {network}: {nodes} nodes, {edges} edges, "
+                      f"{size / 1024:.1f} KB ({elapsed * 1000:.0f} ms)")
+
+    # Keep pages that have no GraphML source (e.g. hand-made ones) listed as-is
+    for network, entry in previous.items():
+        if network not in networks and os.path.exists(os.path.join(html_dir, entry.get('html', ''))):
+            networks[network] = entry
+
+    save_manifest({'version': NETWORK_BUILD_VERSION, 'options': options, 'networks': networks},
+                  manifest_path)
+    if jobs:
+        print(f"⏱️  Built {len(jobs) - failures} networks in {time.perf_counter() - start:.1f} s")
+
+    # gzip/brotli copies for static_server.py
+    from precompress import precompress_tree
+
+    written = sum(
+        size is not None
+        for sizes in precompress_tree([html_dir, LIB_PATH]).values()
+        for size in sizes.values()
+    )
+    if written:
+        print(f"🗜️  Wrote {written} precompressed copies")
+    return failures
+
+
+def main() -> int:
+    """Build the network pages incrementally."""
+    from health_check import refresh_data_manifest
+
+    parser = argparse.ArgumentParser(description="Render network pages from GraphML files.")
+    parser.add_argument('--force', action='store_true', help="re-render up-to-date networks")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument('--assets', choices=['cdn', 'local'], default=NETWORK_OPTIONS['assets'],
+                        help="load vis-network from the CDNs or from the vendored lib/")
+    parser.add_argument('--layout', choices=['spring', 'kamada_kawai', 'physics'],
+                        default=NETWORK_OPTIONS['layout'],
+                        help="precompute node positions, or leave the layout to the browser")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Network Build")
+    print("=" * 50)
+    if build_networks(args.force, args.workers, assets=args.assets, layout=args.layout):
+        return 1
+    return 0 if refresh_data_manifest() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Hierarchical clustering of the DataS4 phenotype profiles.
+
+DataS4 holds one TopS score per phenotype (HM, Neu, F, S, FS) for every
+pair. This module clusters the pairs by these profiles, all of them or the
+pairs of some baits, with SciPy's vectorized distance and linkage routines,
+orders the leaves so that similar profiles sit next to each other, and
+draws the result as an interactive heatmap with its dendrogram.
+
+The pairwise distances take O(n²) time and memory, so a clustering is
+cached twice under a hash of the profiles and the parameters: in a bounded
+LRU cache, and as an ``.npz`` file under ``CLUSTERING_CACHE_PATH`` that
+survives restarts and data reloads that leave the profiles unchanged. The
+directory keeps the ``CLUSTERING_DISK_CACHE_FILES`` most recently used files.
+"""
+
+import os
+import json
+import hashlib
+import contextlib
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import CLUSTERING_CACHE_PATH, DATA_PATHS, PAGE_CONTENT_WIDTH
+from metrics import timed
+from quant_store import load_clustering_table, store_path
+
+logger = logging.getLogger(__name__)
+
+# Number of clusterings kept in memory (least recently used evicted)
+CLUSTERING_CACHE_SIZE = 16
+
+# Linkage methods and distance metrics offered by the app
+CLUSTERING_METHODS = ('average', 'complete', 'single', 'ward')
+CLUSTERING_METRICS = ('euclidean', 'correlation', 'cosine')
+
+# Row scaling: ``zscore`` clusters the shape of a profile, ``none`` its values
+CLUSTERING_SCALES = ('zscore', 'none')
+
+# Number of clusterings kept on disk (least recently used deleted)
+CLUSTERING_DISK_CACHE_FILES = 64
+
+# Version of the cached file layout; bump when the computation changes
+CLUSTERING_CACHE_VERSION = 1
+
+# Optimal leaf ordering grows about cubically (40 s for 2000 pairs); larger
+# selections keep the order of the linkage
+MAX_OPTIMAL_ORDERING_PAIRS = 1000
+
+# Heatmaps with more rows are drawn without pair labels
+MAX_LABELLED_ROWS = 120
+
+
+@dataclass(frozen=True)
+class ClusteringParams:
+    """Normalized clustering parameters, usable as a cache key."""
+    method: str = 'average'
+    metric: str = 'euclidean'
+    scale: str = 'zscore'
+    optimal_ordering: bool = True
+    baits: Tuple[str, ...] = ()
+
+    @classmethod
+    def create(cls, method: str = 'average', metric: str = 'euclidean', scale: str = 'zscore',
+               optimal_ordering: bool = True, baits: Iterable[str] = ()) -> 'ClusteringParams':
+        """
+        Build validated parameters with sorted, de-duplicated baits.
+
+        Raises:
+            ValueError: If a method, metric or scale is unknown, or ward
+                linkage is combined with a non-euclidean metric
+        """
+        if method not in CLUSTERING_METHODS:
+            raise ValueError(f"Unknown linkage method: {method}")
+        if metric not in CLUSTERING_METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}")
+        if scale not in CLUSTERING_SCALES:
+            raise ValueError(f"Unknown scaling: {scale}")
+        if method == 'ward' and metric != 'euclidean':
+            raise ValueError("Ward linkage needs the euclidean metric")
+        return cls(method, metric, scale, bool(optimal_ordering), tuple(sorted(set(baits))))
+
+
+@dataclass(frozen=True)
+class Profiles:
+    """Phenotype profiles of the DataS4 pairs with a complete profile."""
+    bait: np.ndarray
+    prey: np.ndarray
+    phenotypes: List[str]
+    values: np.ndarray  # (pairs, phenotypes) TopS scores
+    version: Tuple = ()
+
+    @property
+    def pairs(self) -> np.ndarray:
+        return np.char.add(np.char.add(self.bait.astype(str), '_'), self.prey.astype(str))
+
+
+@dataclass(frozen=True)
+class Clustering:
+    """Clustered profiles, rows in leaf order."""
+    bait: np.ndarray
+    prey: np.ndarray
+    phenotypes: List[str]
+    values: np.ndarray   # (pairs, phenotypes) TopS scores
+    scaled: np.ndarray   # (pairs, phenotypes) values the distances were computed on
+    linkage: np.ndarray  # SciPy linkage matrix over the rows in leaf order
+    params: ClusteringParams
+    key: str
+
+    @property
+    def pairs(self) -> List[str]:
+        return [f"{bait}_{prey}" for bait, prey in zip(self.bait, self.prey)]
+
+
+def _file_version(*paths: str) -> Tuple:
+    """Return an ``(path, mtime_ns, size)`` tuple used to detect data changes."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+@timed('data_load', source='profiles')
+def _build_profiles(clustering_path: str, version: Tuple) -> Profiles:
+    """Load the phenotype columns of DataS4."""
+    clustering = load_clustering_table(clustering_path)
+    # The phenotype scores are the numeric columns; the effect flags follow them
+    phenotypes = [column for column in clustering.columns[2:]
+                  if clustering[column].dtype.kind == 'f']
+    values = clustering[phenotypes].to_numpy(dtype=float)
+    complete = ~np.isnan(values).any(axis=1)
+    return Profiles(
+        bait=clustering['Bait'].to_numpy(dtype=str)[complete],
+        prey=clustering['Prey'].to_numpy(dtype=str)[complete],
+        phenotypes=phenotypes,
+        values=values[complete],
+        version=version,
+    )
+
+
+_profiles_lock = threading.Lock()
+_profiles: Optional[Profiles] = None
+
+
+def load_profiles(clustering_path: str = DATA_PATHS['clustering_data']) -> Optional[Profiles]:
+    """
+    Return the shared DataS4 profiles, reloading them only if the file changed.
+
+    Args:
+        clustering_path (str): Path to the DataS4 CSV file
+
+    Returns:
+        Optional[Profiles]: The loaded profiles, or None if DataS4 is unavailable
+    """
+    global _profiles
+
+    version = _file_version(clustering_path, store_path(clustering_path))
+    if _profiles is not None and _profiles.version == version:
+        return _profiles
+
+    with _profiles_lock:
+        if _profiles is not None and _profiles.version == version:
+            return _profiles
+        if not os.path.exists(clustering_path) and not os.path.exists(store_path(clustering_path)):
+            logger.error(f"Clustering data file does not exist: {clustering_path}")
+            return None
+        try:
+            _profiles = _build_profiles(clustering_path, version)
+        except Exception as e:
+            logger.error(f"Error loading clustering data: {e}")
+            return None
+        return _profiles
+
+
+def scale_rows(values: np.ndarray, scale: str) -> np.ndarray:
+    """
+    Scale every profile for clustering.
+
+    Args:
+        values (np.ndarray): (pairs, phenotypes) scores
+        scale (str): ``zscore`` (mean 0, standard deviation 1 per pair; flat
+            profiles become all zeros) or ``none``
+
+    Returns:
+        np.ndarray: Scaled copy of ``values``
+    """
+    if scale == 'none':
+        return values.astype(float, copy=True)
+    centered = values - values.mean(axis=1, keepdims=True)
+    std = values.std(axis=1, keepdims=True)
+    return np.divide(centered, std, out=np.zeros_like(centered), where=std > 0)
+
+
+def profile_key(pairs: np.ndarray, scaled: np.ndarray, params: ClusteringParams) -> str:
+    """Return the hex SHA-256 identifying a clustering of some profiles."""
+    digest = hashlib.sha256()
+    digest.update(repr((CLUSTERING_CACHE_VERSION, params.method, params.metric,
+                        params.scale, params.optimal_ordering)).encode())
+    digest.update('\n'.join(pairs).encode())
+    digest.update(np.ascontiguousarray(scaled, dtype='<f8').tobytes())
+    return digest.hexdigest()
+
+
+@timed('render', kind='linkage')
+def compute_linkage(scaled: np.ndarray, params: ClusteringParams) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster profiles hierarchically.
+
+    Args:
+        scaled (np.ndarray): (pairs, phenotypes) scaled profiles, at least two
+        params (ClusteringParams): Linkage method, metric and ordering (the
+            optimal ordering is skipped above ``MAX_OPTIMAL_ORDERING_PAIRS``)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: SciPy linkage matrix and leaf order
+        (row indices of ``scaled``)
+    """
+    from scipy.cluster.hierarchy import leaves_list, linkage, optimal_leaf_ordering
+    from scipy.spatial.distance import pdist
+
+    distances = pdist(scaled, params.metric)
+    # Correlation and cosine distances are undefined for flat profiles;
+    # treat those as unrelated to everything
+    np.nan_to_num(distances, copy=False, nan=1.0)
+    tree = linkage(distances, params.method)
+    if params.optimal_ordering and len(scaled) <= MAX_OPTIMAL_ORDERING_PAIRS:
+        tree = optimal_leaf_ordering(tree, distances)
+    return tree, leaves_list(tree)
+
+
+def reorder_linkage(tree: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    Renumber the leaves of a linkage matrix to their positions in ``order``.
+
+    Args:
+        tree (np.ndarray): SciPy linkage matrix
+        order (np.ndarray): Leaf order (``leaves_list(tree)``)
+
+    Returns:
+        np.ndarray: Linkage matrix whose leaf ``i`` is the ``i``-th row in order
+    """
+    n = len(order)
+    position = np.empty(n, dtype=int)
+    position[order] = np.arange(n)
+    tree = tree.copy()
+    for column in (0, 1):
+        leaves = tree[:, column] < n
+        tree[leaves, column] = position[tree[leaves, column].astype(int)]
+    return tree
+
+
+def _cache_file(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.npz")
+
+
+def _read_cached_linkage(key: str, cache_dir: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Read a linkage matrix and leaf order from the disk cache, if present."""
+    path = _cache_file(key, cache_dir)
+    try:
+        with np.load(path) as cached:
+            tree, order = cached['linkage'], cached['order']
+    except (OSError, KeyError, ValueError):
+        return None
+    # The modification time orders the files for pruning
+    with contextlib.suppress(OSError):
+        os.utime(path)
+    return tree, order
+
+
+def _write_cached_linkage(key: str, tree: np.ndarray, order: np.ndarray, cache_dir: str) -> None:
+    """Write a linkage matrix and leaf order to the disk cache (best effort)."""
+    path = _cache_file(key, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, 'wb') as cache_file:
+            np.savez(cache_file, linkage=tree, order=order)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Error writing clustering cache {path}: {e}")
+        return
+    _prune_cache(cache_dir)
+
+
+def _prune_cache(cache_dir: str, keep: int = CLUSTERING_DISK_CACHE_FILES) -> None:
+    """Delete the least recently used ``.npz`` files beyond ``keep``."""
+    files = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.npz'):
+            with contextlib.suppress(OSError):
+                files.append((entry.stat().st_mtime, entry.path))
+    for _, path in sorted(files, reverse=True)[keep:]:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+
+@lru_cache(maxsize=CLUSTERING_CACHE_SIZE)
+def _cluster_cached(params: ClusteringParams, version: Tuple, cache_dir: str) -> Optional[Clustering]:
+    """Cluster the selected profiles (cached per data version)."""
+    profiles = load_profiles()
+    if profiles is None or profiles.version != version:
+        raise KeyError(params)
+
+    rows = np.isin(profiles.bait, params.baits) if params.baits else slice(None)
+    pairs, values = profiles.pairs[rows], profiles.values[rows]
+    if len(pairs) < 2:
+        return None
+    # Sorted by pair, so the key and the tree do not depend on the row order
+    # of the file
+    by_pair = np.argsort(pairs, kind='stable')
+    pairs, values = pairs[by_pair], values[by_pair]
+    bait, prey = profiles.bait[rows][by_pair], profiles.prey[rows][by_pair]
+    scaled = scale_rows(values, params.scale)
+
+    key = profile_key(pairs, scaled, params)
+    cached = _read_cached_linkage(key, cache_dir)
+    if cached is not None and len(cached[1]) == len(pairs):
+        tree, order = cached
+    else:
+        tree, order = compute_linkage(scaled, params)
+        _write_cached_linkage(key, tree, order, cache_dir)
+
+    return Clustering(
+        bait=bait[order],
+        prey=prey[order],
+        phenotypes=list(profiles.phenotypes),
+        values=values[order],
+        scaled=scaled[order],
+        linkage=reorder_linkage(tree, order),
+        params=params,
+        key=key,
+    )
+
+
+def cluster_profiles(params: ClusteringParams,
+                     cache_dir: str = CLUSTERING_CACHE_PATH) -> Optional[Clustering]:
+    """
+    Cluster the DataS4 profiles of all pairs, or of the pairs of some baits.
+
+    Args:
+        params (ClusteringParams): Clustering parameters and bait selection
+        cache_dir (str): Directory of the on-disk linkage cache
+
+    Returns:
+        Optional[Clustering]: Clustered profiles, or None if DataS4 is
+        unavailable or fewer than two pairs are selected
+    """
+    profiles = load_profiles()
+    if profiles is None:
+        return None
+    return _cluster_cached(params, profiles.version, cache_dir)
+
+
+def dendrogram_segments(tree: np.ndarray) -> np.ndarray:
+    """
+    Return the line segments of a dendrogram drawn next to the rows.
+
+    Args:
+        tree (np.ndarray): Linkage matrix whose leaves are in row order
+            (``Clustering.linkage``)
+
+    Returns:
+        np.ndarray: (segments, 4) array of ``row0, height0, row1, height1``;
+        leaf ``i`` sits at row ``i + 0.5`` and height 0
+    """
+    n = len(tree) + 1
+    left, right, heights = tree[:, 0].astype(int), tree[:, 1].astype(int), tree[:, 2]
+    position = np.empty(2 * n - 1)
+    position[:n] = np.arange(n) + 0.5
+    height = np.concatenate([np.zeros(n), heights])
+    # Children are always merged before their parent
+    for i in range(n - 1):
+        position[n + i] = (position[left[i]] + position[right[i]]) / 2
+    return np.concatenate([
+        np.column_stack([position[left], height[left], position[left], heights]),
+        np.column_stack([position[right], height[right], position[right], heights]),
+        np.column_stack([position[left], heights, position[right], heights]),
+    ])
+
+
+def clustering_chart(clustering: Clustering, width: int = PAGE_CONTENT_WIDTH):
+    """
+    Draw clustered profiles as a heatmap with its dendrogram.
+
+    Scrolling or dragging over the heatmap zooms and pans the rows of both
+    views; hovering a cell shows the pair and its scores.
+
+    Args:
+        clustering (Clustering): Clustered profiles
+        width (int): Chart width in pixels
+
+    Returns:
+        altair.HConcatChart: The chart, for ``st.altair_chart``
+    """
+    import altair as alt
+    import pandas as pd
+
+    n, n_phenotypes = clustering.values.shape
+    pairs = clustering.pairs
+    height = int(np.clip(n * 14, 240, 900))
+    rows = alt.Scale(domain=[0, n], nice=False, zero=False, reverse=True)
+
+    cells = pd.DataFrame({
+        'row': np.repeat(np.arange(n), n_phenotypes),
+        'pair': np.repeat(pairs, n_phenotypes),
+        'phenotype': np.tile(clustering.phenotypes, n),
+        'tops': clustering.values.ravel(),
+        'scaled': clustering.scaled.ravel(),
+    })
+    cells['row_end'] = cells['row'] + 1
+
+    if clustering.params.scale == 'zscore':
+        color_field, color_title = 'scaled', 'Z-score'
+    else:
+        color_field, color_title = 'tops', 'TopS score'
+    limit = float(np.abs(cells[color_field]).max()) or 1.0
+    tooltip = [
+        alt.Tooltip('pair:N', title='Pair'),
+        alt.Tooltip('phenotype:N', title='Phenotype'),
+        alt.Tooltip('tops:Q', title='TopS score', format='.2f'),
+    ]
+    if clustering.params.scale == 'zscore':
+        tooltip.append(alt.Tooltip('scaled:Q', title='Z-score', format='.2f'))
+
+    if n <= MAX_LABELLED_ROWS:
+        # Row i is labelled at its centre with the i-th pair name
+        labels = json.dumps(pairs)
+        axis = alt.Axis(orient='right', values=list(np.arange(n) + 0.5), labelExpr=f"{labels}[floor(datum.value)]",
+                        title=None, ticks=False, domain=False, grid=False)
+    else:
+        axis = None
+
+    zoom = alt.selection_interval(bind='scales', encodings=['y'])
+    heatmap = alt.Chart(cells).mark_rect().encode(
+        x=alt.X('phenotype:N', sort=clustering.phenotypes, title=None,
+                axis=alt.Axis(orient='top', labelAngle=0)),
+        y=alt.Y('row:Q', scale=rows, axis=axis),
+        y2='row_end',
+        color=alt.Color(f'{color_field}:Q', title=color_title,
+                        scale=alt.Scale(scheme='redblue', reverse=True, domain=[-limit, limit])),
+        tooltip=tooltip,
+    ).properties(width=min(width // 2, 60 * n_phenotypes), height=height).add_params(zoom)
+
+    segments = pd.DataFrame(dendrogram_segments(clustering.linkage),
+                            columns=['row0', 'height0', 'row1', 'height1'])
+    dendrogram = alt.Chart(segments).mark_rule(color='#3F3F3F').encode(
+        x=alt.X('height0:Q', title='Distance', scale=alt.Scale(reverse=True)),
+        x2='height1',
+        y=alt.Y('row0:Q', scale=rows, axis=None),
+        y2='row1',
+    ).properties(width=width // 4, height=height)
+
+    return alt.hconcat(dendrogram, heatmap, spacing=0).resolve_scale(y='shared')
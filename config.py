@@ -0,0 +1,75 @@
+"""
+Shared configuration for the Glyco Interactome application.
+
+Data locations and display names used by the Streamlit app and the
+supporting scripts live here so that helpers can import them without
+pulling in Streamlit.
+"""
+
+import os
+
+# Constants
+DATA_PATHS = {
+    'network_html': 'data/Total_html/',
+    'boxplot_normalized': 'data/boxplot_normalized/',
+    'boxplot_relative': 'data/boxplot_relative/',
+    'tops_score': 'data/TopS_Score/',
+    'quant_data': 'data/DataS3_GAP-MS_Quant_Processing.csv',
+    'clustering_data': 'data/DataS4_SubNetwork_ClusteringData.csv',
+    'abstract_image': 'data/image/Abstract.jpg',
+    'blank_image': 'data/blank.png'
+}
+
+# Figure directories shown on the protein-protein pair page
+FIGURE_TYPES = ['boxplot_normalized', 'boxplot_relative', 'tops_score']
+
+# Data paths the app can run without: pair figures are rendered from the
+# quant data when the pre-rendered PNG directories are not deployed
+OPTIONAL_DATA_PATHS = FIGURE_TYPES + ['blank_image']
+
+# GraphML subnetworks the network pages and the interactome are built from
+GRAPHML_PATH = 'data/graphml/'
+
+# Manifest written by build_networks.py next to the network pages
+NETWORK_MANIFEST = 'data/Total_html/manifest.json'
+
+# Incremental state of build_figures.py (local to each build, not deployed)
+FIGURE_BUILD_MANIFEST = 'data/figure_build_manifest.json'
+
+# Base URL of the network pages when they are served as static files
+# (see static_server.py); empty to inline them through components.html
+NETWORK_ASSET_URL = os.environ.get('GLYCO_NETWORK_ASSET_URL', '')
+
+# Base URL of api_server.py; when set, the app's exports link to its
+# streaming /api/export endpoint instead of building the archive in memory
+EXPORT_API_URL = os.environ.get('GLYCO_EXPORT_API_URL', '')
+
+# Downscaled figure variants built by image_variants.py
+IMAGE_VARIANTS_PATH = 'data/variants/'
+
+# Linkage matrices of the DataS4 profile clusterings (clustering.py)
+CLUSTERING_CACHE_PATH = '.clustering_cache/'
+
+# Sizes and SHA-256 of every file under data/ (python health_check.py --write-manifest)
+DATA_MANIFEST = 'data/manifest.json'
+
+# Hashes of the last verification, reused by health_check.py --incremental
+DATA_VERIFY_CACHE = '.data_verify_cache.json'
+
+# Approximate width of the main content area in the wide layout (CSS pixels)
+PAGE_CONTENT_WIDTH = 1400
+
+# Deployments kept awake by wake_up_streamlit.py
+STREAMLIT_APPS = [
+    "https://glycointeractome-2024.streamlit.app/"
+]
+
+GLYCOSYLATION_TYPES = {
+    'F': 'Fucosylated (F) type',
+    'S': 'Sialylated (S) type',
+    'FS': 'Sialofucosylated (FS) type',
+    'Neu': 'Neutral (Neu) type',
+    'HM': 'High Mannose (HM) type',
+    'Independent': 'Glycan-independent',
+    'Total': 'Total'
+}
@@ -0,0 +1,299 @@
+"""
+Data catalog for the Glyco Interactome application.
+
+Scans the data directories once and keeps a single index of the available
+network pages, protein pairs and figure files. The index is shared by every
+Streamlit session in the process and is only rebuilt when the modification
+time of one of the data directories changes, so page reruns resolve
+selections with dictionary lookups instead of directory listings.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Set, List, Tuple, Optional
+
+from config import DATA_PATHS, FIGURE_TYPES, NETWORK_MANIFEST
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two mtime checks of the data directories
+CATALOG_RECHECK_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class DataCatalog:
+    """Index of everything the app can display."""
+    network_conditions: Set[str] = field(default_factory=set)
+    network_subconditions: Dict[str, Set[str]] = field(default_factory=dict)
+    network_files: Dict[str, str] = field(default_factory=dict)
+    network_hashes: Dict[str, str] = field(default_factory=dict)
+    network_assets: Optional[str] = None
+    protein1_list: List[str] = field(default_factory=list)
+    protein2_dict: Dict[str, List[str]] = field(default_factory=dict)
+    figures: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    missing_paths: List[str] = field(default_factory=list)
+    fingerprint: Tuple = ()
+
+    def network_file(self, condition: str, subcondition: str = "") -> Optional[str]:
+        """Return the HTML path for a network condition, if available."""
+        key = f"{condition}_{subcondition}" if subcondition else condition
+        return self.network_files.get(key)
+
+    def network_hash(self, condition: str, subcondition: str = "") -> Optional[str]:
+        """Return the content hash of a network page, if the manifest has it."""
+        key = f"{condition}_{subcondition}" if subcondition else condition
+        return self.network_hashes.get(key)
+
+    def figure_file(self, edge_name: str, figure_type: str) -> Optional[str]:
+        """Return the figure path of ``figure_type`` for a pair, if available."""
+        return self.figures.get(edge_name, {}).get(figure_type)
+
+
+def _list_files(path: str, suffix: str) -> List[str]:
+    """Return the names of files in ``path`` ending with ``suffix``."""
+    if not os.path.isdir(path):
+        return []
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.name.endswith(suffix)]
+
+
+def _add_condition(base_name: str, condition1_set: Set[str],
+                   condition2_set: Dict[str, Set[str]]) -> None:
+    """Record a network name such as ``HM_Enhanced`` or ``Total``."""
+    if '_' in base_name:
+        p1, p2 = base_name.split('_', 1)  # Split only on first underscore
+        condition1_set.add(p1)
+        if p1 not in condition2_set:
+            condition2_set[p1] = set()
+        condition2_set[p1].add(p2)
+    else:
+        condition1_set.add(base_name)
+
+
+def load_network_manifest(html_path: str) -> Optional[Dict[str, Dict[str, object]]]:
+    """
+    Read the manifest of the network pages written by build_networks.py.
+
+    Args:
+        html_path (str): Path to directory containing HTML files
+
+    Returns:
+        Optional[Dict[str, Dict[str, object]]]: ``networks`` (network name ->
+        manifest entry, with ``html`` joined to ``html_path``) and the build
+        ``options``, or None if there is no usable manifest
+    """
+    manifest_path = os.path.join(html_path, os.path.basename(NETWORK_MANIFEST))
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+        return {
+            'networks': {
+                network: dict(entry, html=os.path.join(html_path, entry['html']))
+                for network, entry in manifest['networks'].items()
+            },
+            'options': dict(manifest.get('options', {})),
+        }
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Ignoring invalid network manifest {manifest_path}: {e}")
+        return None
+
+
+def get_network_conditions(html_path: str) -> Tuple[Set[str], Dict[str, Set[str]]]:
+    """
+    Extract available network conditions from HTML files.
+
+    Args:
+        html_path (str): Path to directory containing HTML files
+
+    Returns:
+        Tuple[Set[str], Dict[str, Set[str]]]: Primary conditions and secondary conditions
+    """
+    try:
+        condition1_set = set()
+        condition2_set = {}
+
+        if not os.path.exists(html_path):
+            logger.error(f"HTML path does not exist: {html_path}")
+            return set(), {}
+
+        for filename in _list_files(html_path, '.html'):
+            _add_condition(filename.replace('.html', ''), condition1_set, condition2_set)
+
+        return condition1_set, condition2_set
+
+    except Exception as e:
+        logger.error(f"Error extracting network conditions: {e}")
+        return set(), {}
+
+
+def get_protein_pairs(boxplot_path: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Extract available protein pairs from boxplot PNG files.
+
+    Args:
+        boxplot_path (str): Path to directory containing boxplot PNG files
+
+    Returns:
+        Tuple[List[str], Dict[str, List[str]]]: Primary proteins and secondary proteins
+    """
+    try:
+        protein1_set = set()
+        protein2_set = {}
+
+        if not os.path.exists(boxplot_path):
+            logger.error(f"Boxplot path does not exist: {boxplot_path}")
+            return [], {}
+
+        for filename in _list_files(boxplot_path, '.png'):
+            name_str = filename.replace('.png', '')
+            parts = name_str.split('_')
+            if len(parts) >= 2:
+                p1, p2 = parts[0], parts[1]
+                protein1_set.add(p1)
+                if p1 not in protein2_set:
+                    protein2_set[p1] = set()
+                protein2_set[p1].add(p2)
+
+        protein1_list = sorted(protein1_set)
+        protein2_dict = {x: sorted(protein2_set[x]) for x in protein2_set}
+
+        return protein1_list, protein2_dict
+
+    except Exception as e:
+        logger.error(f"Error extracting protein pairs: {e}")
+        return [], {}
+
+
+@timed('dir_scan', kind='fingerprint')
+def data_fingerprint(data_paths: Dict[str, str] = DATA_PATHS) -> Tuple:
+    """
+    Compute the modification-time fingerprint of the data paths.
+
+    Adding, removing or renaming a file changes the mtime of its directory,
+    which is all the catalog needs to notice.
+
+    Args:
+        data_paths (Dict[str, str]): Mapping of data path names to paths
+
+    Returns:
+        Tuple: ``(name, mtime_ns)`` pairs, with ``None`` for missing paths
+    """
+    fingerprint = []
+    for path_name, path_value in sorted(data_paths.items()):
+        try:
+            fingerprint.append((path_name, os.stat(path_value).st_mtime_ns))
+        except OSError:
+            fingerprint.append((path_name, None))
+    return tuple(fingerprint)
+
+
+@timed('dir_scan', kind='catalog')
+def build_catalog(data_paths: Dict[str, str] = DATA_PATHS) -> DataCatalog:
+    """
+    Scan the data directories and build a fresh catalog.
+
+    Args:
+        data_paths (Dict[str, str]): Mapping of data path names to paths
+
+    Returns:
+        DataCatalog: Index of networks, pairs and figures
+    """
+    start = time.perf_counter()
+    fingerprint = data_fingerprint(data_paths)
+    missing_paths = [path for name, path in data_paths.items() if not os.path.exists(path)]
+
+    html_path = data_paths['network_html']
+    network_manifest = load_network_manifest(html_path)
+    network_hashes = {}
+    network_assets = None
+    if network_manifest is None:
+        condition1_set, condition2_set = get_network_conditions(html_path)
+        network_files = {
+            filename.replace('.html', ''): os.path.join(html_path, filename)
+            for filename in _list_files(html_path, '.html')
+        }
+    else:
+        condition1_set, condition2_set = set(), {}
+        network_files = {}
+        network_assets = network_manifest['options'].get('assets')
+        for network, entry in network_manifest['networks'].items():
+            _add_condition(network, condition1_set, condition2_set)
+            network_files[network] = entry['html']
+            if entry.get('sha256'):
+                network_hashes[network] = entry['sha256']
+
+    protein1_list, protein2_dict = get_protein_pairs(data_paths['boxplot_normalized'])
+
+    figures: Dict[str, Dict[str, str]] = {}
+    for figure_type in FIGURE_TYPES:
+        figure_path = data_paths[figure_type]
+        for filename in _list_files(figure_path, '.png'):
+            edge_name = filename.replace('.png', '')
+            figures.setdefault(edge_name, {})[figure_type] = os.path.join(figure_path, filename)
+
+    catalog = DataCatalog(
+        network_conditions=condition1_set,
+        network_subconditions=condition2_set,
+        network_files=network_files,
+        network_hashes=network_hashes,
+        network_assets=network_assets,
+        protein1_list=protein1_list,
+        protein2_dict=protein2_dict,
+        figures=figures,
+        missing_paths=missing_paths,
+        fingerprint=fingerprint,
+    )
+    logger.info(
+        f"Built data catalog: {len(network_files)} networks, {len(figures)} pairs "
+        f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return catalog
+
+
+_catalog_lock = threading.Lock()
+_catalogs: Dict[Tuple, Tuple[DataCatalog, float]] = {}
+
+
+def get_catalog(data_paths: Dict[str, str] = DATA_PATHS) -> DataCatalog:
+    """
+    Return the shared catalog, rebuilding it only if the data changed.
+
+    The directory mtimes are checked at most once every
+    ``CATALOG_RECHECK_SECONDS``; in between, the cached catalog is returned
+    without touching the filesystem.
+
+    Args:
+        data_paths (Dict[str, str]): Mapping of data path names to paths
+
+    Returns:
+        DataCatalog: The current catalog
+    """
+    key = tuple(sorted(data_paths.items()))
+    now = time.monotonic()
+    cached = _catalogs.get(key)
+    if cached is not None and now - cached[1] < CATALOG_RECHECK_SECONDS:
+        return cached[0]
+
+    with _catalog_lock:
+        cached = _catalogs.get(key)
+        if cached is not None and now - cached[1] < CATALOG_RECHECK_SECONDS:
+            return cached[0]
+        if cached is None or cached[0].fingerprint != data_fingerprint(data_paths):
+            catalog = build_catalog(data_paths)
+        else:
+            catalog = cached[0]
+        _catalogs[key] = (catalog, now)
+        return catalog
+
+
+def invalidate_catalog() -> None:
+    """Drop the cached catalogs so the next lookup rescans the data."""
+    with _catalog_lock:
+        _catalogs.clear()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Differential Interaction Statistics for Glyco Interactome Network
+
+Reproduces the phenotype effect calls of ``DataS4`` from the DataS3
+replicates and regenerates the GraphML subnetworks from them:
+
+- TopS scores: ``X * ln(X / E)`` on the replicate means of the abundance
+  relative to HM, where ``E`` is the value expected from the pair and
+  phenotype totals
+- log2 fold changes and Welch t-test p-values (with Benjamini-Hochberg
+  q-values) of every phenotype against the reference phenotype (HM)
+- Enhanced/Suppressed calls where the TopS score passes the cutoff (and,
+  optionally, the fold change and significance thresholds); pairs with no
+  call in any phenotype are glycan-independent
+
+All statistics are computed once for every pair at the same time with NumPy;
+applying a new set of thresholds is a handful of array comparisons.
+
+Usage:
+    python diff_stats.py [--tops-cutoff 20] [--min-log2-fold X] [--max-qvalue Q] [--write-graphml [DIR]]
+"""
+
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import GRAPHML_PATH
+from figure_engine import QuantData, load_quant_data
+
+# Reference phenotype of the fold changes and t-tests
+REFERENCE_PHENOTYPE = 'HM'
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Cutoffs turning the statistics into Enhanced/Suppressed calls."""
+    tops_cutoff: float = 20.0
+    min_log2_fold: Optional[float] = None
+    max_qvalue: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class DifferentialStats:
+    """Per-pair, per-phenotype effect statistics."""
+    pairs: List[str]
+    bait: np.ndarray
+    prey: np.ndarray
+    phenotypes: List[str]
+    tops: np.ndarray         # (pairs, phenotypes) TopS score
+    log2_fold: np.ndarray    # (pairs, phenotypes) vs the reference phenotype
+    pvalues: np.ndarray      # (pairs, phenotypes) Welch t-test, NaN for the reference
+    qvalues: np.ndarray      # (pairs, phenotypes) Benjamini-Hochberg
+    reference: str = REFERENCE_PHENOTYPE
+
+
+@dataclass(frozen=True)
+class EffectCalls:
+    """Enhanced/Suppressed calls under one set of thresholds."""
+    enhanced: np.ndarray     # (pairs, phenotypes) bool
+    suppressed: np.ndarray   # (pairs, phenotypes) bool
+    independent: np.ndarray  # (pairs,) bool
+    thresholds: Thresholds
+
+
+def tops_scores(abundance: np.ndarray) -> np.ndarray:
+    """
+    Compute TopS scores from replicate abundances.
+
+    Args:
+        abundance (np.ndarray): (pairs, phenotypes, replicates) abundances
+
+    Returns:
+        np.ndarray: (pairs, phenotypes) scores; positive where a pair is
+        more abundant in a phenotype than expected from the totals
+    """
+    observed = np.nanmean(abundance, axis=2)
+    expected = observed.sum(axis=1, keepdims=True) * observed.sum(axis=0, keepdims=True) / observed.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = observed * np.log(observed / expected)
+    return np.where(observed > 0, scores, 0.0)
+
+
+def welch_test(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Two-sided Welch t-test of every phenotype against a reference.
+
+    Args:
+        values (np.ndarray): (pairs, phenotypes, replicates) values
+        reference (np.ndarray): (pairs, 1, replicates) reference values
+
+    Returns:
+        np.ndarray: (pairs, phenotypes) p-values, NaN where undefined
+    """
+    from scipy.special import stdtr
+
+    n1 = np.sum(~np.isnan(values), axis=2)
+    n2 = np.sum(~np.isnan(reference), axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v1 = np.nanvar(values, axis=2, ddof=1) / n1
+        v2 = np.nanvar(reference, axis=2, ddof=1) / n2
+        t = (np.nanmean(values, axis=2) - np.nanmean(reference, axis=2)) / np.sqrt(v1 + v2)
+        df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+        return 2 * stdtr(df, -np.abs(t))
+
+
+def benjamini_hochberg(pvalues: np.ndarray) -> np.ndarray:
+    """
+    Benjamini-Hochberg adjusted p-values over all non-NaN entries.
+
+    Args:
+        pvalues (np.ndarray): p-values of any shape
+
+    Returns:
+        np.ndarray: q-values of the same shape, NaN where the input is NaN
+    """
+    flat = pvalues.ravel()
+    valid = np.flatnonzero(~np.isnan(flat))
+    order = valid[np.argsort(flat[valid])]
+    ranked = flat[order] * len(order) / np.arange(1, len(order) + 1)
+    qvalues = np.full_like(flat, np.nan)
+    qvalues[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return qvalues.reshape(pvalues.shape)
+
+
+def compute_stats(data: QuantData, reference: str = REFERENCE_PHENOTYPE) -> DifferentialStats:
+    """
+    Compute the effect statistics of every pair.
+
+    Args:
+        data (QuantData): Loaded quant data
+        reference (str): Reference phenotype of fold changes and t-tests
+
+    Returns:
+        DifferentialStats: Statistics aligned on ``data.pairs``
+    """
+    column = data.phenotypes.index(reference)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_abundance = np.log2(data.normalized)
+        log_means = np.nanmean(log_abundance, axis=2)
+    pvalues = welch_test(log_abundance, log_abundance[:, column:column + 1])
+    pvalues[:, column] = np.nan
+
+    return DifferentialStats(
+        pairs=data.pairs,
+        bait=data.bait,
+        prey=data.prey,
+        phenotypes=data.phenotypes,
+        tops=tops_scores(data.relative),
+        log2_fold=log_means - log_means[:, column:column + 1],
+        pvalues=pvalues,
+        qvalues=benjamini_hochberg(pvalues),
+        reference=reference,
+    )
+
+
+def call_effects(stats: DifferentialStats, thresholds: Thresholds = Thresholds()) -> EffectCalls:
+    """
+    Apply thresholds to the statistics.
+
+    Args:
+        stats (DifferentialStats): Precomputed statistics
+        thresholds (Thresholds): Cutoffs to apply
+
+    Returns:
+        EffectCalls: Enhanced/Suppressed/independent calls
+    """
+    enhanced = stats.tops >= thresholds.tops_cutoff
+    suppressed = stats.tops <= -thresholds.tops_cutoff
+    if thresholds.min_log2_fold is not None:
+        # The reference phenotype has no fold change of its own
+        strong = np.abs(stats.log2_fold) >= thresholds.min_log2_fold
+        strong[:, stats.phenotypes.index(stats.reference)] = True
+        enhanced &= strong
+        suppressed &= strong
+    if thresholds.max_qvalue is not None:
+        significant = ~(stats.qvalues > thresholds.max_qvalue)
+        enhanced &= significant
+        suppressed &= significant
+    independent = ~(enhanced | suppressed).any(axis=1)
+    return EffectCalls(enhanced, suppressed, independent, thresholds)
+
+
+def subnetwork_edges(stats: DifferentialStats, calls: EffectCalls) -> Dict[str, np.ndarray]:
+    """
+    Return the pair rows of every subnetwork.
+
+    Args:
+        stats (DifferentialStats): Precomputed statistics
+        calls (EffectCalls): Effect calls
+
+    Returns:
+        Dict[str, np.ndarray]: Subnetwork name (GraphML stem, e.g.
+        ``HM_Enhanced``) -> row indices
+    """
+    subnetworks = {'Total': np.arange(len(stats.pairs)), 'Independent': np.flatnonzero(calls.independent)}
+    for i, phenotype in enumerate(stats.phenotypes):
+        subnetworks[f"{phenotype}_Enhanced"] = np.flatnonzero(calls.enhanced[:, i])
+        subnetworks[f"{phenotype}_Suppressed"] = np.flatnonzero(calls.suppressed[:, i])
+    return subnetworks
+
+
+def calls_frame(stats: DifferentialStats, calls: EffectCalls):
+    """
+    Arrange the calls in the layout of ``DataS4``.
+
+    Args:
+        stats (DifferentialStats): Precomputed statistics
+        calls (EffectCalls): Effect calls
+
+    Returns:
+        pandas.DataFrame: Bait, Prey, TopS per phenotype, Independent and the
+        ``<phenotype>_Enhanced``/``_Suppressed`` flag columns
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame({'Bait': stats.bait, 'Prey': stats.prey})
+    for i, phenotype in enumerate(stats.phenotypes):
+        frame[phenotype] = stats.tops[:, i]
+    frame['Independent'] = np.where(calls.independent, 'Independent', None)
+    for suffix, flag, called in (('Enhanced', 'Up', calls.enhanced), ('Suppressed', 'Down', calls.suppressed)):
+        for i, phenotype in enumerate(stats.phenotypes):
+            frame[f"{phenotype}_{suffix}"] = np.where(called[:, i], f"{phenotype}_{flag}", None)
+    return frame
+
+
+def write_graphml(stats: DifferentialStats, calls: EffectCalls,
+                  graphml_dir: str = GRAPHML_PATH) -> Dict[str, int]:
+    """
+    Regenerate the GraphML subnetworks from the calls.
+
+    Args:
+        stats (DifferentialStats): Precomputed statistics
+        calls (EffectCalls): Effect calls
+        graphml_dir (str): Output directory
+
+    Returns:
+        Dict[str, int]: Subnetwork name -> edge count
+    """
+    import networkx as nx
+
+    os.makedirs(graphml_dir, exist_ok=True)
+    counts = {}
+    for name, rows in subnetwork_edges(stats, calls).items():
+        # Bait-major order, as in DataS4 and the published files
+        rows = rows[np.lexsort((stats.prey[rows], stats.bait[rows]))]
+        graph = nx.Graph()
+        graph.add_edges_from(zip(stats.bait[rows], stats.prey[rows]))
+        path = os.path.join(graphml_dir, f"{name}.graphml")
+        tmp_path = f"{path}.tmp"
+        nx.write_graphml(graph, tmp_path)
+        os.replace(tmp_path, path)
+        counts[name] = graph.number_of_edges()
+    return counts
+
+
+def main() -> int:
+    """Compute the effect calls and optionally regenerate the GraphML files."""
+    parser = argparse.ArgumentParser(description="Compute phenotype effect calls from DataS3.")
+    parser.add_argument('--tops-cutoff', type=float, default=Thresholds.tops_cutoff,
+                        help="minimum |TopS| of an Enhanced/Suppressed call")
+    parser.add_argument('--min-log2-fold', type=float, help="minimum |log2 fold change| vs HM")
+    parser.add_argument('--max-qvalue', type=float, help="maximum Benjamini-Hochberg q-value")
+    parser.add_argument('--write-graphml', nargs='?', const=GRAPHML_PATH, metavar='DIR',
+                        help=f"write the subnetworks as GraphML (default {GRAPHML_PATH})")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Differential Statistics")
+    print("=" * 50)
+
+    data = load_quant_data()
+    if data is None:
+        print("❌ Could not load the quant data")
+        return 1
+
+    start = time.perf_counter()
+    stats = compute_stats(data)
+    computed = time.perf_counter()
+    thresholds = Thresholds(args.tops_cutoff, args.min_log2_fold, args.max_qvalue)
+    calls = call_effects(stats, thresholds)
+    called = time.perf_counter()
+    print(f"📊 {len(stats.pairs)} pairs: statistics in {(computed - start) * 1000:.1f} ms, "
+          f"calls in {(called - computed) * 1000:.2f} ms")
+
+    published = ~np.isnan(data.tops).all(axis=1)
+    for name, rows in subnetwork_edges(stats, calls).items():
+        print(f"  {name}: {len(rows)} interactions")
+    if published.any():
+        drift = np.nanmax(np.abs(stats.tops - data.tops))
+        print(f"🔍 Largest difference from the published TopS scores: {drift:.4f}")
+
+    if args.write_graphml:
+        counts = write_graphml(stats, calls, args.write_graphml)
+        print(f"✅ Wrote {len(counts)} GraphML subnetworks to {args.write_graphml}")
+        print("   Run build_networks.py to update the network pages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
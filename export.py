@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Bulk Export for Glyco Interactome Network
+
+Packs selected pairs and networks into one zip archive:
+
+- the pairs' three figures (pre-rendered PNGs when deployed, otherwise
+  rendered from the quant data at print resolution)
+- their DataS3 and DataS4 rows, in the original CSV layout
+- the GraphML sources and HTML pages of the selected networks and, by
+  default, of every subnetwork the pairs belong to
+- ``export.json`` describing the selection and listing every file
+
+The archive is produced by a streaming writer: files are compressed chunk by
+chunk into a zip stream that is handed out as it grows, so memory use does
+not depend on the size of the selection.
+
+Usage:
+    python export.py [--pairs BSG_LAMP1 ...] [--bait BSG] [--networks HM_Enhanced ...] [-o export.zip]
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import zipfile
+import argparse
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Set, Tuple
+
+from config import DATA_PATHS, FIGURE_TYPES, GRAPHML_PATH
+from data_catalog import get_catalog
+from image_variants import VARIANT_WIDTHS
+
+# Size of the chunks handed out by iter_export and read from source files
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Header rows of the exported CSV tables
+_CSV_HEADER_LINES = {
+    'quant_data': 2,
+    'clustering_data': 1,
+}
+
+
+@dataclass(frozen=True)
+class ExportSelection:
+    """What to put in an export archive."""
+    pairs: Tuple[str, ...] = ()
+    networks: Tuple[str, ...] = ()
+    figures: bool = True
+    related_networks: bool = True
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target collecting the zip stream between drains."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes written since the last drain."""
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _pair_key(fields: List[str], table: str) -> str:
+    """Return the pair name of a CSV row of DataS3 or DataS4."""
+    return fields[0] if table == 'quant_data' else f"{fields[0]}_{fields[1]}"
+
+
+def _csv_rows(table: str, pairs: Set[str]) -> Iterator[bytes]:
+    """Yield the header and the rows of ``pairs`` of a CSV table, unchanged."""
+    header_lines = _CSV_HEADER_LINES[table]
+    with open(DATA_PATHS[table], 'r', encoding='utf-8-sig', newline='') as table_file:
+        for number, line in enumerate(table_file):
+            if number < header_lines:
+                yield line.encode('utf-8')
+                continue
+            fields = next(csv.reader([line]), [])
+            if len(fields) > 1 and _pair_key(fields, table) in pairs:
+                yield line.encode('utf-8')
+
+
+def _file_chunks(path: str) -> Iterator[bytes]:
+    """Yield the content of a file in chunks."""
+    with open(path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(EXPORT_CHUNK_SIZE), b''):
+            yield chunk
+
+
+def related_networks(pairs: List[str]) -> List[str]:
+    """
+    Return the subnetworks (other than Total) containing any of the pairs.
+
+    Args:
+        pairs (List[str]): Pair names, e.g. ``BSG_LAMP1``
+
+    Returns:
+        List[str]: Network names, e.g. ``HM_Enhanced``
+    """
+    from figure_engine import load_quant_data
+    from interactome import load_interactome
+
+    quant_data = load_quant_data()
+    interactome = load_interactome()
+    if quant_data is None or interactome is None:
+        return []
+    networks: Set[str] = set()
+    for pair in pairs:
+        if pair not in quant_data:
+            continue
+        row = quant_data.index[pair]
+        edge = interactome.edge_id(quant_data.bait[row], quant_data.prey[row])
+        if edge is not None:
+            networks.update(interactome.edge_conditions(edge))
+    networks.discard('Total')
+    return sorted(networks)
+
+
+def plan_export(selection: ExportSelection) -> List[Tuple[str, object]]:
+    """
+    List the archive entries of a selection.
+
+    Args:
+        selection (ExportSelection): What to export
+
+    Returns:
+        List[Tuple[str, object]]: ``(archive name, source)`` where the source
+        is a file path, a ``(table, pairs)`` CSV filter or a
+        ``(figure_type, pair)`` figure to render
+    """
+    catalog = get_catalog()
+    pairs = list(dict.fromkeys(selection.pairs))
+    entries: List[Tuple[str, object]] = []
+
+    if pairs:
+        for table in _CSV_HEADER_LINES:
+            if os.path.exists(DATA_PATHS[table]):
+                entries.append((f"data/{os.path.basename(DATA_PATHS[table])}", (table, frozenset(pairs))))
+
+    if selection.figures:
+        for pair in pairs:
+            for figure_type in FIGURE_TYPES:
+                name = f"figures/{figure_type}/{pair}.png"
+                entries.append((name, catalog.figure_file(pair, figure_type) or (figure_type, pair)))
+
+    networks = list(selection.networks)
+    if selection.related_networks:
+        networks += related_networks(pairs)
+    html_files = {name.lower(): path for name, path in catalog.network_files.items()}
+    graphml_files = {
+        name[:-len('.graphml')].lower(): os.path.join(GRAPHML_PATH, name)
+        for name in (os.listdir(GRAPHML_PATH) if os.path.isdir(GRAPHML_PATH) else [])
+        if name.endswith('.graphml')
+    }
+    for network in dict.fromkeys(network.lower() for network in networks):
+        for folder, files in (('graphml', graphml_files), ('html', html_files)):
+            if network in files:
+                entries.append((f"networks/{folder}/{os.path.basename(files[network])}", files[network]))
+    return entries
+
+
+def iter_export(selection: ExportSelection) -> Iterator[bytes]:
+    """
+    Stream a zip archive of a selection.
+
+    Args:
+        selection (ExportSelection): What to export
+
+    Yields:
+        bytes: Consecutive chunks of the archive
+    """
+    from figure_engine import render_figure
+
+    sink = _ChunkSink()
+    files: List[str] = []
+    skipped: List[str] = []
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, source in plan_export(selection):
+            if isinstance(source, str):
+                chunks = _file_chunks(source)
+            elif source[0] in _CSV_HEADER_LINES:
+                chunks = _csv_rows(*source)
+            else:
+                figure_bytes = render_figure(source[0], source[1], VARIANT_WIDTHS['print'])
+                if figure_bytes is None:
+                    skipped.append(name)
+                    continue
+                chunks = iter([figure_bytes])
+
+            # PNGs are already compressed
+            compress_type = zipfile.ZIP_STORED if name.endswith('.png') else zipfile.ZIP_DEFLATED
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = compress_type
+            with archive.open(info, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if sink.pending >= EXPORT_CHUNK_SIZE:
+                        yield sink.drain()
+            files.append(name)
+
+        manifest = {'selection': asdict(selection), 'files': files, 'unavailable': skipped}
+        archive.writestr('export.json', json.dumps(manifest, indent=1))
+    yield sink.drain()
+
+
+def write_export(selection: ExportSelection, path: str) -> int:
+    """
+    Write the archive of a selection to a file.
+
+    Args:
+        selection (ExportSelection): What to export
+        path (str): Output zip path
+
+    Returns:
+        int: Archive size in bytes
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as zip_file:
+        for chunk in iter_export(selection):
+            zip_file.write(chunk)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def main() -> int:
+    """Export pairs and networks to a zip archive."""
+    parser = argparse.ArgumentParser(description="Export pairs and networks as a zip archive.")
+    parser.add_argument('--pairs', nargs='*', default=[], help="pairs to export (e.g. BSG_LAMP1)")
+    parser.add_argument('--bait', action='append', default=[], help="export every pair of this bait")
+    parser.add_argument('--networks', nargs='*', default=[], help="networks to export (e.g. HM_Enhanced)")
+    parser.add_argument('--no-figures', action='store_true', help="leave out the pair figures")
+    parser.add_argument('--no-related', action='store_true',
+                        help="only export the networks given with --networks")
+    parser.add_argument('-o', '--output', default='export.zip', help="output zip path")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Export")
+    print("=" * 50)
+
+    pairs = list(args.pairs)
+    if args.bait:
+        from figure_engine import load_quant_data
+
+        quant_data = load_quant_data()
+        if quant_data is None:
+            print("❌ Could not load the quant data")
+            return 1
+        pairs += [pair for pair, bait in zip(quant_data.pairs, quant_data.bait) if bait in args.bait]
+    if not pairs and not args.networks:
+        print("❌ Nothing selected; use --pairs, --bait or --networks")
+        return 1
+
+    selection = ExportSelection(
+        pairs=tuple(pairs),
+        networks=tuple(args.networks),
+        figures=not args.no_figures,
+        related_networks=not args.no_related,
+    )
+    start = time.perf_counter()
+    size = write_export(selection, args.output)
+    print(f"✅ {args.output}: {len(selection.pairs)} pairs, {size / 1024:.1f} KB "
+          f"in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
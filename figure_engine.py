@@ -0,0 +1,397 @@
+"""
+On-demand figure rendering for protein-protein pairs.
+
+Every figure on the pair page is a view of one row of the GAP-MS quant table
+(``DataS3``) or of the phenotype effect table (``DataS4``). This module loads
+both tables once (from their columnar stores, see ``quant_store.py``) into
+NumPy arrays indexed by pair and renders the normalized/relative abundance
+boxplots and the TopS score bars on request, keeping the encoded PNG bytes in
+an LRU cache. Comparisons of many pairs are drawn as a single heatmap or
+faceted bar chart.
+"""
+
+import io
+import os
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import DATA_PATHS
+from metrics import timed
+from quant_store import load_clustering_table, load_quant_table, store_path
+
+logger = logging.getLogger(__name__)
+
+# Number of rendered figures kept in memory
+FIGURE_CACHE_SIZE = 512
+
+# Number of rendered comparison figures kept in memory
+COMPARISON_CACHE_SIZE = 64
+
+# Bump whenever plot_pair changes so build_figures.py re-renders everything
+FIGURE_STYLE_VERSION = 1
+
+# Display label and box color of each phenotype, in plotting order
+PHENOTYPE_LABELS = {
+    'HM': 'HM',
+    'Neu': 'Neu',
+    'F': 'Fuc',
+    'S': 'Sia',
+    'FS': 'SiaFuc',
+}
+
+PHENOTYPE_COLORS = {
+    'HM': '#B04A45',
+    'Neu': '#D5843F',
+    'F': '#529145',
+    'S': '#CC79A7',
+    'FS': '#44739E',
+}
+
+# Figure type -> (measure, y-axis label)
+FIGURE_MEASURES = {
+    'boxplot_normalized': ('normalized', 'Normalized Abundance'),
+    'boxplot_relative': ('relative', 'Relative Abundance'),
+    'tops_score': ('tops', 'TopS Score (Average)'),
+}
+
+@dataclass(frozen=True)
+class QuantData:
+    """Per-pair quantification arrays aligned on a common pair index."""
+    pairs: List[str]
+    bait: np.ndarray
+    prey: np.ndarray
+    bait_id: np.ndarray
+    prey_id: np.ndarray
+    phenotypes: List[str]
+    normalized: np.ndarray  # (pairs, phenotypes, replicates)
+    relative: np.ndarray    # (pairs, phenotypes, replicates)
+    tops: np.ndarray        # (pairs, phenotypes), NaN where DataS4 has no row
+    version: Tuple = ()
+    index: Dict[str, int] = field(default_factory=dict)
+
+    def __contains__(self, pair: str) -> bool:
+        return pair in self.index
+
+    def measure(self, name: str) -> np.ndarray:
+        """Return the array for ``normalized``, ``relative`` or ``tops``."""
+        return getattr(self, name)
+
+    def partners(self) -> Dict[str, List[str]]:
+        """Return bait -> sorted prey list."""
+        partners: Dict[str, List[str]] = {}
+        for bait, prey in zip(self.bait, self.prey):
+            partners.setdefault(bait, []).append(prey)
+        return {bait: sorted(preys) for bait, preys in sorted(partners.items())}
+
+
+def _file_version(*paths: str) -> Tuple:
+    """Return an ``(path, mtime_ns, size)`` tuple used to detect data changes."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+@timed('data_load', source='quant_data')
+def _build_quant_data(quant_path: str, clustering_path: str, version: Tuple) -> QuantData:
+    """Load DataS3 and DataS4 into a ``QuantData`` instance."""
+    parsed = load_quant_table(quant_path)
+    pairs = list(parsed['pairs'])
+    phenotypes = parsed['phenotypes']
+    index = {pair: i for i, pair in enumerate(pairs)}
+
+    tops = np.full((len(pairs), len(phenotypes)), np.nan)
+    if os.path.exists(clustering_path) or os.path.exists(store_path(clustering_path)):
+        clustering = load_clustering_table(clustering_path)
+        rows = (clustering['Bait'].astype(str) + '_' + clustering['Prey'].astype(str)).map(index)
+        matched = rows.notna().to_numpy()
+        tops[rows[matched].astype(int).to_numpy()] = clustering.loc[matched, phenotypes].to_numpy(dtype=float)
+
+    return QuantData(
+        pairs=pairs,
+        bait=parsed['bait'],
+        prey=parsed['prey'],
+        bait_id=parsed['bait_id'],
+        prey_id=parsed['prey_id'],
+        phenotypes=phenotypes,
+        normalized=parsed['normalized'],
+        relative=parsed['relative'],
+        tops=tops,
+        version=version,
+        index=index,
+    )
+
+
+_quant_lock = threading.Lock()
+_quant_data: Optional[QuantData] = None
+
+
+def load_quant_data(quant_path: str = DATA_PATHS['quant_data'],
+                    clustering_path: str = DATA_PATHS['clustering_data']) -> Optional[QuantData]:
+    """
+    Return the shared quant data, reloading it only if the files changed.
+
+    Args:
+        quant_path (str): Path to the DataS3 CSV file
+        clustering_path (str): Path to the DataS4 CSV file
+
+    Returns:
+        Optional[QuantData]: The loaded data, or None if DataS3 is unavailable
+    """
+    global _quant_data
+
+    version = _file_version(quant_path, clustering_path,
+                            store_path(quant_path), store_path(clustering_path))
+    if _quant_data is not None and _quant_data.version == version:
+        return _quant_data
+
+    with _quant_lock:
+        if _quant_data is not None and _quant_data.version == version:
+            return _quant_data
+        if not os.path.exists(quant_path) and not os.path.exists(store_path(quant_path)):
+            logger.error(f"Quant data file does not exist: {quant_path}")
+            return None
+        try:
+            _quant_data = _build_quant_data(quant_path, clustering_path, version)
+        except Exception as e:
+            logger.error(f"Error loading quant data: {e}")
+            return None
+        return _quant_data
+
+
+def plot_pair(ax, data: QuantData, figure_type: str, row: int) -> None:
+    """
+    Draw one figure of a pair on a Matplotlib axes.
+
+    Args:
+        ax: Matplotlib axes to draw on
+        data (QuantData): Loaded quant data
+        figure_type (str): One of ``FIGURE_MEASURES``
+        row (int): Row of the pair in ``data``
+    """
+    measure, ylabel = FIGURE_MEASURES[figure_type]
+    labels = [PHENOTYPE_LABELS.get(p, p) for p in data.phenotypes]
+    colors = [PHENOTYPE_COLORS.get(p, '#808080') for p in data.phenotypes]
+    positions = np.arange(len(data.phenotypes))
+
+    if measure == 'tops':
+        ax.bar(positions, data.tops[row], width=0.8, color=colors, alpha=0.9)
+        ax.axhline(0, color='black', linewidth=1)
+    else:
+        values = data.measure(measure)[row]
+        boxes = ax.boxplot(
+            [v[~np.isnan(v)] for v in values],
+            positions=positions,
+            widths=0.8,
+            patch_artist=True,
+            medianprops={'color': '#3F3F3F', 'linewidth': 1.5},
+            whiskerprops={'color': '#3F3F3F', 'linewidth': 1.5},
+            capprops={'color': '#3F3F3F', 'linewidth': 1.5},
+            boxprops={'edgecolor': '#3F3F3F', 'linewidth': 1.5},
+        )
+        for patch, color in zip(boxes['boxes'], colors):
+            patch.set_facecolor(color)
+
+    ax.set_xticks(positions)
+    ax.set_xticklabels(labels)
+    ax.set_xlim(-0.5, len(positions) - 0.5)
+    ax.set_ylabel(ylabel)
+    ax.set_title(data.pairs[row])
+    ax.tick_params(length=0)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+@timed('render', kind='figure')
+def _render_cached(figure_type: str, pair: str, width: int, version: Tuple) -> bytes:
+    """Render a pair figure to PNG bytes (cached per data version)."""
+    from matplotlib.figure import Figure
+
+    data = load_quant_data()
+    if data is None or data.version != version:
+        raise KeyError(pair)
+
+    figure = Figure(figsize=(8, 6))
+    plot_pair(figure.add_subplot(), data, figure_type, data.index[pair])
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=width / 8)
+    return buffer.getvalue()
+
+
+def render_figure(figure_type: str, pair: str, width: int = 960) -> Optional[bytes]:
+    """
+    Render one figure of a pair as PNG bytes.
+
+    Args:
+        figure_type (str): One of ``FIGURE_MEASURES``
+        pair (str): Pair name, e.g. ``BSG_ADAM9``
+        width (int): Output width in pixels
+
+    Returns:
+        Optional[bytes]: PNG bytes, or None if the pair has no data
+    """
+    data = load_quant_data()
+    if data is None or pair not in data:
+        return None
+    if figure_type == 'tops_score' and np.isnan(data.tops[data.index[pair]]).all():
+        return None
+    return _render_cached(figure_type, pair, int(width), data.version)
+
+
+def comparison_values(data: QuantData, figure_type: str, rows: np.ndarray) -> Tuple[np.ndarray, str]:
+    """
+    Summarize the pairs of a comparison as one value per phenotype.
+
+    Abundances are compared on a log2 scale: normalized abundance relative
+    to the pair's own mean, relative abundance relative to HM. TopS scores
+    are used as they are.
+
+    Args:
+        data (QuantData): Loaded quant data
+        figure_type (str): One of ``FIGURE_MEASURES``
+        rows (np.ndarray): Rows of the pairs in ``data``
+
+    Returns:
+        Tuple[np.ndarray, str]: (pairs, phenotypes) values and their label
+    """
+    measure, _ = FIGURE_MEASURES[figure_type]
+    if measure == 'tops':
+        return data.tops[rows], 'TopS Score'
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_means = np.log2(np.nanmean(data.measure(measure)[rows], axis=2))
+    if measure == 'relative':
+        return log_means - np.log2(100), 'log2 Abundance Relative to HM'
+    return log_means - np.nanmean(log_means, axis=1, keepdims=True), 'log2 Abundance (vs pair mean)'
+
+
+def plot_heatmap(ax, data: QuantData, figure_type: str, rows: np.ndarray):
+    """
+    Draw pairs x phenotypes as one diverging heatmap.
+
+    Args:
+        ax: Matplotlib axes to draw on
+        data (QuantData): Loaded quant data
+        figure_type (str): One of ``FIGURE_MEASURES``
+        rows (np.ndarray): Rows of the pairs in ``data``
+
+    Returns:
+        Matplotlib image, for the colorbar
+    """
+    values, label = comparison_values(data, figure_type, rows)
+    limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+    image = ax.imshow(np.ma.masked_invalid(values), cmap='RdBu_r', vmin=-limit, vmax=limit,
+                      aspect='auto', interpolation='nearest')
+    ax.set_xticks(np.arange(len(data.phenotypes)))
+    ax.set_xticklabels([PHENOTYPE_LABELS.get(p, p) for p in data.phenotypes])
+    ax.set_yticks(np.arange(len(rows)))
+    ax.set_yticklabels([data.pairs[row] for row in rows])
+    ax.xaxis.tick_top()
+    ax.tick_params(length=0)
+    ax.set_title(label, pad=24)
+    return image
+
+
+def plot_grid(ax, data: QuantData, figure_type: str, rows: np.ndarray) -> None:
+    """
+    Draw the phenotype profile of several pairs side by side on one axes.
+
+    Every pair is a facet of phenotype bars (replicate mean, with the
+    replicate standard deviation for abundances); all facets are drawn by a
+    single bar call.
+
+    Args:
+        ax: Matplotlib axes to draw on
+        data (QuantData): Loaded quant data
+        figure_type (str): One of ``FIGURE_MEASURES``
+        rows (np.ndarray): Rows of the pairs in ``data``
+    """
+    from matplotlib.patches import Patch
+
+    measure, ylabel = FIGURE_MEASURES[figure_type]
+    n_phenotypes = len(data.phenotypes)
+    slot = n_phenotypes + 1
+    positions = (np.arange(len(rows))[:, None] * slot + np.arange(n_phenotypes)).ravel()
+    colors = [PHENOTYPE_COLORS.get(p, '#808080') for p in data.phenotypes] * len(rows)
+
+    if measure == 'tops':
+        heights, errors = data.tops[rows].ravel(), None
+        ax.axhline(0, color='black', linewidth=1)
+    else:
+        values = data.measure(measure)[rows]
+        heights = np.nanmean(values, axis=2).ravel()
+        errors = np.nanstd(values, axis=2, ddof=1).ravel()
+        if measure == 'normalized':
+            # Abundances of different pairs span orders of magnitude
+            ax.set_yscale('log')
+    ax.bar(positions, heights, width=0.8, color=colors, alpha=0.9,
+           yerr=errors, error_kw={'ecolor': '#3F3F3F', 'elinewidth': 1, 'capsize': 1.5})
+
+    centers = np.arange(len(rows)) * slot + (n_phenotypes - 1) / 2
+    ax.set_xticks(centers)
+    ax.set_xticklabels([data.pairs[row] for row in rows], rotation=45, ha='right')
+    for boundary in np.arange(1, len(rows)) * slot - 1:
+        ax.axvline(boundary, color='#D0D0D0', linewidth=0.8)
+    ax.set_xlim(-1, len(rows) * slot - 1)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(length=0)
+    handles = [
+        Patch(color=PHENOTYPE_COLORS.get(p, '#808080'), alpha=0.9, label=PHENOTYPE_LABELS.get(p, p))
+        for p in data.phenotypes
+    ]
+    ax.legend(handles=handles, ncol=n_phenotypes, loc='lower center',
+              bbox_to_anchor=(0.5, 1.0), frameon=False)
+
+
+@lru_cache(maxsize=COMPARISON_CACHE_SIZE)
+@timed('render', kind='comparison')
+def _render_comparison_cached(kind: str, figure_type: str, pairs: Tuple[str, ...],
+                              width: int, version: Tuple) -> bytes:
+    """Render a comparison figure to PNG bytes (cached per data version)."""
+    from matplotlib.figure import Figure
+
+    data = load_quant_data()
+    if data is None or data.version != version:
+        raise KeyError(pairs)
+
+    rows = np.array([data.index[pair] for pair in pairs])
+    if kind == 'heatmap':
+        figure = Figure(figsize=(8, 1.5 + 0.28 * len(rows)), layout='constrained')
+        ax = figure.add_subplot()
+        figure.colorbar(plot_heatmap(ax, data, figure_type, rows), ax=ax, shrink=0.8)
+    else:
+        figure = Figure(figsize=(8, 4.5), layout='constrained')
+        plot_grid(figure.add_subplot(), data, figure_type, rows)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=width / 8)
+    return buffer.getvalue()
+
+
+def render_comparison(kind: str, figure_type: str, pairs: List[str], width: int = 1400) -> Optional[bytes]:
+    """
+    Render several pairs in one figure as PNG bytes.
+
+    Args:
+        kind (str): ``heatmap`` (pairs x phenotypes) or ``grid`` (side-by-side
+            phenotype bars)
+        figure_type (str): One of ``FIGURE_MEASURES``
+        pairs (List[str]): Pair names, in display order
+        width (int): Output width in pixels
+
+    Returns:
+        Optional[bytes]: PNG bytes, or None if none of the pairs has data
+    """
+    data = load_quant_data()
+    if data is None:
+        return None
+    pairs = tuple(pair for pair in pairs if pair in data)
+    if not pairs:
+        return None
+    return _render_comparison_cached(kind, figure_type, pairs, int(width), data.version)
@@ -5,15 +5,57 @@ Health Check Script for Glyco Interactome Network
 This script verifies that all required dependencies and data files are present
 for the application to run successfully.
 
+It also cross-checks the data: every DataS3 pair has a figure in each
+deployed figure directory, every GraphML network has its HTML page, and the
+pages match the hashes recorded by build_networks.py. With ``--verify``,
+every file under ``data/`` is hashed in a thread pool and compared with the
+manifest (sizes and SHA-256) written by ``--write-manifest`` after a data
+build; ``--incremental`` only re-hashes files whose size or mtime changed
+since the last verification.
+
 Usage:
-    python health_check.py
+    python health_check.py [--verify [--incremental]] [--workers N]
+    python health_check.py --write-manifest
 """
 
 import os
 import sys
+import json
+import time
+import hashlib
+import argparse
 import importlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    DATA_MANIFEST,
+    DATA_PATHS,
+    DATA_VERIFY_CACHE,
+    FIGURE_BUILD_MANIFEST,
+    FIGURE_TYPES,
+    GRAPHML_PATH,
+    IMAGE_VARIANTS_PATH,
+    NETWORK_MANIFEST,
+)
+from precompress import ENCODING_SUFFIXES, PRECOMPRESS_SUFFIXES
+
+# Root of the files listed in the data manifest
+DATA_ROOT = 'data/'
+
+# Data manifest format version
+DATA_MANIFEST_VERSION = 1
+
+# Read size when hashing files
+HASH_CHUNK_SIZE = 1 << 20
+
+# Offending paths listed per problem before the rest are only counted
+MAX_LISTED_ISSUES = 10
+
+# Leading bytes of the image formats served by the app (data/blank.png is a JPEG)
+IMAGE_SIGNATURES = (b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff')
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg')
 
 
 def check_python_version() -> Tuple[bool, str]:
@@ -127,6 +169,322 @@ def check_data_samples() -> List[Tuple[bool, str]]:
     return sample_checks
 
 
+def _issues(success: bool, summary: str, paths: List[str]) -> List[Tuple[bool, str]]:
+    """Return a summary result followed by the first offending paths."""
+    results = [(success, summary)]
+    results += [(True, f"   {path}") for path in paths[:MAX_LISTED_ISSUES]]
+    if len(paths) > MAX_LISTED_ISSUES:
+        results.append((True, f"   ... and {len(paths) - MAX_LISTED_ISSUES} more"))
+    return results
+
+
+def data_files(root: str = DATA_ROOT) -> List[str]:
+    """
+    List the files covered by the data manifest.
+
+    Generated figure variants, precompressed copies, the manifest itself, the
+    local figure build state and temporary files are left out.
+
+    Args:
+        root (str): Data directory
+
+    Returns:
+        List[str]: Sorted paths with forward slashes, e.g. ``data/blank.png``
+    """
+    excluded = os.path.normpath(IMAGE_VARIANTS_PATH)
+    files = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = [
+            name for name in subdirectories
+            if os.path.normpath(os.path.join(directory, name)) != excluded
+        ]
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename)).replace(os.sep, '/')
+            if path in (os.path.normpath(DATA_MANIFEST), os.path.normpath(FIGURE_BUILD_MANIFEST)) \
+                    or filename.endswith('.tmp'):
+                continue
+            source, suffix = os.path.splitext(filename)
+            if suffix in ENCODING_SUFFIXES.values() and source.endswith(PRECOMPRESS_SUFFIXES):
+                continue
+            files.append(path)
+    return sorted(files)
+
+
+def hash_file(path: str) -> Dict[str, object]:
+    """
+    Hash a file, checking that image files start with an image signature.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        Dict[str, object]: ``size``, ``mtime_ns`` and ``sha256``
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If a ``.png``/``.jpg`` file is not a PNG or JPEG image
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as data_file:
+        head = data_file.read(max(len(signature) for signature in IMAGE_SIGNATURES))
+        digest.update(head)
+        for chunk in iter(lambda: data_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    if path.lower().endswith(IMAGE_SUFFIXES) and not head.startswith(IMAGE_SIGNATURES):
+        raise ValueError("not a PNG or JPEG image")
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def hash_files(paths: List[str], workers: Optional[int] = None,
+               cache: Optional[Dict[str, Dict[str, object]]] = None
+               ) -> Tuple[Dict[str, Dict[str, object]], Dict[str, str], int]:
+    """
+    Hash files in parallel.
+
+    Args:
+        paths (List[str]): Files to hash
+        workers (int): Number of threads (default: ThreadPoolExecutor's)
+        cache (Dict[str, Dict[str, object]]): Earlier ``hash_file`` results;
+            files whose size and mtime are unchanged are not read again
+
+    Returns:
+        Tuple: ``hash_file`` result per path, error message per unreadable
+        path, and the number of results reused from the cache
+    """
+    cache = cache or {}
+    entries: Dict[str, Dict[str, object]] = {}
+    errors: Dict[str, str] = {}
+    pending = []
+    reused = 0
+    for path in paths:
+        cached = cache.get(path)
+        if cached is not None:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                errors[path] = e.strerror or str(e)
+                continue
+            if (cached.get('size'), cached.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+                entries[path] = cached
+                reused += 1
+                continue
+        pending.append(path)
+
+    # hashlib releases the GIL on large reads, so threads hash in parallel
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(hash_file, path): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                entries[path] = future.result()
+            except OSError as e:
+                errors[path] = e.strerror or str(e)
+            except ValueError as e:
+                errors[path] = str(e)
+    return entries, errors, reused
+
+
+def _load_json(path: str) -> Optional[Dict[str, object]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_json(data: Dict[str, object], path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def write_data_manifest(path: str = DATA_MANIFEST, workers: Optional[int] = None) -> List[Tuple[bool, str]]:
+    """
+    Hash every data file and write the manifest.
+
+    A manifest that already lists the same files is left as it is, so a
+    build that changed nothing leaves no diff.
+
+    Args:
+        path (str): Manifest path
+        workers (int): Number of hashing threads
+
+    Returns:
+        List[Tuple[bool, str]]: Check results
+    """
+    start = time.perf_counter()
+    entries, errors, _ = hash_files(data_files(), workers)
+    if errors:
+        return _issues(False, f"❌ {len(errors)} files could not be read; manifest not written",
+                       [f"{file_path}: {error}" for file_path, error in sorted(errors.items())])
+
+    files = {
+        file_path: {'size': entry['size'], 'sha256': entry['sha256']}
+        for file_path, entry in sorted(entries.items())
+    }
+    previous = _load_json(path) or {}
+    unchanged = previous.get('version') == DATA_MANIFEST_VERSION and previous.get('files') == files
+    if not unchanged:
+        _save_json({
+            'version': DATA_MANIFEST_VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': files,
+        }, path)
+    _save_json(entries, DATA_VERIFY_CACHE)
+    total = sum(entry['size'] for entry in entries.values())
+    status = 'up to date' if unchanged else 'written'
+    return [(True, f"✅ {path} {status}: {len(entries)} files, {total / 1e6:.1f} MB "
+                   f"hashed in {time.perf_counter() - start:.1f} s")]
+
+
+def refresh_data_manifest() -> bool:
+    """
+    Rewrite the data manifest at the end of a build and print the result.
+
+    Returns:
+        bool: Whether the manifest was written
+    """
+    results = write_data_manifest()
+    for _, message in results:
+        print(message)
+    return results[0][0]
+
+
+def verify_data_manifest(path: str = DATA_MANIFEST, workers: Optional[int] = None,
+                         incremental: bool = False) -> List[Tuple[bool, str]]:
+    """
+    Compare the data files with the manifest.
+
+    Args:
+        path (str): Manifest path
+        workers (int): Number of hashing threads
+        incremental (bool): Trust the hashes of the last verification for
+            files whose size and mtime are unchanged
+
+    Returns:
+        List[Tuple[bool, str]]: Check results
+    """
+    manifest = _load_json(path)
+    if not manifest or not isinstance(manifest.get('files'), dict):
+        return [(False, f"❌ {path} missing or invalid (run python health_check.py --write-manifest)")]
+
+    start = time.perf_counter()
+    expected: Dict[str, Dict[str, object]] = manifest['files']
+    present = set(data_files())
+    missing = sorted(set(expected) - present)
+    untracked = sorted(present - set(expected))
+
+    cache = (_load_json(DATA_VERIFY_CACHE) or {}) if incremental else {}
+    entries, errors, reused = hash_files(sorted(present & set(expected)), workers, cache)
+    _save_json(entries, DATA_VERIFY_CACHE)
+    changed = sorted(
+        file_path for file_path, entry in entries.items()
+        if (entry['size'], entry['sha256']) != (expected[file_path]['size'], expected[file_path]['sha256'])
+    )
+
+    matched = len(entries) - len(changed)
+    total = sum(entry['size'] for entry in entries.values())
+    results = [(True, f"✅ {matched} of {len(expected)} files match {path} "
+                      f"({len(entries) - reused} hashed, {reused} unchanged; "
+                      f"{total / 1e6:.1f} MB in {time.perf_counter() - start:.1f} s)")]
+    if missing:
+        results += _issues(False, f"❌ {len(missing)} files in the manifest are missing", missing)
+    if changed:
+        results += _issues(False, f"❌ {len(changed)} files differ from the manifest", changed)
+    if errors:
+        results += _issues(False, f"❌ {len(errors)} files could not be read",
+                           [f"{file_path}: {error}" for file_path, error in sorted(errors.items())])
+    if untracked:
+        results += _issues(True, f"⚠️  {len(untracked)} files are not in the manifest", untracked)
+    return results
+
+
+def check_pair_figures() -> List[Tuple[bool, str]]:
+    """Check that every DataS3 pair has a figure in each deployed figure directory."""
+    try:
+        from quant_store import load_quant_table
+
+        pairs = [str(pair) for pair in load_quant_table(DATA_PATHS['quant_data'])['pairs']]
+    except Exception as e:
+        return [(False, f"❌ Could not read the pairs of {DATA_PATHS['quant_data']}: {e}")]
+
+    results = []
+    for figure_type in FIGURE_TYPES:
+        figure_dir = DATA_PATHS[figure_type]
+        if not os.path.isdir(figure_dir):
+            results.append((True, f"⚠️  {figure_dir} not deployed (figures are rendered from the quant data)"))
+            continue
+        figures = {name[:-len('.png')] for name in os.listdir(figure_dir) if name.endswith('.png')}
+        missing = [pair for pair in pairs if pair not in figures]
+        if missing:
+            results += _issues(False, f"❌ {len(missing)} of {len(pairs)} pairs have no figure in {figure_dir}",
+                               missing)
+        else:
+            results.append((True, f"✅ All {len(pairs)} pairs have a figure in {figure_dir}"))
+        orphans = [f"{name}.png" for name in sorted(figures - set(pairs))]
+        if orphans:
+            results += _issues(True, f"⚠️  {len(orphans)} figures in {figure_dir} match no pair", orphans)
+    return results
+
+
+def check_network_pages() -> List[Tuple[bool, str]]:
+    """Check that every GraphML network has a readable, up-to-date HTML page."""
+    html_dir = DATA_PATHS['network_html']
+    if not os.path.isdir(GRAPHML_PATH) or not os.path.isdir(html_dir):
+        return [(False, f"❌ {GRAPHML_PATH} or {html_dir} missing")]
+
+    # Published pages may differ in case from their source (F_Suppressed.graphml -> F_suppressed.html)
+    pages = {name[:-len('.html')].lower(): name for name in os.listdir(html_dir) if name.endswith('.html')}
+    sources = sorted(name for name in os.listdir(GRAPHML_PATH) if name.endswith('.graphml'))
+    results = []
+
+    unreadable = []
+    for source in sources:
+        try:
+            from interactome import read_graphml_edges
+
+            if not read_graphml_edges(os.path.join(GRAPHML_PATH, source)):
+                unreadable.append(f"{source}: no edges")
+        except Exception as e:
+            unreadable.append(f"{source}: {e}")
+    if unreadable:
+        results += _issues(False, f"❌ {len(unreadable)} GraphML files could not be read", unreadable)
+
+    missing = [source for source in sources if source[:-len('.graphml')].lower() not in pages]
+    if missing:
+        results += _issues(False, f"❌ {len(missing)} of {len(sources)} networks have no HTML page "
+                                  f"(run python build_networks.py)", missing)
+    else:
+        results.append((True, f"✅ All {len(sources)} networks have an HTML page"))
+    orphans = sorted(
+        name for stem, name in pages.items()
+        if stem not in {source[:-len('.graphml')].lower() for source in sources}
+    )
+    if orphans:
+        results += _issues(True, f"⚠️  {len(orphans)} HTML pages have no GraphML source", orphans)
+
+    manifest = _load_json(NETWORK_MANIFEST)
+    if manifest is None:
+        results.append((True, f"⚠️  {NETWORK_MANIFEST} missing; page hashes not checked"))
+        return results
+    stale = []
+    for network, entry in sorted(manifest.get('networks', {}).items()):
+        page_path = os.path.join(html_dir, entry.get('html', ''))
+        if not os.path.isfile(page_path):
+            stale.append(f"{network}: {entry.get('html')} missing")
+        elif entry.get('sha256'):
+            with open(page_path, 'rb') as page_file:
+                if hashlib.sha256(page_file.read()).hexdigest() != entry['sha256']:
+                    stale.append(f"{network}: {entry['html']} changed since it was built")
+    if stale:
+        results += _issues(False, f"❌ {len(stale)} pages do not match {NETWORK_MANIFEST}", stale)
+    else:
+        results.append((True, f"✅ All pages match {NETWORK_MANIFEST}"))
+    return results
+
+
 def print_section(title: str, results: List[Tuple[bool, str]]) -> int:
     """Print a section of check results."""
     print(f"\n📋 {title}")
@@ -143,9 +501,22 @@ def print_section(title: str, results: List[Tuple[bool, str]]) -> int:
 
 def main():
     """Run all health checks."""
+    parser = argparse.ArgumentParser(description="Check the dependencies and data before deployment.")
+    parser.add_argument('--verify', action='store_true',
+                        help=f"hash every data file and compare it with {DATA_MANIFEST}")
+    parser.add_argument('--incremental', action='store_true',
+                        help="with --verify, only hash files changed since the last verification")
+    parser.add_argument('--write-manifest', action='store_true',
+                        help=f"hash every data file into {DATA_MANIFEST} and exit")
+    parser.add_argument('--workers', type=int, help="number of hashing threads")
+    args = parser.parse_args()
+
     print("🧬 Glyco Interactome Network - Health Check")
     print("=" * 50)
-    
+
+    if args.write_manifest:
+        return 1 if print_section("Data Manifest", write_data_manifest(workers=args.workers)) else 0
+
     total_failures = 0
     
     # Python version check
@@ -171,6 +542,15 @@ def main():
     # Sample data check
     sample_results = check_data_samples()
     total_failures += print_section("Sample Data Files", sample_results)
+
+    # Data consistency checks
+    total_failures += print_section("Pair Figures", check_pair_figures())
+    total_failures += print_section("Network Pages", check_network_pages())
+
+    # Data integrity check
+    if args.verify:
+        integrity_results = verify_data_manifest(workers=args.workers, incremental=args.incremental)
+        total_failures += print_section("Data Integrity", integrity_results)
     
     # Summary
     print(f"\n📊 Health Check Summary")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution figure variants for the Glyco Interactome application.
+
+The boxplot and TopS figures are stored at dpi=800 (6400x4800 px), far more
+than a Streamlit column can show. This module downscales every figure into
+thumbnail, screen and print variants (WebP, or optimized PNG when Pillow has
+no WebP support) under ``data/variants/`` and lets the app pick the smallest
+variant that still covers the displayed width.
+
+The abstract image on the home page gets a JPEG copy at the page width, so
+Streamlit no longer decodes and downscales the full-size file on every rerun.
+
+Variants are built ahead of time with this script and, for any figure that
+was missed, lazily on first request.
+
+Usage:
+    python image_variants.py [--force] [--workers N]
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import DATA_PATHS, FIGURE_TYPES, IMAGE_VARIANTS_PATH, PAGE_CONTENT_WIDTH
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> pixel width, from smallest to largest
+VARIANT_WIDTHS = {
+    'thumbnail': 320,
+    'screen': 960,
+    'print': 2400,
+}
+
+WEBP_QUALITY = 85
+
+# Widest image Streamlit shows without decoding and downscaling it on every
+# rerun (st.image resizes anything wider than 2 x 730 px)
+MAX_DISPLAY_WIDTH = 1460
+
+DISPLAY_JPEG_QUALITY = 90
+
+
+def _variant_format() -> Tuple[str, str]:
+    """Return the (Pillow format, file extension) used for variants."""
+    from PIL import features
+    if features.check('webp'):
+        return 'WEBP', '.webp'
+    return 'PNG', '.png'
+
+
+def variant_path(source_path: str, variant: str, variants_root: str = IMAGE_VARIANTS_PATH) -> str:
+    """
+    Return where the ``variant`` of a figure is stored.
+
+    Args:
+        source_path (str): Path of the full-size figure
+        variant (str): Variant name from ``VARIANT_WIDTHS``
+        variants_root (str): Root directory for variants
+
+    Returns:
+        str: Path of the variant file
+    """
+    figure_dir = os.path.basename(os.path.dirname(os.path.normpath(source_path)))
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(variants_root, figure_dir, variant, stem + _variant_format()[1])
+
+
+def select_variant(display_width: int, pixel_ratio: float = 2.0) -> str:
+    """
+    Pick the smallest variant that covers the displayed width.
+
+    Args:
+        display_width (int): Width of the column in CSS pixels
+        pixel_ratio (float): Device pixel ratio to account for (HiDPI screens)
+
+    Returns:
+        str: Variant name
+    """
+    required = display_width * pixel_ratio
+    for variant, width in VARIANT_WIDTHS.items():
+        if width >= required:
+            return variant
+    return list(VARIANT_WIDTHS)[-1]
+
+
+def _is_fresh(path: str, source_mtime: float) -> bool:
+    """Check that ``path`` exists and is newer than its source."""
+    try:
+        return os.stat(path).st_mtime >= source_mtime
+    except OSError:
+        return False
+
+
+@timed('render', kind='variant')
+def build_variants(source_path: str, variants: Optional[List[str]] = None,
+                   force: bool = False, variants_root: str = IMAGE_VARIANTS_PATH) -> Dict[str, str]:
+    """
+    Build the requested variants of a figure from a single decode.
+
+    Variants that are already newer than the source are kept unless
+    ``force`` is set. Files are written atomically so concurrent sessions
+    never see a partial image.
+
+    Args:
+        source_path (str): Path of the full-size figure
+        variants (List[str]): Variant names to build (default: all)
+        force (bool): Rebuild even if the variant is up to date
+        variants_root (str): Root directory for variants
+
+    Returns:
+        Dict[str, str]: Variant name -> path of every variant that was written
+    """
+    from PIL import Image
+
+    variants = variants or list(VARIANT_WIDTHS)
+    source_mtime = os.stat(source_path).st_mtime
+    todo = {
+        variant: variant_path(source_path, variant, variants_root)
+        for variant in variants
+        if force or not _is_fresh(variant_path(source_path, variant, variants_root), source_mtime)
+    }
+    if not todo:
+        return {}
+
+    image_format, _ = _variant_format()
+    with Image.open(source_path) as source:
+        image = source.convert('RGB')
+
+    written = {}
+    # Build from the largest to the smallest so each step downscales the previous one
+    for variant in sorted(todo, key=VARIANT_WIDTHS.get, reverse=True):
+        width = min(VARIANT_WIDTHS[variant], image.width)
+        height = round(image.height * width / image.width)
+        factor = image.width // (width * 2)
+        if factor > 1:
+            image = image.reduce(factor)
+        image = image.resize((width, height), Image.LANCZOS)
+
+        output_path = todo[variant]
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if image_format == 'WEBP':
+            image.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+        else:
+            image.save(tmp_path, 'PNG', optimize=True)
+        os.replace(tmp_path, output_path)
+        written[variant] = output_path
+
+    return written
+
+
+def get_figure_variant(source_path: str, display_width: int) -> str:
+    """
+    Return the figure to serve for a column of ``display_width`` CSS pixels.
+
+    Builds the variant on first use and whenever the figure changes (e.g.
+    after ``build_figures.py``), and falls back to the full-size figure if the
+    variant cannot be produced.
+
+    Args:
+        source_path (str): Path of the full-size figure
+        display_width (int): Width of the column in CSS pixels
+
+    Returns:
+        str: Path of the variant, or ``source_path`` on failure
+    """
+    variant = select_variant(display_width)
+    path = variant_path(source_path, variant)
+    try:
+        if _is_fresh(path, os.stat(source_path).st_mtime):
+            return path
+        build_variants(source_path, [variant])
+        return path
+    except Exception as e:
+        logger.error(f"Error building {variant} variant of {source_path}: {e}")
+        return source_path
+
+
+def get_display_image(source_path: str, display_width: int,
+                      variants_root: str = IMAGE_VARIANTS_PATH) -> str:
+    """
+    Return a JPEG copy of a page image no wider than Streamlit displays it.
+
+    Unlike the figure variants this stays in the format Streamlit serves
+    (JPEG), so ``st.image`` passes the file through instead of re-encoding
+    it. The copy is written on first use and whenever the source changes.
+
+    Args:
+        source_path (str): Path of the full-size image
+        display_width (int): Width of the column in CSS pixels
+        variants_root (str): Root directory for variants
+
+    Returns:
+        str: Path of the display copy, or ``source_path`` on failure
+    """
+    width = min(display_width, MAX_DISPLAY_WIDTH)
+    image_dir = os.path.basename(os.path.dirname(os.path.normpath(source_path)))
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    path = os.path.join(variants_root, image_dir, f"display_{width}", stem + '.jpg')
+    try:
+        if _is_fresh(path, os.stat(source_path).st_mtime):
+            return path
+
+        from PIL import Image
+
+        with Image.open(source_path) as source:
+            image = source.convert('RGB')
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        image.save(tmp_path, 'JPEG', quality=DISPLAY_JPEG_QUALITY, optimize=True)
+        os.replace(tmp_path, path)
+        return path
+    except Exception as e:
+        logger.error(f"Error building display copy of {source_path}: {e}")
+        return source_path
+
+
+def iter_figures() -> List[str]:
+    """List every full-size figure under the figure directories."""
+    figures = []
+    for figure_type in FIGURE_TYPES:
+        figure_dir = DATA_PATHS[figure_type]
+        if os.path.isdir(figure_dir):
+            figures.extend(
+                os.path.join(figure_dir, filename)
+                for filename in sorted(os.listdir(figure_dir))
+                if filename.endswith('.png')
+            )
+    return figures
+
+
+def main() -> int:
+    """Build all figure variants."""
+    parser = argparse.ArgumentParser(description="Build downscaled figure variants.")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date variants")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker threads")
+    args = parser.parse_args()
+
+    figures = iter_figures()
+    print(f"🖼️  Building variants for {len(figures)} figures into {IMAGE_VARIANTS_PATH}")
+    start = time.perf_counter()
+    built = failed = 0
+
+    def _build(path: str) -> int:
+        return len(build_variants(path, force=args.force))
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(_build, path): path for path in figures}
+        for future, path in futures.items():
+            try:
+                built += future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  ❌ {path}: {e}")
+
+    get_display_image(DATA_PATHS['abstract_image'], PAGE_CONTENT_WIDTH)
+    print(f"✅ Wrote {built} variants in {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
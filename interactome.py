@@ -0,0 +1,398 @@
+"""
+In-memory interactome graph engine.
+
+Loads the GraphML subnetworks (``data/graphml``) and the phenotype
+clustering table (``DataS4``) once into a compact indexed structure:
+
+- proteins are numbered ``0..n-1`` and every interaction is one edge ID,
+  stored bait -> prey in two integer arrays
+- each edge carries a bitmask with one bit per condition (``Total``,
+  ``HM_Enhanced``, ``S_Suppressed``, ``Independent``, ...), combining the
+  GraphML membership with the DataS4 flags (``HM_Up``, ``S_Down``, ...)
+- adjacency is kept in CSR form, so the edges of a protein are one slice
+
+Queries (neighbors, edges gained/lost between conditions, bait
+subnetworks) are array operations on a few hundred integers and never touch
+the XML again. The loaded interactome is shared and only rebuilt when one
+of its source files changes.
+"""
+
+import os
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import DATA_PATHS, GRAPHML_PATH
+from metrics import timed
+from quant_store import load_clustering_table, store_path
+
+logger = logging.getLogger(__name__)
+
+_GRAPHML_NS = '{http://graphml.graphdrawing.org/xmlns}'
+
+# Conditions selected by a query: one name/flag, several, or None for all
+Conditions = Optional[Union[str, Iterable[str]]]
+
+
+@dataclass(frozen=True)
+class Interactome:
+    """Indexed interactome with per-condition edge membership."""
+    proteins: List[str]
+    is_bait: np.ndarray     # (proteins,) bool
+    source: np.ndarray      # (edges,) bait protein ID
+    target: np.ndarray      # (edges,) prey protein ID
+    masks: np.ndarray       # (edges,) uint64 condition bitmask
+    conditions: List[str]
+    phenotypes: List[str]
+    tops: np.ndarray        # (edges, phenotypes), NaN where DataS4 has no row
+    indptr: np.ndarray      # CSR offsets into ``adjacent``/``incident``
+    adjacent: np.ndarray    # neighbor protein ID of each CSR slot
+    incident: np.ndarray    # edge ID of each CSR slot
+    flags: Dict[str, str] = field(default_factory=dict)
+    version: Tuple = ()
+    index: Dict[str, int] = field(default_factory=dict)
+    edge_index: Dict[Tuple[int, int], int] = field(default_factory=dict)
+
+    def __contains__(self, protein: str) -> bool:
+        return protein in self.index
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def condition_mask(self, conditions: Conditions = None) -> int:
+        """
+        Return the bitmask of one or more conditions.
+
+        Args:
+            conditions: Condition names (``HM_Enhanced``) or DataS4 flags
+                (``HM_Up``); None selects every condition
+
+        Returns:
+            int: Bitmask
+
+        Raises:
+            KeyError: If a condition is unknown
+        """
+        if conditions is None:
+            return (1 << len(self.conditions)) - 1
+        if isinstance(conditions, str):
+            conditions = [conditions]
+        mask = 0
+        for name in conditions:
+            name = self.flags.get(name, name)
+            if name not in self.conditions:
+                raise KeyError(f"Unknown condition: {name}")
+            mask |= 1 << self.conditions.index(name)
+        return mask
+
+    def edge_ids(self, conditions: Conditions = None, match_all: bool = False) -> np.ndarray:
+        """
+        Return the IDs of the edges in any (or all) of the conditions.
+
+        Args:
+            conditions: Conditions to select, see ``condition_mask``
+            match_all (bool): Require every condition instead of any
+
+        Returns:
+            np.ndarray: Edge IDs in ascending order
+        """
+        mask = np.uint64(self.condition_mask(conditions))
+        hits = self.masks & mask
+        return np.flatnonzero(hits == mask if match_all else hits)
+
+    def neighbors(self, protein: str, conditions: Conditions = None) -> List[str]:
+        """
+        Return the interaction partners of a protein.
+
+        Args:
+            protein (str): Protein name
+            conditions: Only follow edges in these conditions
+
+        Returns:
+            List[str]: Partner names, or an empty list for unknown proteins
+        """
+        node = self.index.get(protein)
+        if node is None:
+            return []
+        start, end = self.indptr[node], self.indptr[node + 1]
+        adjacent = self.adjacent[start:end]
+        if conditions is not None:
+            mask = np.uint64(self.condition_mask(conditions))
+            adjacent = adjacent[(self.masks[self.incident[start:end]] & mask) != 0]
+        return [self.proteins[i] for i in adjacent]
+
+    def subnetwork(self, bait: str, conditions: Conditions = None) -> np.ndarray:
+        """
+        Return the edges from a bait to its prey.
+
+        Args:
+            bait (str): Bait protein name
+            conditions: Only keep edges in these conditions
+
+        Returns:
+            np.ndarray: Edge IDs, or an empty array for unknown proteins
+        """
+        node = self.index.get(bait)
+        if node is None:
+            return np.empty(0, dtype=np.int32)
+        edges = self.incident[self.indptr[node]:self.indptr[node + 1]]
+        edges = edges[self.source[edges] == node]
+        if conditions is not None:
+            edges = edges[(self.masks[edges] & np.uint64(self.condition_mask(conditions))) != 0]
+        return np.sort(edges)
+
+    def select(self, proteins: Iterable[str] = (), baits: Iterable[str] = (),
+               conditions: Conditions = None, match_all: bool = False) -> np.ndarray:
+        """
+        Return the edges matching every given filter.
+
+        Args:
+            proteins (Iterable[str]): Keep edges touching any of these proteins
+            baits (Iterable[str]): Keep edges whose bait is one of these
+            conditions: Keep edges in any (or all) of these conditions
+            match_all (bool): Require every condition instead of any
+
+        Returns:
+            np.ndarray: Edge IDs in ascending order
+        """
+        keep = np.ones(len(self.source), dtype=bool)
+        proteins, baits = list(proteins), list(baits)
+        if proteins:
+            ids = [self.index[p] for p in proteins if p in self.index]
+            keep &= np.isin(self.source, ids) | np.isin(self.target, ids)
+        if baits:
+            keep &= np.isin(self.source, [self.index[b] for b in baits if b in self.index])
+        if conditions is not None:
+            mask = np.uint64(self.condition_mask(conditions))
+            hits = self.masks & mask
+            keep &= (hits == mask) if match_all else (hits != 0)
+        return np.flatnonzero(keep)
+
+    def compare(self, before: Conditions, after: Conditions) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the edges gained and lost from one condition to another.
+
+        Args:
+            before: Reference condition(s), e.g. ``HM_Enhanced``
+            after: Compared condition(s), e.g. ``S_Enhanced``
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: IDs of the edges only in ``after``
+            (gained) and only in ``before`` (lost)
+        """
+        in_before = (self.masks & np.uint64(self.condition_mask(before))) != 0
+        in_after = (self.masks & np.uint64(self.condition_mask(after))) != 0
+        return np.flatnonzero(in_after & ~in_before), np.flatnonzero(in_before & ~in_after)
+
+    def edge_id(self, bait: str, prey: str) -> Optional[int]:
+        """Return the ID of the edge between two proteins, in either order."""
+        a, b = self.index.get(bait), self.index.get(prey)
+        if a is None or b is None:
+            return None
+        return self.edge_index.get((min(a, b), max(a, b)))
+
+    def edge_conditions(self, edge: int) -> List[str]:
+        """Return the conditions an edge belongs to."""
+        mask = int(self.masks[edge])
+        return [name for bit, name in enumerate(self.conditions) if mask >> bit & 1]
+
+    def pairs(self, edges: Iterable[int]) -> List[Tuple[str, str]]:
+        """Return ``(bait, prey)`` names for edge IDs."""
+        return [(self.proteins[self.source[e]], self.proteins[self.target[e]]) for e in edges]
+
+
+def _source_files(graphml_dir: str) -> List[str]:
+    """Return the GraphML files of ``graphml_dir`` in name order."""
+    try:
+        return sorted(
+            entry.path for entry in os.scandir(graphml_dir)
+            if entry.is_file() and entry.name.endswith('.graphml')
+        )
+    except OSError:
+        return []
+
+
+def _file_version(paths: List[str]) -> Tuple:
+    """Return an ``(path, mtime_ns, size)`` tuple used to detect data changes."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+def read_graphml_edges(graphml_path: str) -> List[Tuple[str, str]]:
+    """
+    Read the edge list of a GraphML file.
+
+    Node names are taken from the ``id`` attributes, which is how the
+    subnetworks in ``data/graphml`` label their proteins.
+
+    Args:
+        graphml_path (str): Path to the GraphML file
+
+    Returns:
+        List[Tuple[str, str]]: ``(source, target)`` pairs
+    """
+    edges = []
+    for _, element in ET.iterparse(graphml_path):
+        if element.tag == f'{_GRAPHML_NS}edge':
+            edges.append((element.get('source'), element.get('target')))
+        element.clear()
+    return edges
+
+
+@timed('data_load', source='interactome')
+def _build_interactome(graphml_paths: List[str], clustering_path: str, version: Tuple) -> Interactome:
+    """Load the GraphML files and DataS4 into an ``Interactome`` instance."""
+    import pandas as pd
+
+    # Undirected edge key -> (bait, prey, set of conditions)
+    edges: Dict[Tuple[str, str], Tuple[str, str, set]] = {}
+    baits = set()
+    phenotypes: List[str] = []
+    flags: Dict[str, str] = {}
+    tops_rows: Dict[Tuple[str, str], np.ndarray] = {}
+    # Flag column -> rows of DataS4 carrying the flag; edge key -> DataS4 row
+    flagged: Dict[str, np.ndarray] = {}
+    rows: Dict[Tuple[str, str], int] = {}
+
+    if os.path.exists(clustering_path) or os.path.exists(store_path(clustering_path)):
+        clustering = load_clustering_table(clustering_path)
+        flag_columns = [
+            column for column in clustering.columns[2:]
+            if not pd.api.types.is_numeric_dtype(clustering[column])
+        ]
+        phenotypes = [
+            column for column in clustering.columns[2:]
+            if pd.api.types.is_numeric_dtype(clustering[column])
+            and clustering[column].notna().any()
+        ]
+        values = clustering[phenotypes].to_numpy(dtype=float)
+        for column in flag_columns:
+            present = clustering[column].notna().to_numpy()
+            if present.any():
+                flagged[column] = present
+                flags.update((str(flag), column) for flag in clustering[column].dropna().unique())
+        for row, (bait, prey) in enumerate(zip(clustering['Bait'].astype(str),
+                                               clustering['Prey'].astype(str))):
+            key = tuple(sorted((bait, prey)))
+            edges[key] = (bait, prey, set())
+            tops_rows[key] = values[row]
+            rows[key] = row
+            baits.add(bait)
+
+    for graphml_path in graphml_paths:
+        condition = os.path.basename(graphml_path)[:-len('.graphml')]
+        for source, target in read_graphml_edges(graphml_path):
+            key = tuple(sorted((source, target)))
+            if key not in edges:
+                # Orient edges missing from DataS4 towards the known bait
+                if target in baits and source not in baits:
+                    source, target = target, source
+                edges[key] = (source, target, set())
+            edges[key][2].add(condition)
+
+    conditions = sorted(set(flagged) | {condition for _, _, member in edges.values() for condition in member})
+    if len(conditions) > 64:
+        raise ValueError(f"Too many conditions for a 64-bit edge mask: {len(conditions)}")
+    bits = {condition: 1 << i for i, condition in enumerate(conditions)}
+
+    proteins = sorted({protein for key in edges for protein in key})
+    index = {protein: i for i, protein in enumerate(proteins)}
+    ordered = sorted(edges.values(), key=lambda edge: (index[edge[0]], index[edge[1]]))
+
+    source = np.array([index[bait] for bait, _, _ in ordered], dtype=np.int32)
+    target = np.array([index[prey] for _, prey, _ in ordered], dtype=np.int32)
+    masks = np.array([sum(bits[c] for c in member) for _, _, member in ordered], dtype=np.uint64)
+    # DataS4 flags column by column: one shifted bit per flag column
+    if flagged:
+        row_masks = np.zeros(len(next(iter(flagged.values()))), dtype=np.uint64)
+        for column, present in flagged.items():
+            row_masks |= present.astype(np.uint64) << np.uint64(conditions.index(column))
+        edge_rows = np.array([rows.get(tuple(sorted((bait, prey))), -1) for bait, prey, _ in ordered],
+                             dtype=np.int64)
+        masks |= np.where(edge_rows >= 0, row_masks[edge_rows], np.uint64(0))
+    tops = np.full((len(ordered), len(phenotypes)), np.nan)
+    for edge, (bait, prey, _) in enumerate(ordered):
+        row = tops_rows.get(tuple(sorted((bait, prey))))
+        if row is not None:
+            tops[edge] = row
+
+    # CSR adjacency: both directions of every edge, grouped by protein
+    ends = np.concatenate([source, target])
+    others = np.concatenate([target, source])
+    edge_ids = np.concatenate([np.arange(len(ordered), dtype=np.int32)] * 2)
+    order = np.lexsort((others, ends))
+    indptr = np.zeros(len(proteins) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=len(proteins)), out=indptr[1:])
+
+    is_bait = np.zeros(len(proteins), dtype=bool)
+    is_bait[source] = True
+
+    return Interactome(
+        proteins=proteins,
+        is_bait=is_bait,
+        source=source,
+        target=target,
+        masks=masks,
+        conditions=conditions,
+        phenotypes=phenotypes,
+        tops=tops,
+        indptr=indptr,
+        adjacent=others[order],
+        incident=edge_ids[order],
+        flags=flags,
+        version=version,
+        index=index,
+        edge_index={
+            (min(a, b), max(a, b)): edge
+            for edge, (a, b) in enumerate(zip(source.tolist(), target.tolist()))
+        },
+    )
+
+
+_interactome_lock = threading.Lock()
+_interactome: Optional[Interactome] = None
+
+
+def load_interactome(graphml_dir: str = GRAPHML_PATH,
+                     clustering_path: str = DATA_PATHS['clustering_data']) -> Optional[Interactome]:
+    """
+    Return the shared interactome, reloading it only if the files changed.
+
+    Args:
+        graphml_dir (str): Directory of GraphML subnetworks
+        clustering_path (str): Path to the DataS4 CSV file
+
+    Returns:
+        Optional[Interactome]: The loaded interactome, or None if no source
+        file is available
+    """
+    global _interactome
+
+    graphml_paths = _source_files(graphml_dir)
+    version = _file_version(graphml_paths + [clustering_path, store_path(clustering_path)])
+    if _interactome is not None and _interactome.version == version:
+        return _interactome
+
+    with _interactome_lock:
+        if _interactome is not None and _interactome.version == version:
+            return _interactome
+        if not graphml_paths and not os.path.exists(clustering_path) \
+                and not os.path.exists(store_path(clustering_path)):
+            logger.error(f"No interactome data in {graphml_dir} or {clustering_path}")
+            return None
+        try:
+            _interactome = _build_interactome(graphml_paths, clustering_path, version)
+        except Exception as e:
+            logger.error(f"Error loading interactome: {e}")
+            return None
+        return _interactome
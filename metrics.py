@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Performance instrumentation for the Glyco Interactome application.
+
+Records latency histograms and byte counters in process memory:
+
+- ``timed(name, **labels)`` wraps data loads, directory scans, file reads
+  and rendering, as a context manager or a decorator
+- ``record_bytes(kind, size)`` counts the payload sent to the browser,
+  attributed to the page set with ``page_context``
+
+Metrics are exposed as a JSON snapshot (the app's diagnostics page, the
+``/api/metrics`` endpoint of ``api_server.py`` and the file written by
+``flush_metrics``) and in the Prometheus text format (``/metrics``).
+Recording only takes a lock and a few additions, so hooks stay in place in
+production.
+
+Usage:
+    python metrics.py [PATH]    # summarize a metrics file written by the app
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+import contextlib
+import contextvars
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Where the Streamlit app writes its metrics snapshot
+METRICS_PATH = os.environ.get('GLYCO_METRICS_PATH', 'metrics.json')
+
+# Minimum seconds between two snapshot writes by ``flush_metrics``
+METRICS_FLUSH_INTERVAL = 60.0
+
+# Page label of recordings made outside ``page_context``
+NO_PAGE = '-'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    """Latency distribution of one metric and label set."""
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket holding it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, Labels], Histogram] = {}
+_counters: Dict[Tuple[str, Labels], float] = {}
+_started = time.time()
+_last_flush = 0.0
+_page: contextvars.ContextVar = contextvars.ContextVar('page', default=NO_PAGE)
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """
+    Record one latency sample.
+
+    Args:
+        name (str): Metric name, e.g. ``data_load``
+        seconds (float): Duration
+        **labels: Metric labels, e.g. ``source='quant_data'``
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """
+    Add to a counter.
+
+    Args:
+        name (str): Counter name, e.g. ``bytes_served``
+        value (float): Amount to add
+        **labels: Counter labels
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class timed(contextlib.ContextDecorator):
+    """
+    Time a block or function into a latency histogram.
+
+    Samples are labelled with the current page, so slow pages can be broken
+    down by what they spent their time on::
+
+        with timed('file_read', kind='network_html'):
+            ...
+
+        @timed('render', kind='figure')
+        def render(...):
+            ...
+    """
+
+    def __init__(self, name: str, **labels) -> None:
+        self.name = name
+        self.labels = labels
+        self._starts = threading.local()
+
+    def __enter__(self) -> 'timed':
+        # Per thread (and per nesting level), so one decorator can be shared
+        stack = getattr(self._starts, 'stack', None)
+        if stack is None:
+            stack = self._starts.stack = []
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        seconds = time.perf_counter() - self._starts.stack.pop()
+        observe(self.name, seconds, page=_page.get(), **self.labels)
+        return False
+
+
+@contextlib.contextmanager
+def page_context(page: str) -> Iterator[None]:
+    """Attribute the recordings of a block to a page, and time the page."""
+    token = _page.set(page)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('page_run', time.perf_counter() - start, page=page)
+        _page.reset(token)
+
+
+def record_bytes(kind: str, size: int) -> None:
+    """
+    Count bytes sent to the browser by the current page.
+
+    Args:
+        kind (str): Payload kind, e.g. ``image`` or ``network_html``
+        size (int): Payload size in bytes
+    """
+    increment('bytes_served', size, page=_page.get(), kind=kind)
+
+
+def snapshot() -> Dict[str, object]:
+    """
+    Return every metric as JSON-serializable data.
+
+    Returns:
+        Dict[str, object]: ``histograms`` (with count, sum, max, p50, p95 and
+        bucket counts), ``counters``, ``buckets``, process ``pid`` and
+        ``started``/``time`` timestamps
+    """
+    with _lock:
+        histograms = [
+            {
+                'name': name,
+                'labels': dict(labels),
+                'count': histogram.count,
+                'sum': histogram.total,
+                'max': histogram.maximum,
+                'p50': histogram.quantile(0.5),
+                'p95': histogram.quantile(0.95),
+                'buckets': list(histogram.buckets),
+            }
+            for (name, labels), histogram in sorted(_histograms.items())
+        ]
+        counters = [
+            {'name': name, 'labels': dict(labels), 'value': value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+    return {
+        'pid': os.getpid(),
+        'started': _started,
+        'time': time.time(),
+        'buckets': list(LATENCY_BUCKETS),
+        'histograms': histograms,
+        'counters': counters,
+    }
+
+
+def _prometheus_labels(labels: Dict[str, str], **extra) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in items.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(items, escaped)) + '}'
+
+
+def render_prometheus(data: Optional[Dict[str, object]] = None) -> str:
+    """
+    Format a snapshot in the Prometheus text exposition format.
+
+    Args:
+        data (Dict[str, object]): Snapshot; defaults to the current one
+
+    Returns:
+        str: Metrics text, histograms as ``glyco_<name>_seconds``
+    """
+    data = data or snapshot()
+    lines: List[str] = []
+    declared = set()
+    for histogram in data['histograms']:
+        metric = f"glyco_{histogram['name']}_seconds"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} histogram")
+            declared.add(metric)
+        cumulative = 0
+        for bound, count in zip(data['buckets'] + ['+Inf'], histogram['buckets']):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_prometheus_labels(histogram['labels'], le=bound)} {cumulative}")
+        lines.append(f"{metric}_sum{_prometheus_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{metric}_count{_prometheus_labels(histogram['labels'])} {histogram['count']}")
+    for counter in data['counters']:
+        metric = f"glyco_{counter['name']}_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_prometheus_labels(counter['labels'])} {counter['value']}")
+    return '\n'.join(lines) + '\n'
+
+
+def flush_metrics(path: str = METRICS_PATH, force: bool = False) -> bool:
+    """
+    Write the snapshot to a JSON file, at most once per ``METRICS_FLUSH_INTERVAL``.
+
+    Args:
+        path (str): Output path
+        force (bool): Write even if the last write is recent
+
+    Returns:
+        bool: Whether the file was written
+    """
+    global _last_flush
+
+    now = time.monotonic()
+    if not force and now - _last_flush < METRICS_FLUSH_INTERVAL:
+        return False
+    _last_flush = now
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as metrics_file:
+            json.dump(snapshot(), metrics_file)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
+
+
+def reset_metrics() -> None:
+    """Drop every recorded metric."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def summary_rows(data: Dict[str, object]) -> List[Dict[str, object]]:
+    """
+    Flatten the histograms of a snapshot into table rows (milliseconds).
+
+    Args:
+        data (Dict[str, object]): Snapshot
+
+    Returns:
+        List[Dict[str, object]]: One row per metric and label set, slowest
+        total time first
+    """
+    rows = [
+        {
+            'metric': histogram['name'],
+            **histogram['labels'],
+            'count': histogram['count'],
+            'total_ms': round(histogram['sum'] * 1000, 1),
+            'mean_ms': round(histogram['sum'] * 1000 / max(histogram['count'], 1), 2),
+            'p50_ms': round(histogram['p50'] * 1000, 1),
+            'p95_ms': round(histogram['p95'] * 1000, 1),
+            'max_ms': round(histogram['max'] * 1000, 1),
+        }
+        for histogram in data['histograms']
+    ]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def main() -> int:
+    """Print a summary of a metrics file."""
+    path = sys.argv[1] if len(sys.argv) > 1 else METRICS_PATH
+    if not os.path.exists(path):
+        print(f"❌ {path} does not exist; the app writes it after its first page run")
+        return 1
+    with open(path, 'r', encoding='utf-8') as metrics_file:
+        data = json.load(metrics_file)
+
+    print("🧬 Glyco Interactome Network - Metrics")
+    print("=" * 50)
+    print(f"pid {data['pid']}, up {(data['time'] - data['started']) / 3600:.1f} h, "
+          f"written {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['time']))}")
+    for row in summary_rows(data)[:40]:
+        labels = ' '.join(f"{key}={value}" for key, value in row.items()
+                          if key not in ('metric', 'count') and not key.endswith('_ms'))
+        print(f"  {row['metric']:<12} {labels:<48} n={row['count']:<6} "
+              f"mean {row['mean_ms']:>8.2f} ms  p95 {row['p95_ms']:>8.1f} ms  max {row['max_ms']:>8.1f} ms")
+    for counter in data['counters']:
+        labels = ' '.join(f"{key}={value}" for key, value in counter['labels'].items())
+        print(f"  {counter['name']:<12} {labels:<48} {counter['value'] / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Precompressed Static Assets for Glyco Interactome Network
+
+Writes gzip (``.gz``) and, when the ``brotli`` package is installed, brotli
+(``.br``) copies of the network pages, their manifest and the vendored
+JavaScript/CSS next to the originals. ``static_server.py`` picks the best
+copy the browser accepts, so nothing is compressed while serving.
+
+- only text assets (HTML, JSON, JavaScript, CSS) above
+  ``PRECOMPRESS_MIN_SIZE`` are compressed, at the highest levels
+- a compressed copy carries the mtime of its source; a copy whose mtime
+  differs is stale and is rebuilt here and ignored by the server
+- copies whose source was removed are deleted
+
+``build_networks.py`` runs this after rendering; run it directly after
+updating ``lib/``.
+
+Usage:
+    python precompress.py [--force] [DIR ...]
+"""
+
+import os
+import sys
+import gzip
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import DATA_PATHS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Directories holding the statically served assets
+PRECOMPRESS_DIRS = [DATA_PATHS['network_html'], 'lib/']
+
+# Files worth compressing
+PRECOMPRESS_SUFFIXES = ('.html', '.json', '.js', '.css')
+
+# Smaller files are sent as they are
+PRECOMPRESS_MIN_SIZE = 1024
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODING_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+
+def available_encodings() -> List[str]:
+    """Return the encodings that can be produced here, in order of preference."""
+    return [encoding for encoding in ENCODING_SUFFIXES if encoding != 'br' or brotli is not None]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data at the highest level of an encoding.
+
+    Args:
+        data (bytes): Content
+        encoding (str): ``br`` or ``gzip``
+
+    Returns:
+        bytes: Compressed content (gzip without a timestamp, so builds are
+        reproducible)
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compressed_path(path: str, encoding: str) -> str:
+    """Return the path of the compressed copy of a file."""
+    return path + ENCODING_SUFFIXES[encoding]
+
+
+def is_fresh(path: str, encoding: str) -> bool:
+    """Return whether the compressed copy of a file exists and matches its mtime."""
+    try:
+        return os.stat(compressed_path(path, encoding)).st_mtime_ns == os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def precompress_file(path: str, force: bool = False) -> Dict[str, Optional[int]]:
+    """
+    Write the compressed copies of a file.
+
+    Args:
+        path (str): Source file
+        force (bool): Rebuild fresh copies too
+
+    Returns:
+        Dict[str, Optional[int]]: Encoding -> compressed size, or None if the
+        copy was up to date
+    """
+    stat = os.stat(path)
+    data = None
+    sizes: Dict[str, Optional[int]] = {}
+    for encoding in available_encodings():
+        if not force and is_fresh(path, encoding):
+            sizes[encoding] = None
+            continue
+        if data is None:
+            with open(path, 'rb') as source_file:
+                data = source_file.read()
+        compressed = compress(data, encoding)
+        output_path = compressed_path(path, encoding)
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as output_file:
+            output_file.write(compressed)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, output_path)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+def _sources(directory: str) -> List[str]:
+    """List the files below a directory that are worth compressing."""
+    sources = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if filename.endswith(PRECOMPRESS_SUFFIXES) and os.path.getsize(path) >= PRECOMPRESS_MIN_SIZE:
+                sources.append(path)
+    return sorted(sources)
+
+
+def _remove_orphans(directory: str) -> int:
+    """Delete compressed copies whose source no longer exists."""
+    removed = 0
+    suffixes = tuple(ENCODING_SUFFIXES.values())
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            source, suffix = os.path.splitext(os.path.join(root, filename))
+            if suffix in suffixes and source.endswith(PRECOMPRESS_SUFFIXES) and not os.path.exists(source):
+                os.remove(source + suffix)
+                removed += 1
+    return removed
+
+
+def precompress_tree(directories: List[str] = PRECOMPRESS_DIRS, force: bool = False,
+                     workers: Optional[int] = None) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Write the compressed copies of every asset below some directories.
+
+    Args:
+        directories (List[str]): Asset directories
+        force (bool): Rebuild fresh copies too
+        workers (int): Number of threads (zlib and brotli release the GIL)
+
+    Returns:
+        Dict[str, Dict[str, Optional[int]]]: Source path -> ``precompress_file`` result
+    """
+    sources = []
+    for directory in directories:
+        if os.path.isdir(directory):
+            _remove_orphans(directory)
+            sources += _sources(directory)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda path: precompress_file(path, force), sources)
+        return dict(zip(sources, results))
+
+
+def main() -> int:
+    """Precompress the static assets."""
+    parser = argparse.ArgumentParser(description="Write gzip/brotli copies of the static assets.")
+    parser.add_argument('directories', nargs='*', default=PRECOMPRESS_DIRS, help="asset directories")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date copies")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Precompression")
+    print("=" * 50)
+    if brotli is None:
+        print("⚠️  brotli is not installed; writing gzip copies only")
+
+    start = time.perf_counter()
+    results = precompress_tree(args.directories, args.force)
+    totals = {encoding: [0, 0] for encoding in available_encodings()}
+    for path, sizes in results.items():
+        size = os.path.getsize(path)
+        for encoding, compressed_size in sizes.items():
+            if compressed_size is None:
+                compressed_size = os.path.getsize(compressed_path(path, encoding))
+            totals[encoding][0] += size
+            totals[encoding][1] += compressed_size
+
+    written = sum(1 for sizes in results.values() for size in sizes.values() if size is not None)
+    print(f"✅ {len(results)} assets, {written} copies written in {time.perf_counter() - start:.1f} s")
+    for encoding, (size, compressed_size) in totals.items():
+        if size:
+            print(f"   {encoding}: {size / 1024:.0f} KB -> {compressed_size / 1024:.0f} KB "
+                  f"({compressed_size / size:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
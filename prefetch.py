@@ -0,0 +1,305 @@
+"""
+Predictive prefetching of the pair figures.
+
+Picking a pair on the pair page reruns the script and renders three figures.
+Users mostly step through the partners of one bait in order, or follow one
+prey across baits, so after a pair is shown ``prefetch_neighbors`` renders
+the pairs most likely to be picked next in a background thread:
+
+- the next ``PREFETCH_AHEAD`` and previous ``PREFETCH_BEHIND`` partners of
+  the same bait
+- the same prey under ``PREFETCH_OTHER_BAITS`` neighbouring baits
+
+The rendered figures land in the caches the page reads from (the LRU cache
+of ``figure_engine``, bounded by ``FIGURE_CACHE_SIZE``, or the resized
+variants of ``image_variants`` for pre-rendered figures), so the rerun finds
+them ready. Only the latest pair is followed: a new request drops whatever is
+still queued, the worker pauses while the page renders, and a page that
+needs a pair the worker is rendering waits for it instead of rendering it
+twice.
+
+``warm_up`` queues the default pair of the page and the most viewed pairs of
+the previous process (``pair_views`` in its metrics snapshot, read by
+``most_viewed`` at startup) when the pair page is first shown.
+"""
+
+import json
+import atexit
+import logging
+import threading
+import contextlib
+from collections import deque
+from itertools import zip_longest
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import FIGURE_TYPES
+from metrics import METRICS_PATH, increment, timed
+
+logger = logging.getLogger(__name__)
+
+# Partners of the same bait prefetched after and before the current one
+PREFETCH_AHEAD = 2
+PREFETCH_BEHIND = 1
+
+# Other baits of the same prey prefetched
+PREFETCH_OTHER_BAITS = 2
+
+# Most viewed pairs of the previous process rendered at startup
+WARM_UP_PAIRS = 8
+
+# Seconds a page waits for a figure the worker is rendering
+PREFETCH_WAIT_TIMEOUT = 10.0
+
+# (pair, figure type, render width, column width)
+Job = Tuple[str, str, int, int]
+
+_lock = threading.Condition()
+_queue: Deque[Job] = deque()
+_running: Optional[str] = None
+_foreground = 0
+_stopping = False
+_worker: Optional[threading.Thread] = None
+_renderer_ready = False
+
+
+def prey_baits(protein2_dict: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Return prey -> sorted baits, the inverse of the bait -> prey lists."""
+    baits: Dict[str, List[str]] = {}
+    for bait in sorted(protein2_dict):
+        for prey in protein2_dict[bait]:
+            baits.setdefault(prey, []).append(bait)
+    return baits
+
+
+def likely_next_pairs(protein1: str, protein2: str, protein2_dict: Dict[str, List[str]],
+                      baits_of_prey: Dict[str, List[str]]) -> List[str]:
+    """
+    Return the pairs most likely to be viewed after a pair, most likely first.
+
+    Args:
+        protein1 (str): Bait of the current pair
+        protein2 (str): Prey of the current pair
+        protein2_dict (Dict[str, List[str]]): Bait -> prey, in selectbox order
+        baits_of_prey (Dict[str, List[str]]): Prey -> baits (``prey_baits``)
+
+    Returns:
+        List[str]: Pair names, without the current pair
+    """
+    candidates = []
+    preys = protein2_dict.get(protein1, [])
+    if protein2 in preys:
+        i = preys.index(protein2)
+        candidates += [(protein1, prey) for prey in preys[i + 1:i + 1 + PREFETCH_AHEAD]]
+        candidates += [(protein1, prey) for prey in preys[max(i - PREFETCH_BEHIND, 0):i][::-1]]
+
+    # Baits next to the current one in the sidebar order come first
+    baits = baits_of_prey.get(protein2, [])
+    after = [bait for bait in baits if bait > protein1]
+    before = [bait for bait in baits if bait < protein1][::-1]
+    nearest = [bait for pair in zip_longest(after, before) for bait in pair if bait is not None]
+    candidates += [(bait, protein2) for bait in nearest[:PREFETCH_OTHER_BAITS]]
+
+    pairs = []
+    for bait, prey in candidates:
+        pair = f"{bait}_{prey}"
+        if pair not in pairs:
+            pairs.append(pair)
+    return pairs
+
+
+def warm_figure(pair: str, figure_type: str, render_width: int, column_width: int) -> None:
+    """
+    Bring one figure of a pair into the caches the pair page reads from.
+
+    Args:
+        pair (str): Pair name, e.g. ``BSG_ADAM9``
+        figure_type (str): One of ``FIGURE_TYPES``
+        render_width (int): Width the page renders figures at
+        column_width (int): Width of the page column in CSS pixels
+    """
+    from figure_engine import render_figure
+    from data_catalog import get_catalog
+    from image_variants import get_figure_variant
+
+    if render_figure(figure_type, pair, render_width) is None:
+        source = get_catalog().figure_file(pair, figure_type)
+        if source:
+            get_figure_variant(source, column_width)
+
+
+def prepare_renderer() -> None:
+    """
+    Set up Matplotlib in the calling thread, before any background render.
+
+    The first canvas of each class probes ``sys.modules['IPython']``, which
+    fails while another thread is importing IPython (the network page does,
+    through pyvis). The probe runs once per class, so creating one canvas
+    here keeps it out of the worker.
+    """
+    global _renderer_ready
+    if _renderer_ready:
+        return
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    FigureCanvasAgg(Figure())
+    _renderer_ready = True
+
+
+def _work() -> None:
+    """Render queued figures until the process exits."""
+    global _running
+    while True:
+        with _lock:
+            while not _stopping and (not _queue or _foreground):
+                _lock.wait()
+            if _stopping:
+                return
+            pair, figure_type, render_width, column_width = _queue.popleft()
+            _running = pair
+        try:
+            with timed('prefetch', kind=figure_type):
+                warm_figure(pair, figure_type, render_width, column_width)
+        except Exception as e:
+            logger.warning(f"Error prefetching {figure_type} of {pair}: {e}")
+        finally:
+            with _lock:
+                _running = None
+                _lock.notify_all()
+
+
+def schedule(pairs: List[str], render_width: int, column_width: int, replace: bool = True) -> None:
+    """
+    Queue the figures of some pairs for background rendering.
+
+    Call it from the page thread, or after ``prepare_renderer`` ran there.
+
+    Args:
+        pairs (List[str]): Pair names, most wanted first
+        render_width (int): Width the page renders figures at
+        column_width (int): Width of the page column in CSS pixels
+        replace (bool): Drop the figures still queued
+    """
+    global _worker
+    prepare_renderer()
+    with _lock:
+        if replace:
+            _queue.clear()
+        _queue.extend((pair, figure_type, render_width, column_width)
+                      for pair in pairs for figure_type in FIGURE_TYPES)
+        if _worker is None:
+            _worker = threading.Thread(target=_work, name='figure-prefetch', daemon=True)
+            _worker.start()
+            atexit.register(_stop)
+        _lock.notify_all()
+
+
+def _stop(timeout: float = PREFETCH_WAIT_TIMEOUT) -> None:
+    """Let the figure being rendered finish before the interpreter exits."""
+    global _stopping
+    with _lock:
+        _stopping = True
+        _queue.clear()
+        _lock.notify_all()
+    _worker.join(timeout)
+
+
+@contextlib.contextmanager
+def foreground(pair: str, timeout: float = PREFETCH_WAIT_TIMEOUT) -> Iterator[None]:
+    """
+    Hold the worker back while the page renders a pair.
+
+    Drops the queued figures of the pair and waits for the one being
+    rendered, which the page then finds in the cache; nothing else starts
+    until the block exits, so the page has the CPU to itself.
+
+    Args:
+        pair (str): Pair name
+        timeout (float): Maximum seconds to wait for the worker
+    """
+    global _foreground
+    with _lock:
+        for job in [job for job in _queue if job[0] == pair]:
+            _queue.remove(job)
+        _lock.wait_for(lambda: _running != pair, timeout)
+        _foreground += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _foreground -= 1
+            _lock.notify_all()
+
+
+def prefetch_neighbors(protein1: str, protein2: str, protein2_dict: Dict[str, List[str]],
+                       baits_of_prey: Dict[str, List[str]], render_width: int, column_width: int) -> None:
+    """
+    Record a view of a pair and prefetch the pairs likely to follow it.
+
+    Args:
+        protein1 (str): Bait of the viewed pair
+        protein2 (str): Prey of the viewed pair
+        protein2_dict (Dict[str, List[str]]): Bait -> prey, in selectbox order
+        baits_of_prey (Dict[str, List[str]]): Prey -> baits (``prey_baits``)
+        render_width (int): Width the page renders figures at
+        column_width (int): Width of the page column in CSS pixels
+    """
+    increment('pair_views', pair=f"{protein1}_{protein2}")
+    schedule(likely_next_pairs(protein1, protein2, protein2_dict, baits_of_prey), render_width, column_width)
+
+
+def most_viewed(path: str = METRICS_PATH, limit: int = WARM_UP_PAIRS) -> List[str]:
+    """
+    Return the most viewed pairs recorded in a metrics snapshot.
+
+    Args:
+        path (str): Snapshot written by ``metrics.flush_metrics``
+        limit (int): Maximum number of pairs
+
+    Returns:
+        List[str]: Pair names, most viewed first (empty without a snapshot)
+    """
+    try:
+        with open(path, encoding='utf-8') as metrics_file:
+            counters = json.load(metrics_file).get('counters', [])
+    except (OSError, ValueError):
+        return []
+    views = [(counter['value'], counter['labels']['pair']) for counter in counters
+             if counter.get('name') == 'pair_views' and 'pair' in counter.get('labels', {})]
+    return [pair for _, pair in sorted(views, key=lambda view: (-view[0], view[1]))[:limit]]
+
+
+def warm_up(default_pairs: Callable[[], List[str]], viewed: List[str], render_width: int,
+            column_width: int) -> threading.Thread:
+    """
+    Render the default and the most viewed pairs in the background.
+
+    Matplotlib is set up right away, in the calling thread; the default pairs
+    are listed in the background.
+
+    Args:
+        default_pairs (Callable[[], List[str]]): Returns the pairs the page
+            shows first
+        viewed (List[str]): Most viewed pairs of the previous process
+            (``most_viewed``)
+        render_width (int): Width the page renders figures at
+        column_width (int): Width of the page column in CSS pixels
+
+    Returns:
+        threading.Thread: The thread queueing the pairs
+    """
+    prepare_renderer()
+
+    def queue_pairs():
+        try:
+            pairs = list(default_pairs())
+        except Exception as e:
+            logger.warning(f"Error listing the pairs to warm up: {e}")
+            pairs = []
+        pairs += [pair for pair in viewed if pair not in pairs]
+        schedule(pairs, render_width, column_width, replace=False)
+        logger.info(f"Warming up the figures of {len(pairs)} pairs")
+
+    thread = threading.Thread(target=queue_pairs, name='figure-warm-up', daemon=True)
+    thread.start()
+    return thread
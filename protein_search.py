@@ -0,0 +1,215 @@
+"""
+Protein search index for the protein-protein pair page.
+
+Indexes every bait and prey by gene name and UniProt accession (the
+``BaitID``/``PreyID`` columns of DataS3) in a prefix trie whose nodes keep
+the proteins below them, so a lookup walks the query once and never scans
+the protein list. Queries without a prefix match fall back to fuzzy
+matching on the names, which catches misspellings (e.g. ``LAMP2`` ->
+``LAMP1``, ``ITBG1`` -> ``ITGB1``, ``ADAM8`` -> ``ADAM9``).
+
+Each hit lists every pair the protein takes part in, with the subnetworks
+(conditions) the pair belongs to.
+"""
+
+import difflib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from figure_engine import load_quant_data
+from interactome import load_interactome
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Shortest query for which fuzzy matching is attempted
+FUZZY_MIN_LENGTH = 3
+
+# Similarity ratio (0-1) required by fuzzy matching
+FUZZY_CUTOFF = 0.75
+
+# Trie node key holding the IDs of the proteins below the node
+_PROTEINS = ''
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A protein matching a query, with its pairs and their conditions."""
+    protein: str
+    uniprot_id: str
+    matched: str
+    pairs: Tuple[Tuple[str, str], ...]       # (bait, prey)
+    conditions: Tuple[Tuple[str, ...], ...]  # per pair, excluding Total
+    fuzzy: bool = False
+
+
+@dataclass(frozen=True)
+class ProteinIndex:
+    """Prefix trie over protein names and UniProt IDs."""
+    proteins: List[str]
+    uniprot_ids: List[str]
+    pairs: List[Tuple[Tuple[str, str], ...]]
+    conditions: Dict[Tuple[str, str], Tuple[str, ...]]
+    trie: dict
+    keys: Dict[str, int]
+    version: Tuple = ()
+
+    def lookup(self, prefix: str) -> Tuple[int, ...]:
+        """Return the IDs of the proteins with a name or UniProt ID starting with ``prefix``."""
+        node = self.trie
+        for char in prefix.upper():
+            node = node.get(char)
+            if node is None:
+                return ()
+        return node[_PROTEINS]
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[SearchHit]:
+        """
+        Find proteins by name or UniProt ID prefix.
+
+        Args:
+            query (str): Search text, e.g. ``LAMP1``, ``lamp`` or ``P11279``
+            limit (int): Maximum number of hits
+            fuzzy (bool): Fall back to fuzzy name matching without prefix hits
+
+        Returns:
+            List[SearchHit]: Exact matches first, then shorter names first
+        """
+        query = query.strip().upper()
+        if not query:
+            return []
+
+        ids = self.lookup(query)
+        is_fuzzy = False
+        if not ids and fuzzy and len(query) >= FUZZY_MIN_LENGTH:
+            matches = difflib.get_close_matches(query, self.keys, n=limit, cutoff=FUZZY_CUTOFF)
+            ids = tuple(dict.fromkeys(self.keys[key] for key in matches))
+            is_fuzzy = True
+        if not is_fuzzy:
+            ids = sorted(ids, key=lambda i: (
+                query not in (self.proteins[i].upper(), self.uniprot_ids[i].upper()),
+                len(self.proteins[i]),
+                self.proteins[i],
+            ))
+
+        hits = []
+        for i in ids[:limit]:
+            protein, uniprot_id = self.proteins[i], self.uniprot_ids[i]
+            matched = uniprot_id if uniprot_id.upper().startswith(query) and not is_fuzzy else protein
+            hits.append(SearchHit(
+                protein=protein,
+                uniprot_id=uniprot_id,
+                matched=matched,
+                pairs=self.pairs[i],
+                conditions=tuple(self.conditions.get(pair, ()) for pair in self.pairs[i]),
+                fuzzy=is_fuzzy,
+            ))
+        return hits
+
+
+@timed('data_load', source='protein_index')
+def build_protein_index(pairs: Iterable[Tuple[str, str, str, str]],
+                        conditions: Optional[Dict[Tuple[str, str], Tuple[str, ...]]] = None,
+                        version: Tuple = ()) -> ProteinIndex:
+    """
+    Build the search index.
+
+    Args:
+        pairs (Iterable[Tuple[str, str, str, str]]): ``(bait, prey, bait_id,
+            prey_id)`` rows; IDs may be empty
+        conditions (Dict[Tuple[str, str], Tuple[str, ...]]): (bait, prey) -> conditions
+        version (Tuple): Version of the source data (cache key)
+
+    Returns:
+        ProteinIndex: The index
+    """
+    uniprot: Dict[str, str] = {}
+    protein_pairs: Dict[str, set] = {}
+    for bait, prey, bait_id, prey_id in pairs:
+        pair = (bait, prey)
+        for protein, uniprot_id in ((bait, bait_id), (prey, prey_id)):
+            protein_pairs.setdefault(protein, set()).add(pair)
+            if uniprot_id and not uniprot.get(protein):
+                uniprot[protein] = uniprot_id
+
+    proteins = sorted(protein_pairs)
+    uniprot_ids = [uniprot.get(protein, '') for protein in proteins]
+    keys: Dict[str, int] = {}
+    for i, protein in enumerate(proteins):
+        keys.setdefault(protein.upper(), i)
+        if uniprot_ids[i]:
+            keys.setdefault(uniprot_ids[i].upper(), i)
+
+    # Every node stores the proteins below it, so lookups never descend further
+    trie: dict = {_PROTEINS: tuple(range(len(proteins)))}
+    below: Dict[int, set] = {id(trie): set(range(len(proteins)))}
+    nodes = [trie]
+    for key, i in keys.items():
+        node = trie
+        for char in key:
+            child = node.get(char)
+            if child is None:
+                child = node[char] = {}
+                below[id(child)] = set()
+                nodes.append(child)
+            below[id(child)].add(i)
+            node = child
+    for node in nodes:
+        node[_PROTEINS] = tuple(sorted(below[id(node)]))
+
+    return ProteinIndex(
+        proteins=proteins,
+        uniprot_ids=uniprot_ids,
+        pairs=[tuple(sorted(protein_pairs[protein])) for protein in proteins],
+        conditions=conditions or {},
+        trie=trie,
+        keys=keys,
+        version=version,
+    )
+
+
+_index_lock = threading.Lock()
+_index: Optional[ProteinIndex] = None
+
+
+def load_protein_index() -> Optional[ProteinIndex]:
+    """
+    Return the shared search index, rebuilding it when the data changes.
+
+    Pairs and UniProt IDs come from the quant data; pairs that only exist in
+    the GraphML subnetworks are indexed by name.
+
+    Returns:
+        Optional[ProteinIndex]: The index, or None if no data is available
+    """
+    global _index
+
+    quant_data = load_quant_data()
+    interactome = load_interactome()
+    version = (
+        quant_data.version if quant_data is not None else (),
+        interactome.version if interactome is not None else (),
+    )
+    if _index is not None and _index.version == version:
+        return _index
+
+    with _index_lock:
+        if _index is not None and _index.version == version:
+            return _index
+        rows: List[Tuple[str, str, str, str]] = []
+        if quant_data is not None:
+            rows.extend(zip(quant_data.bait, quant_data.prey, quant_data.bait_id, quant_data.prey_id))
+        conditions: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        if interactome is not None:
+            for edge, (bait, prey) in enumerate(interactome.pairs(range(len(interactome)))):
+                rows.append((bait, prey, '', ''))
+                conditions[(bait, prey)] = tuple(
+                    c for c in interactome.edge_conditions(edge) if c != 'Total'
+                )
+        if not rows:
+            logger.error("No protein data available for the search index")
+            return None
+        _index = build_protein_index(rows, conditions, version)
+        return _index
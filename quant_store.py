@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Columnar Storage for the GAP-MS Quant Tables
+
+Converts the supplementary tables into typed Parquet files next to them,
+which the app reads instead of the CSV/XLSX sources:
+
+- ``DataS3`` (two-row header) becomes one float column per
+  (measure, phenotype, replicate), with a proper column MultiIndex and a
+  (Pair, Bait, Prey, BaitID, PreyID) row index
+- ``DataS4`` keeps its TopS scores as floats and stores the phenotype
+  effect flags (``HM_Up``, ``S_Down``, ...) as categoricals
+
+Stores are read with memory mapping and no text parsing. Each store records
+the size, modification time and SHA-256 of the CSV it was built from, and a
+stale store (CSV edited after conversion) is ignored in favour of the CSV
+until it is rebuilt. Loads compare the size and modification time; the CSV
+is only hashed when its size matches but its modification time does not
+(e.g. in a fresh checkout), once per process.
+``data/manifest.json`` is rewritten at the end (see health_check.py).
+
+Usage:
+    python quant_store.py [--force]
+"""
+
+import os
+import ast
+import sys
+import json
+import hashlib
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import DATA_PATHS
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# DataS3 banner prefix -> measure name
+_BANNER_MEASURES = {
+    'Normalized by Bait': 'normalized',
+    'Relative to HM': 'relative',
+}
+
+# DataS3 identifier columns -> parsed key
+_ID_COLUMNS = {
+    'Pair': 'pairs',
+    'Bait': 'bait',
+    'Prey': 'prey',
+    'BaitID': 'bait_id',
+    'PreyID': 'prey_id',
+}
+
+# Parquet schema metadata key holding the source size, mtime and hash
+_SOURCE_KEY = b'glyco.source'
+
+# Hashes of the sources checked against their store: (path, size, mtime_ns) -> sha256
+_source_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def store_path(source_path: str) -> str:
+    """Return the Parquet store path of a CSV table."""
+    return os.path.splitext(source_path)[0] + '.parquet'
+
+
+def _sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_current(source: Dict[str, object], source_path: str) -> bool:
+    """
+    Check whether a store was built from the CSV as it is on disk.
+
+    Args:
+        source (Dict[str, object]): Source record of the store
+        source_path (str): CSV table
+
+    Returns:
+        bool: Whether the CSV is unchanged since the store was built
+    """
+    stat = os.stat(source_path)
+    if source.get('size', stat.st_size) != stat.st_size:
+        return False
+    if source.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _source_hashes:
+        _source_hashes[key] = _sha256(source_path)
+    return _source_hashes[key] == source.get('sha256')
+
+
+def parse_quant_table(quant_path: str) -> Dict[str, object]:
+    """
+    Parse the two-row-header DataS3 table.
+
+    The first header row holds the "Normalized by Bait" / "Relative to HM"
+    banners above the replicate columns, the second row the column names
+    (``HM_1`` ... ``FS_3``).
+
+    Args:
+        quant_path (str): Path to the DataS3 CSV file
+
+    Returns:
+        Dict[str, object]: ``pairs``/``bait``/``prey``/``bait_id``/``prey_id``
+        columns, the ``phenotypes`` list and one (pairs, phenotypes,
+        replicates) array per measure
+    """
+    import pandas as pd
+
+    raw = pd.read_csv(quant_path, header=[0, 1], encoding='utf-8-sig')
+    banners = pd.Series(
+        [None if str(banner).startswith('Unnamed') else banner for banner, _ in raw.columns]
+    ).ffill()
+    names = [name for _, name in raw.columns]
+    table = raw.droplevel(0, axis=1)
+    table.columns = range(len(names))
+
+    parsed: Dict[str, object] = {}
+    for column, key in _ID_COLUMNS.items():
+        parsed[key] = table[names.index(column)].astype(str).to_numpy()
+
+    phenotypes: List[str] = []
+    for prefix, measure in _BANNER_MEASURES.items():
+        columns = [
+            i for i, banner in enumerate(banners)
+            if isinstance(banner, str) and banner.startswith(prefix)
+        ]
+        column_phenotypes = [names[i].rsplit('_', 1)[0] for i in columns]
+        measure_phenotypes = list(dict.fromkeys(column_phenotypes))
+        if phenotypes and measure_phenotypes != phenotypes:
+            raise ValueError(f"Inconsistent phenotypes in {quant_path}: {measure_phenotypes}")
+        phenotypes = measure_phenotypes
+        values = table[columns].to_numpy(dtype=float)
+        parsed[measure] = values.reshape(len(table), len(phenotypes), -1)
+
+    parsed['phenotypes'] = phenotypes
+    return parsed
+
+
+def quant_frame(parsed: Dict[str, object]):
+    """
+    Arrange parsed DataS3 columns as a typed DataFrame.
+
+    Args:
+        parsed (Dict[str, object]): Output of ``parse_quant_table``
+
+    Returns:
+        pandas.DataFrame: float64 values with (measure, phenotype, replicate)
+        columns and a (Pair, Bait, Prey, BaitID, PreyID) index
+    """
+    import pandas as pd
+
+    measures = list(_BANNER_MEASURES.values())
+    n_pairs, _, n_replicates = parsed[measures[0]].shape
+    columns = pd.MultiIndex.from_tuples(
+        [(measure, phenotype, str(replicate + 1))
+         for measure in measures
+         for phenotype in parsed['phenotypes']
+         for replicate in range(n_replicates)],
+        names=['measure', 'phenotype', 'replicate'],
+    )
+    index = pd.MultiIndex.from_arrays(
+        [parsed[key] for key in _ID_COLUMNS.values()], names=list(_ID_COLUMNS)
+    )
+    values = np.concatenate([parsed[m].reshape(n_pairs, -1) for m in measures], axis=1)
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def clustering_frame(clustering_path: str):
+    """
+    Read DataS4 with explicit column types.
+
+    Args:
+        clustering_path (str): Path to the DataS4 CSV file
+
+    Returns:
+        pandas.DataFrame: String Bait/Prey, float TopS scores and categorical
+        effect flags
+    """
+    import pandas as pd
+
+    clustering = pd.read_csv(clustering_path, encoding='utf-8-sig', dtype={'Bait': str, 'Prey': str})
+    for column in clustering.columns[2:]:
+        if not pd.api.types.is_numeric_dtype(clustering[column]) or clustering[column].isna().all():
+            clustering[column] = clustering[column].astype('category')
+    return clustering
+
+
+def write_store(frame, source_path: str, path: Optional[str] = None) -> str:
+    """
+    Write a DataFrame as the Parquet store of a CSV table.
+
+    Args:
+        frame (pandas.DataFrame): Table to store
+        source_path (str): CSV the table was read from
+        path (str): Store path; defaults to ``store_path(source_path)``
+
+    Returns:
+        str: Store path
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = path or store_path(source_path)
+    table = pa.Table.from_pandas(frame)
+    stat = os.stat(source_path)
+    source = {
+        'file': os.path.basename(source_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _sha256(source_path),
+    }
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _SOURCE_KEY: json.dumps(source).encode()}
+    )
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_store_table(source_path: str):
+    """
+    Memory-map the Parquet store of a CSV table if it is up to date.
+
+    Args:
+        source_path (str): CSV table the store was built from
+
+    Returns:
+        Optional[pyarrow.Table]: The stored table, or None if the store is
+        missing or older than the CSV
+    """
+    import pyarrow.parquet as pq
+
+    path = store_path(source_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        table = pq.read_table(path, memory_map=True)
+        source = json.loads((table.schema.metadata or {}).get(_SOURCE_KEY, b'{}'))
+        if os.path.exists(source_path) and not _is_current(source, source_path):
+            logger.warning(f"Ignoring stale store {path}; run quant_store.py to rebuild it")
+            return None
+        return table
+    except Exception as e:
+        logger.error(f"Error reading store {path}: {e}")
+        return None
+
+
+def read_store(source_path: str):
+    """
+    Read the Parquet store of a CSV table as a DataFrame.
+
+    Args:
+        source_path (str): CSV table the store was built from
+
+    Returns:
+        Optional[pandas.DataFrame]: The stored table with its index and
+        column MultiIndex restored, or None if there is no up-to-date store
+    """
+    table = read_store_table(source_path)
+    return table.to_pandas() if table is not None else None
+
+
+@timed('file_read', kind='quant_table')
+def load_quant_table(quant_path: str = DATA_PATHS['quant_data']) -> Dict[str, object]:
+    """
+    Load DataS3 from its store, falling back to parsing the CSV.
+
+    The arrays are taken straight from the Arrow columns; rebuilding the
+    pandas MultiIndex would cost more than parsing the CSV at this size.
+
+    Args:
+        quant_path (str): Path to the DataS3 CSV file
+
+    Returns:
+        Dict[str, object]: Same layout as ``parse_quant_table``
+    """
+    table = read_store_table(quant_path)
+    if table is None:
+        return parse_quant_table(quant_path)
+
+    parsed: Dict[str, object] = {
+        key: np.asarray(table.column(column).to_pylist(), dtype=object)
+        for column, key in _ID_COLUMNS.items()
+    }
+    # Value columns are stored under their stringified (measure, phenotype,
+    # replicate) tuples
+    columns = [
+        (ast.literal_eval(name), i) for i, name in enumerate(table.column_names)
+        if name.startswith('(')
+    ]
+    phenotypes = list(dict.fromkeys(phenotype for (_, phenotype, _), _ in columns))
+    for measure in _BANNER_MEASURES.values():
+        values = np.column_stack([
+            table.column(i).to_numpy() for (column_measure, _, _), i in columns
+            if column_measure == measure
+        ])
+        parsed[measure] = values.reshape(table.num_rows, len(phenotypes), -1)
+    parsed['phenotypes'] = phenotypes
+    return parsed
+
+
+@timed('file_read', kind='clustering_table')
+def load_clustering_table(clustering_path: str = DATA_PATHS['clustering_data']):
+    """
+    Load DataS4 from its store, falling back to reading the CSV.
+
+    Args:
+        clustering_path (str): Path to the DataS4 CSV file
+
+    Returns:
+        pandas.DataFrame: Typed DataS4 table (see ``clustering_frame``)
+    """
+    frame = read_store(clustering_path)
+    return frame if frame is not None else clustering_frame(clustering_path)
+
+
+def main() -> int:
+    """Convert the quant tables to their columnar stores."""
+    from health_check import refresh_data_manifest
+
+    parser = argparse.ArgumentParser(description="Convert DataS3/DataS4 to typed Parquet stores.")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date stores")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Quant Store")
+    print("=" * 50)
+
+    builders = [
+        (DATA_PATHS['quant_data'], lambda path: quant_frame(parse_quant_table(path))),
+        (DATA_PATHS['clustering_data'], clustering_frame),
+    ]
+    failures = 0
+    for source_path, build_frame in builders:
+        if not os.path.exists(source_path):
+            print(f"❌ {source_path} does not exist")
+            failures += 1
+            continue
+        if not args.force and read_store(source_path) is not None:
+            print(f"✅ {store_path(source_path)} is up to date")
+            continue
+        try:
+            frame = build_frame(source_path)
+            path = write_store(frame, source_path)
+        except Exception as e:
+            print(f"❌ {source_path}: {e}")
+            failures += 1
+            continue
+        print(f"✅ {path}: {frame.shape[0]} rows x {frame.shape[1]} columns, "
+              f"{os.path.getsize(path) / 1024:.1f} KB")
+    if failures:
+        return 1
+    return 0 if refresh_data_manifest() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Static asset server for the Glyco Interactome network pages.
+
+Serves the pre-rendered network pages (and the shared JavaScript/CSS under
+``lib/``) as plain cacheable files, so the Streamlit app can embed them by
+URL instead of pushing their source through the websocket on every rerun.
+
+- every response carries a strong ``ETag`` (SHA-256 of the content) and
+  conditional requests are answered with ``304 Not Modified``
+- requests for a versioned URL (``?v=<hash prefix>`` matching the content)
+  are served with ``Cache-Control: immutable`` for a year
+- file contents are kept in memory and only re-read when their mtime or
+  size changes
+- gzip/brotli copies written by ``precompress.py`` are sent to browsers
+  that accept them (``Accept-Encoding``), so nothing is compressed per
+  request; missing copies are written when the server starts
+
+Point the app at the server with ``GLYCO_NETWORK_ASSET_URL``:
+
+Usage:
+    python static_server.py [--host 0.0.0.0] [--port 8502] [--no-precompress]
+    GLYCO_NETWORK_ASSET_URL=http://localhost:8502/data/Total_html/ streamlit run streamlit_app.py
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import argparse
+import mimetypes
+import threading
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config import DATA_PATHS
+from metrics import timed
+from precompress import ENCODING_SUFFIXES, compressed_path, is_fresh, precompress_tree
+
+logger = logging.getLogger(__name__)
+
+# URL prefix -> directory served under it. The URLs mirror the repository
+# layout so the relative ``lib/`` references of pages built with
+# ``build_networks.py --assets local`` resolve the same way as on disk.
+STATIC_ROUTES = {
+    '/' + DATA_PATHS['network_html']: DATA_PATHS['network_html'],
+    '/lib/': 'lib/',
+}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+# Length of the content-hash prefix used in versioned URLs
+VERSION_LENGTH = 16
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A static file held in memory."""
+    data: bytes
+    sha256: str
+    content_type: str
+    stat_key: Tuple
+    encoded: Dict[str, bytes] = field(default_factory=dict)  # Content-Encoding -> body
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.sha256}"'
+
+    def encoded_etag(self, encoding: Optional[str]) -> str:
+        """Return the ETag of the body sent with an encoding (None for identity)."""
+        return f'"{self.sha256}-{encoding}"' if encoding else self.etag
+
+    @property
+    def version(self) -> str:
+        return self.sha256[:VERSION_LENGTH]
+
+
+_asset_lock = threading.Lock()
+_assets: Dict[str, Asset] = {}
+
+
+def resolve_asset(url_path: str, routes: Dict[str, str] = STATIC_ROUTES) -> Optional[str]:
+    """
+    Map a URL path to a file below one of the static roots.
+
+    Args:
+        url_path (str): Request path, e.g. ``/data/Total_html/HM_Enhanced.html``
+        routes (Dict[str, str]): URL prefix -> directory
+
+    Returns:
+        Optional[str]: File path, or None if the path is outside every root
+    """
+    url_path = unquote(url_path)
+    for prefix, root in routes.items():
+        if not url_path.startswith(prefix):
+            continue
+        root = os.path.realpath(root)
+        path = os.path.realpath(os.path.join(root, url_path[len(prefix):]))
+        if path.startswith(root + os.sep) and os.path.isfile(path):
+            return path
+    return None
+
+
+def load_asset(path: str) -> Asset:
+    """
+    Return the in-memory copy of a file, re-reading it if it changed.
+
+    Precompressed copies are loaded along with the file when they are
+    fresh (same mtime as the file).
+
+    Args:
+        path (str): File path
+
+    Returns:
+        Asset: File content, hash, content type and compressed bodies
+    """
+    stat = os.stat(path)
+    fresh = tuple(encoding for encoding in ENCODING_SUFFIXES if is_fresh(path, encoding))
+    stat_key = (stat.st_mtime_ns, stat.st_size, fresh)
+    asset = _assets.get(path)
+    if asset is not None and asset.stat_key == stat_key:
+        return asset
+
+    encoded = {}
+    with timed('file_read', kind='static_asset'):
+        with open(path, 'rb') as asset_file:
+            data = asset_file.read()
+        for encoding in fresh:
+            try:
+                with open(compressed_path(path, encoding), 'rb') as encoded_file:
+                    encoded[encoding] = encoded_file.read()
+            except OSError:
+                continue
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type.endswith('javascript'):
+        content_type += '; charset=utf-8'
+    asset = Asset(data, hashlib.sha256(data).hexdigest(), content_type, stat_key, encoded)
+    with _asset_lock:
+        _assets[path] = asset
+    return asset
+
+
+def choose_encoding(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Pick the content coding to send.
+
+    Args:
+        accept_encoding (str): ``Accept-Encoding`` request header
+        available (List[str]): Encodings of the precompressed copies, in
+            order of preference
+
+    Returns:
+        Optional[str]: Encoding with the highest ``q`` the client accepts
+        (ties go to the first available), or None for the identity body
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def asset_url(base_url: str, filename: str, sha256: Optional[str] = None) -> str:
+    """
+    Build the URL of an asset, versioned by its content hash when known.
+
+    Args:
+        base_url (str): Base URL of the asset directory
+        filename (str): File name below the base URL
+        sha256 (str): Hex SHA-256 of the file content
+
+    Returns:
+        str: Asset URL
+    """
+    url = f"{base_url.rstrip('/')}/{filename}"
+    return f"{url}?v={sha256[:VERSION_LENGTH]}" if sha256 else url
+
+
+class StaticAssetHandler(BaseHTTPRequestHandler):
+    """Serve ``STATIC_ROUTES`` with ETag and immutable caching."""
+
+    server_version = "GlycoStatic/1.0"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        path = resolve_asset(url.path)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        try:
+            asset = load_asset(path)
+        except OSError as e:
+            logger.error(f"Error reading static asset {path}: {e}")
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR)
+            return
+
+        versioned = parse_qs(url.query).get('v', [''])[0] == asset.version
+        cache_control = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+        encoding = choose_encoding(self.headers.get('Accept-Encoding', ''), list(asset.encoded))
+        body = asset.encoded[encoding] if encoding else asset.data
+        etag = asset.encoded_etag(encoding)
+
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            if asset.encoded:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if asset.encoded:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def main() -> int:
+    """Run the static asset server."""
+    parser = argparse.ArgumentParser(description="Serve network pages as static assets.")
+    parser.add_argument('--host', default='0.0.0.0', help="interface to bind")
+    parser.add_argument('--port', type=int, default=8502, help="port to listen on")
+    parser.add_argument('--no-precompress', action='store_true',
+                        help="do not write missing gzip/brotli copies at startup")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.no_precompress:
+        written = sum(
+            size is not None
+            for sizes in precompress_tree(list(STATIC_ROUTES.values())).values()
+            for size in sizes.values()
+        )
+        if written:
+            print(f"🗜️  Wrote {written} precompressed copies")
+    server = ThreadingHTTPServer((args.host, args.port), StaticAssetHandler)
+    print(f"🌐 Serving {', '.join(STATIC_ROUTES)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,45 +10,73 @@ Repository: https://github.com/Eva-1023/Glyco_Interactome
 Contact: liy24@m.fudan.edu.cn
 """
 
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import os
 import re
 import logging
+from functools import lru_cache
+from urllib.parse import urlencode
 from typing import Dict, Set, List, Tuple, Optional
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
-from PIL import Image
-#auto wake
-STREAMLIT_APPS = [
-    "https://glycointeractome-2024.streamlit.app/"
-]
+
+from config import (
+    DATA_PATHS, EXPORT_API_URL, FIGURE_TYPES, GLYCOSYLATION_TYPES, NETWORK_ASSET_URL, OPTIONAL_DATA_PATHS,
+    PAGE_CONTENT_WIDTH
+)
+from data_catalog import get_catalog
+from image_variants import VARIANT_WIDTHS, get_display_image, get_figure_variant, select_variant
+from build_networks import inline_local_assets
+from static_server import asset_url
+from metrics import flush_metrics, page_context, record_bytes, timed
+# The data modules (figure_engine, interactome, subnetworks, protein_search,
+# export) pull in NumPy, Matplotlib and the data files; they are imported by
+# the pages that use them so the Abstract and Contact pages start without them
+
+_IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
+# Pairs per comparison figure; more are rendered on "Load more"
+COMPARISON_PAGE_SIZES = {'Heatmap': 40, 'Grid': 12}
+
+# Largest export built in the app's memory (about 0.8 MB per pair); larger
+# selections need the streaming endpoint (EXPORT_API_URL) or export.py
+MAX_APP_EXPORT_PAIRS = 12
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Disable PIL's DecompressionBombWarning for large images
-Image.MAX_IMAGE_PIXELS = None
-
-# Constants
-DATA_PATHS = {
-    'network_html': 'data/Total_html/',
-    'boxplot_normalized': 'data/boxplot_normalized/',
-    'boxplot_relative': 'data/boxplot_relative/',
-    'tops_score': 'data/TopS_Score/',
-    'abstract_image': 'data/image/Abstract.jpg',
-    'blank_image': 'data/blank.png'
-}
-
-GLYCOSYLATION_TYPES = {
-    'F': 'Fucosylated (F) type',
-    'S': 'Sialylated (S) type',
-    'FS': 'Sialofucosylated (FS) type',
-    'Neu': 'Neutral (Neu) type',
-    'HM': 'High Mannose (HM) type',
-    'Total': 'Total'
-}
+
+@st.cache_resource
+def _startup_timings() -> Dict[str, float]:
+    """Return the process-wide cold start record (kept across reruns and sessions)."""
+    return {}
+
+
+def report_startup(page: str, page_time: float) -> None:
+    """
+    Log how long the first run of the app took, once per process.
+    
+    Args:
+        page (str): Page shown by the first run
+        page_time (float): Seconds spent rendering the first run
+    """
+    timings = _startup_timings()
+    if timings:
+        return
+    timings.update(
+        imports=_IMPORT_TIME,
+        first_run=page_time,
+        process_cpu=time.process_time(),
+    )
+    logger.info(
+        f"Cold start: app imports {_IMPORT_TIME * 1000:.0f} ms, first run ({page}) "
+        f"{page_time * 1000:.0f} ms, process CPU time so far {timings['process_cpu']:.2f} s"
+    )
 
 
 def validate_data_paths() -> bool:
@@ -58,11 +86,13 @@ def validate_data_paths() -> bool:
     Returns:
         bool: True if all required paths exist, False otherwise
     """
-    missing_paths = []
-    for path_name, path_value in DATA_PATHS.items():
-        if not os.path.exists(path_value):
-            missing_paths.append(path_value)
-            logger.warning(f"Missing data path: {path_value}")
+    catalog_missing = set(get_catalog().missing_paths)
+    missing_paths = [
+        path_value for path_name, path_value in DATA_PATHS.items()
+        if path_value in catalog_missing and path_name not in OPTIONAL_DATA_PATHS
+    ]
+    for path_value in catalog_missing:
+        logger.warning(f"Missing data path: {path_value}")
     
     if missing_paths:
         st.error(f"Missing required data directories: {', '.join(missing_paths)}")
@@ -70,80 +100,178 @@ def validate_data_paths() -> bool:
     return True
 
 
-def get_network_conditions(html_path: str) -> Tuple[Set[str], Dict[str, Set[str]]]:
+@lru_cache(maxsize=4)
+def _pair_lists(catalog_fingerprint: Tuple, quant_version: Tuple) -> Tuple[List[str], Dict[str, List[str]]]:
     """
-    Extract available network conditions from HTML files.
+    Merge the pairs found in the quant data with the pre-rendered figures.
     
     Args:
-        html_path (str): Path to directory containing HTML files
+        catalog_fingerprint (Tuple): Fingerprint of the current catalog (cache key)
+        quant_version (Tuple): Version of the current quant data (cache key)
         
     Returns:
-        Tuple[Set[str], Dict[str, Set[str]]]: Primary conditions and secondary conditions
+        Tuple[List[str], Dict[str, List[str]]]: Primary proteins and secondary proteins
+    """
+    from figure_engine import load_quant_data
+    
+    protein2_sets = {p1: set(p2s) for p1, p2s in get_catalog().protein2_dict.items()}
+    quant_data = load_quant_data()
+    if quant_data is not None:
+        for bait, preys in quant_data.partners().items():
+            protein2_sets.setdefault(bait, set()).update(preys)
+    protein1_list = sorted(protein2_sets)
+    protein2_dict = {p1: sorted(p2s) for p1, p2s in protein2_sets.items()}
+    return protein1_list, protein2_dict
+
+
+@lru_cache(maxsize=4)
+def _prey_baits(catalog_fingerprint: Tuple, quant_version: Tuple) -> Dict[str, List[str]]:
+    """Return prey -> baits of the pair lists (cached like ``_pair_lists``)."""
+    from prefetch import prey_baits
+    
+    return prey_baits(_pair_lists(catalog_fingerprint, quant_version)[1])
+
+
+def _figure_widths() -> Tuple[int, int]:
+    """Return the column width of the pair page and the width its figures are rendered at."""
+    column_width = PAGE_CONTENT_WIDTH // len(FIGURE_TYPES)
+    return column_width, VARIANT_WIDTHS[select_variant(column_width)]
+
+
+def _default_pairs() -> List[str]:
+    """Return the pair shown first for every bait, in sidebar order."""
+    from figure_engine import load_quant_data
+    from prefetch import WARM_UP_PAIRS
+    
+    quant_data = load_quant_data()
+    protein1_list, protein2_dict = _pair_lists(
+        get_catalog().fingerprint, quant_data.version if quant_data is not None else ()
+    )
+    return [f"{protein1}_{protein2_dict[protein1][0]}"
+            for protein1 in protein1_list[:WARM_UP_PAIRS] if protein2_dict[protein1]]
+
+
+@st.cache_resource
+def _previous_views() -> List[str]:
+    """Return the most viewed pairs of the previous process, read once per process."""
+    from prefetch import most_viewed
+    
+    return most_viewed()
+
+
+@st.cache_resource
+def _warm_up_figures() -> bool:
+    """Start rendering the default and most viewed pairs, once per process."""
+    from prefetch import warm_up
+    
+    column_width, render_width = _figure_widths()
+    warm_up(_default_pairs, _previous_views(), render_width, column_width)
+    return True
+
+
+def show_image(image, kind: str = 'figure', **kwargs) -> None:
+    """
+    Display an image and count its size in the page's bytes served.
+    
+    Args:
+        image: PNG/JPEG bytes or an image file path
+        kind (str): Payload kind recorded in the metrics
+        **kwargs: Passed to ``st.image``
     """
     try:
-        condition1_set = set()
-        condition2_set = {}
-        
-        if not os.path.exists(html_path):
-            logger.error(f"HTML path does not exist: {html_path}")
-            return set(), {}
-        
-        for filename in os.listdir(html_path):
-            if filename.endswith('.html'):
-                base_name = filename.replace('.html', '')
-                if '_' in base_name:
-                    p1, p2 = base_name.split('_', 1)  # Split only on first underscore
-                    condition1_set.add(p1)
-                    if p1 not in condition2_set:
-                        condition2_set[p1] = set()
-                    condition2_set[p1].add(p2)
-                else:
-                    condition1_set.add(base_name)
-        
-        return condition1_set, condition2_set
+        size = len(image) if isinstance(image, bytes) else os.path.getsize(image)
+    except OSError:
+        size = 0
+    record_bytes(kind, size)
+    st.image(image, **kwargs)
+
+
+def show_html(html: str, kind: str = 'network_html', **kwargs) -> None:
+    """
+    Embed an HTML page and count its size in the page's bytes served.
     
-    except Exception as e:
-        logger.error(f"Error extracting network conditions: {e}")
-        return set(), {}
+    Args:
+        html (str): Page source
+        kind (str): Payload kind recorded in the metrics
+        **kwargs: Passed to ``components.html``
+    """
+    record_bytes(kind, len(html.encode('utf-8')))
+    st.components.v1.html(html, **kwargs)
 
 
-def get_protein_pairs(boxplot_path: str) -> Tuple[List[str], Dict[str, List[str]]]:
+@lru_cache(maxsize=32)
+@timed('file_read', kind='network_html')
+def _read_network_html(html_file_path: str, catalog_fingerprint: Tuple) -> str:
     """
-    Extract available protein pairs from boxplot PNG files.
+    Read a network page once per catalog version.
+    
+    Pages built with local assets reference the shared files in ``lib/``,
+    which cannot be resolved from ``components.html``, so they are inlined.
     
     Args:
-        boxplot_path (str): Path to directory containing boxplot PNG files
+        html_file_path (str): Path to the HTML file
+        catalog_fingerprint (Tuple): Fingerprint of the current catalog (cache key)
         
     Returns:
-        Tuple[List[str], Dict[str, List[str]]]: Primary proteins and secondary proteins
+        str: HTML source
     """
-    try:
-        protein1_set = set()
-        protein2_set = {}
-        
-        if not os.path.exists(boxplot_path):
-            logger.error(f"Boxplot path does not exist: {boxplot_path}")
-            return [], {}
-        
-        for filename in os.listdir(boxplot_path):
-            if filename.endswith(".png"):
-                name_str = filename.replace('.png', '')
-                parts = name_str.split('_')
-                if len(parts) >= 2:
-                    p1, p2 = parts[0], parts[1]
-                    protein1_set.add(p1)
-                    if p1 not in protein2_set:
-                        protein2_set[p1] = set()
-                    protein2_set[p1].add(p2)
-        
-        protein1_list = sorted(protein1_set)
-        protein2_dict = {x: sorted(protein2_set[x]) for x in protein2_set}
-        
-        return protein1_list, protein2_dict
+    with open(html_file_path, 'r', encoding='utf-8') as html_file:
+        source_code = html_file.read()
+    return inline_local_assets(source_code, os.path.dirname(html_file_path))
+
+
+def subnetwork_view():
+    """Display a subnetwork filtered by protein, bait and phenotype."""
+    from interactome import load_interactome
+    from subnetworks import MAX_SUBNETWORK_EDGES, SubnetworkQuery, render_subnetwork
+    
+    interactome = load_interactome()
+    if interactome is None:
+        st.error("❌ No interactome data found. Please ensure the GraphML files are present in the data directory.")
+        return
     
+    st.sidebar.markdown("Filter the interactome to the interactions of interest:")
+    baits = st.sidebar.multiselect(
+        'Baits',
+        [p for p, is_bait in zip(interactome.proteins, interactome.is_bait) if is_bait],
+        help="Only show interactions of these baits (all baits if empty)"
+    )
+    proteins = st.sidebar.multiselect(
+        'Proteins',
+        interactome.proteins,
+        help="Only show interactions involving these proteins (all proteins if empty)"
+    )
+    conditions = st.sidebar.multiselect(
+        'Phenotype Effects',
+        sorted(interactome.flags),
+        help="Only show interactions with these DataS4 effects, e.g. HM_Up or S_Down"
+    )
+    match_all = False
+    if len(conditions) > 1:
+        match_all = st.sidebar.radio(
+            'Match',
+            ['Any effect', 'All effects'],
+            horizontal=True
+        ) == 'All effects'
+    
+    query = SubnetworkQuery.create(proteins, baits, conditions, match_all)
+    try:
+        subnetwork = render_subnetwork(query)
     except Exception as e:
-        logger.error(f"Error extracting protein pairs: {e}")
-        return [], {}
+        logger.error(f"Error rendering subnetwork {query}: {e}")
+        st.error("❌ Failed to render the subnetwork. Please try again.")
+        return
+    
+    if subnetwork is None:
+        st.warning("⚠️ No interactions match the selected filters.")
+        return
+    
+    show_html(subnetwork.html, kind='subnetwork_html', height=800, width=1000)
+    filters = [', '.join(f) for f in (query.baits, query.proteins, query.conditions) if f]
+    st.info(f"📊 Currently displaying: **{subnetwork.nodes} proteins, {subnetwork.edges} interactions**" +
+           (f" ({' · '.join(filters)})" if filters else " (full interactome)"))
+    if subnetwork.truncated:
+        st.warning(f"⚠️ Showing the first {MAX_SUBNETWORK_EDGES} interactions; narrow the filters to see the rest.")
 
 
 def network_page():
@@ -151,8 +279,19 @@ def network_page():
     st.title('🌐 Glyco Interactome Network')
     st.markdown("---")
     
+    view = st.sidebar.radio(
+        'Network View',
+        ['Glycosylation Conditions', 'Custom Subnetwork'],
+        help="Browse the published networks or build a subnetwork from filters"
+    )
+    if view == 'Custom Subnetwork':
+        st.sidebar.title("🔍 Custom Subnetwork")
+        subnetwork_view()
+        return
+    
     # Get network conditions
-    condition1_set, condition2_set = get_network_conditions(DATA_PATHS['network_html'])
+    catalog = get_catalog()
+    condition1_set, condition2_set = catalog.network_conditions, catalog.network_subconditions
     
     if not condition1_set:
         st.error("❌ No network data found. Please ensure HTML files are present in the data directory.")
@@ -195,97 +334,335 @@ def network_page():
         st.error(f"Invalid condition selected: {option1}")
         return
     
-    # Construct HTML file path
-    if option2:
-        html_file_path = os.path.join(DATA_PATHS['network_html'], f"{option1_file[0]}_{option2}.html")
-    else:
-        html_file_path = os.path.join(DATA_PATHS['network_html'], f"{option1_file[0]}.html")
+    # Look up the HTML file path
+    html_file_path = catalog.network_file(option1_file[0], option2)
     
     # Display network visualization
     try:
-        if os.path.exists(html_file_path):
-            with open(html_file_path, 'r', encoding='utf-8') as html_file:
-                source_code = html_file.read()
-                st.components.v1.html(source_code, height=800, width=1000)
-                
-                # Add information about the current network
-                st.info(f"📊 Currently displaying: **{option1}**" + 
-                       (f" → **{option2}**" if option2 else ""))
+        if html_file_path:
+            if NETWORK_ASSET_URL:
+                # Embed the static page by URL so the browser can cache it
+                page_url = asset_url(
+                    NETWORK_ASSET_URL,
+                    os.path.basename(html_file_path),
+                    catalog.network_hash(option1_file[0], option2)
+                )
+                st.components.v1.iframe(page_url, height=800, width=1000)
+            else:
+                source_code = _read_network_html(html_file_path, catalog.fingerprint)
+                show_html(source_code, height=800, width=1000)
+            
+            # Add information about the current network
+            st.info(f"📊 Currently displaying: **{option1}**" + 
+                   (f" → **{option2}**" if option2 else ""))
         else:
-            st.error(f"❌ Network file not found: {os.path.basename(html_file_path)}")
+            network_name = f"{option1_file[0]}_{option2}" if option2 else option1_file[0]
+            st.error(f"❌ Network file not found: {network_name}.html")
             
     except Exception as e:
         logger.error(f"Error loading network visualization: {e}")
         st.error("❌ Failed to load network visualization. Please try again.")
 
 
+def protein_search_sidebar() -> Optional[Tuple[str, str]]:
+    """
+    Show the protein search box and the pairs matching it.
+    
+    Returns:
+        Optional[Tuple[str, str]]: Selected (bait, prey) pair, or None when
+        nothing is searched or found
+    """
+    from protein_search import load_protein_index
+    
+    query = st.sidebar.text_input(
+        'Search Proteins',
+        placeholder="Gene name or UniProt ID, e.g. LAMP1",
+        help="Find every pair of a bait or prey by name or UniProt ID prefix"
+    )
+    if not query.strip():
+        return None
+    
+    protein_index = load_protein_index()
+    hits = protein_index.search(query) if protein_index is not None else []
+    if not hits:
+        st.sidebar.warning(f"No proteins match \"{query}\".")
+        return None
+    
+    conditions = {}
+    for hit in hits:
+        conditions.update(zip(hit.pairs, hit.conditions))
+    st.sidebar.caption(
+        ("Similar to: " if hits[0].fuzzy else "Matches: ") +
+        ", ".join(f"{hit.protein} ({hit.uniprot_id})" if hit.uniprot_id else hit.protein for hit in hits)
+    )
+    return st.sidebar.selectbox(
+        'Matching Pairs',
+        list(conditions),
+        format_func=lambda pair: f"{pair[0]} ↔ {pair[1]}  ·  {', '.join(conditions[pair]) or 'no subnetwork'}",
+        help="Pairs of the matching proteins, with the subnetworks they belong to"
+    )
+
+
+def export_button(pairs: List[str], file_name: str, key: str):
+    """
+    Offer the figures, data rows and networks of pairs as a zip download.
+    
+    With ``EXPORT_API_URL`` set, the button links to the API's streaming
+    ``/api/export`` endpoint. Otherwise the archive is built in memory when
+    the button is clicked, for at most ``MAX_APP_EXPORT_PAIRS`` pairs.
+    
+    Args:
+        pairs (List[str]): Pairs to export
+        file_name (str): Name of the downloaded file
+        key (str): Widget key
+    """
+    from export import ExportSelection, iter_export
+    
+    help_text = "Figures, DataS3/DataS4 rows and the subnetworks of the pairs as a zip archive"
+    if EXPORT_API_URL:
+        query = urlencode([('pair', pair) for pair in pairs])
+        st.link_button("📦 Export pairs", f"{EXPORT_API_URL.rstrip('/')}/api/export?{query}", help=help_text)
+        return
+    if len(pairs) > MAX_APP_EXPORT_PAIRS:
+        st.button("📦 Export pairs", key=key, disabled=True, help=help_text)
+        st.caption(f"Exports from the app are limited to {MAX_APP_EXPORT_PAIRS} pairs; "
+                   f"use `python export.py --bait` for larger selections.")
+        return
+    
+    selection = ExportSelection(pairs=tuple(pairs))
+    st.download_button(
+        "📦 Export pairs",
+        data=lambda: b''.join(iter_export(selection)),
+        file_name=file_name,
+        mime='application/zip',
+        key=key,
+        on_click='ignore',
+        help=help_text
+    )
+
+
+def comparison_view(protein1_list: List[str], protein2_dict: Dict[str, List[str]]):
+    """
+    Display many pairs as one heatmap or faceted bar chart.
+    
+    Figures are rendered a page of pairs at a time; further pages are only
+    rendered when requested with "Load more".
+    
+    Args:
+        protein1_list (List[str]): Primary proteins
+        protein2_dict (Dict[str, List[str]]): Secondary proteins per primary protein
+    """
+    from figure_engine import load_quant_data, render_comparison
+    
+    quant_data = load_quant_data()
+    if quant_data is None:
+        st.error("❌ Pair comparison needs the quant data. Please ensure DataS3 is present in the data directory.")
+        return
+    
+    protein1 = st.sidebar.selectbox(
+        'Primary Protein',
+        protein1_list,
+        help="Compare the pairs of this protein"
+    )
+    partners = [
+        protein2 for protein2 in protein2_dict.get(protein1, [])
+        if f"{protein1}_{protein2}" in quant_data
+    ]
+    selected = st.sidebar.multiselect(
+        'Secondary Proteins',
+        partners,
+        help="Pairs to compare (all partners if empty)"
+    ) or partners
+    if not selected:
+        st.warning(f"⚠️ No quantified pairs available for {protein1}.")
+        return
+    
+    analysis_types = {
+        'Abundance': 'boxplot_normalized',
+        'Relative Abundance': 'boxplot_relative',
+        'TopS Score': 'tops_score',
+    }
+    measure = st.sidebar.selectbox('Measure', list(analysis_types))
+    kind = st.sidebar.radio('Layout', ['Heatmap', 'Grid'], horizontal=True)
+    
+    pairs = [f"{protein1}_{protein2}" for protein2 in selected]
+    page_size = COMPARISON_PAGE_SIZES[kind]
+    state_key = f"comparison_pages:{kind}:{','.join(pairs)}"
+    pages = st.session_state.get(state_key, 1)
+    
+    st.subheader(f"{measure} of {len(pairs)} {protein1} pairs")
+    for start in range(0, min(len(pairs), pages * page_size), page_size):
+        figure_bytes = render_comparison(
+            kind.lower(), analysis_types[measure], pairs[start:start + page_size], PAGE_CONTENT_WIDTH
+        )
+        if figure_bytes:
+            show_image(figure_bytes)
+    
+    shown = min(len(pairs), pages * page_size)
+    if shown < len(pairs):
+        st.caption(f"Showing {shown} of {len(pairs)} pairs")
+        if st.button("Load more"):
+            st.session_state[state_key] = pages + 1
+            st.rerun()
+    
+    with st.sidebar:
+        export_button(pairs, f"{protein1}_pairs.zip", key='export_comparison')
+
+
+def clustering_view(protein1_list: List[str]):
+    """
+    Display the DataS4 phenotype profiles as a clustered heatmap.
+    
+    Args:
+        protein1_list (List[str]): Primary proteins, offered to slice the pairs by bait
+    """
+    from clustering import (
+        CLUSTERING_METHODS, CLUSTERING_METRICS, MAX_OPTIMAL_ORDERING_PAIRS,
+        ClusteringParams, cluster_profiles, clustering_chart
+    )
+    
+    baits = st.sidebar.multiselect(
+        'Baits',
+        protein1_list,
+        help="Cluster the pairs of these baits (all pairs if empty)"
+    )
+    method = st.sidebar.selectbox('Linkage', CLUSTERING_METHODS)
+    # Ward linkage is only defined for euclidean distances
+    metric = st.sidebar.selectbox('Distance', ['euclidean'] if method == 'ward' else CLUSTERING_METRICS)
+    scales = {'Profile shape (z-score)': 'zscore', 'TopS score': 'none'}
+    scale = st.sidebar.radio('Cluster by', list(scales))
+    optimal_ordering = st.sidebar.checkbox(
+        'Optimal leaf ordering',
+        value=True,
+        help=f"Place similar profiles next to each other (up to {MAX_OPTIMAL_ORDERING_PAIRS} pairs)"
+    )
+    
+    params = ClusteringParams.create(method, metric, scales[scale], optimal_ordering, baits)
+    with st.spinner("Clustering profiles..."):
+        clustering = cluster_profiles(params)
+    if clustering is None:
+        st.warning("⚠️ At least two pairs with a complete DataS4 profile are needed for clustering.")
+        return
+    
+    selection = ', '.join(baits) if baits else 'all baits'
+    st.subheader(f"Phenotype profiles of {len(clustering.bait)} pairs ({selection})")
+    st.caption("Scroll or drag over the heatmap to zoom into rows; hover a cell for its pair and scores.")
+    st.altair_chart(clustering_chart(clustering, PAGE_CONTENT_WIDTH))
+
+
 def figure_page():
     """Display the protein-protein pair analysis page."""
+    from figure_engine import load_quant_data, render_figure
+    from prefetch import foreground, prefetch_neighbors
+    
     st.title('📊 Protein-Protein Pair Analysis')
     st.markdown("---")
     
     # Get protein pairs
-    protein1_list, protein2_dict = get_protein_pairs(DATA_PATHS['boxplot_normalized'])
+    catalog = get_catalog()
+    quant_data = load_quant_data()
+    protein1_list, protein2_dict = _pair_lists(
+        catalog.fingerprint, quant_data.version if quant_data is not None else ()
+    )
     
     if not protein1_list:
-        st.error("❌ No protein pair data found. Please ensure PNG files are present in the data directory.")
+        st.error("❌ No protein pair data found. Please ensure the quant data or PNG files are present in the data directory.")
+        return
+    # Only the pair page needs Matplotlib, so the other pages start without it
+    _warm_up_figures()
+    
+    mode = st.sidebar.radio(
+        'Analysis Mode',
+        ['Single Pair', 'Compare Pairs', 'Cluster Profiles'],
+        help="Inspect one pair, compare many pairs in one figure, or cluster the phenotype profiles of all pairs"
+    )
+    if mode == 'Compare Pairs':
+        st.sidebar.title("🧬 Pair Comparison")
+        comparison_view(protein1_list, protein2_dict)
+        return
+    if mode == 'Cluster Profiles':
+        st.sidebar.title("🧬 Profile Clustering")
+        clustering_view(protein1_list)
         return
     
     # Sidebar controls
     st.sidebar.title("🧬 Protein Selection")
     st.sidebar.markdown("Select protein pairs to analyze their interactions:")
     
-    protein1 = st.sidebar.selectbox(
-        'Primary Protein',
-        protein1_list,
-        help="Select the first protein in the interaction pair"
-    )
-    
-    if protein1 and protein1 in protein2_dict:
-        protein2 = st.sidebar.selectbox(
-            'Secondary Protein',
-            protein2_dict[protein1],
-            help="Select the second protein in the interaction pair"
-        )
+    search_pair = protein_search_sidebar()
+    if search_pair:
+        protein1, protein2 = search_pair
     else:
-        st.error("No secondary proteins available for the selected primary protein.")
-        return
+        protein1 = st.sidebar.selectbox(
+            'Primary Protein',
+            protein1_list,
+            help="Select the first protein in the interaction pair"
+        )
+        
+        if protein1 and protein1 in protein2_dict:
+            protein2 = st.sidebar.selectbox(
+                'Secondary Protein',
+                protein2_dict[protein1],
+                help="Select the second protein in the interaction pair"
+            )
+        else:
+            st.error("No secondary proteins available for the selected primary protein.")
+            return
     
     edge_name = f"{protein1}_{protein2}"
+    with st.sidebar:
+        export_button([edge_name], f"{edge_name}.zip", key='export_pair')
     
     # Display analysis plots
     st.subheader(f"Analysis for {protein1} ↔ {protein2}")
     
-    # Define the analysis types and their paths
+    # Define the analysis types and their figure types
     analysis_paths = [
-        (DATA_PATHS['boxplot_normalized'], 'Abundance for Edge', '📈'),
-        (DATA_PATHS['boxplot_relative'], 'Relative Abundance for Edge', '📊'),
-        (DATA_PATHS['tops_score'], 'TopS Score for Edge', '🎯')
+        ('boxplot_normalized', 'Abundance for Edge', '📈'),
+        ('boxplot_relative', 'Relative Abundance for Edge', '📊'),
+        ('tops_score', 'TopS Score for Edge', '🎯')
     ]
     
     # Create columns for better layout
     cols = st.columns(len(analysis_paths))
+    column_width, render_width = _figure_widths()
     
-    for i, (img_path, caption, icon) in enumerate(analysis_paths):
-        with cols[i]:
-            figure_filename = os.path.join(img_path, f"{edge_name}.png")
-            
-            if os.path.exists(figure_filename):
-                st.image(
-                    figure_filename,
-                    #use_container_width=True,
-                    caption=f"{icon} {caption}: {edge_name}"
-                )
-            else:
-                # Display placeholder or warning
-                if os.path.exists(DATA_PATHS['blank_image']):
-                    st.image(
-                        DATA_PATHS['blank_image'],
+    blank_image_exists = DATA_PATHS['blank_image'] not in catalog.missing_paths
+    
+    # The prefetch worker waits while this pair renders, then renders the
+    # pairs likely to be picked next
+    with foreground(edge_name):
+        for i, (figure_type, caption, icon) in enumerate(analysis_paths):
+            with cols[i]:
+                figure_bytes = render_figure(figure_type, edge_name, render_width)
+                figure_filename = catalog.figure_file(edge_name, figure_type)
+                
+                if figure_bytes:
+                    show_image(
+                        figure_bytes,
+                        caption=f"{icon} {caption}: {edge_name}"
+                    )
+                elif figure_filename:
+                    show_image(
+                        get_figure_variant(figure_filename, column_width),
                         #use_container_width=True,
-                        caption=f"⚠️ No data available for {caption}"
+                        caption=f"{icon} {caption}: {edge_name}"
                     )
                 else:
-                    st.warning(f"⚠️ No data available for {caption}: {edge_name}")
+                    # Display placeholder or warning
+                    if blank_image_exists:
+                        show_image(
+                            DATA_PATHS['blank_image'],
+                            #use_container_width=True,
+                            caption=f"⚠️ No data available for {caption}"
+                        )
+                    else:
+                        st.warning(f"⚠️ No data available for {caption}: {edge_name}")
+    prefetch_neighbors(
+        protein1, protein2, protein2_dict,
+        _prey_baits(catalog.fingerprint, quant_data.version if quant_data is not None else ()),
+        render_width, column_width
+    )
 
 
 def home_page():
@@ -296,7 +673,7 @@ def home_page():
     
     # Display abstract image if available
     if os.path.exists(DATA_PATHS['abstract_image']):
-        st.image(DATA_PATHS['abstract_image'])
+        show_image(get_display_image(DATA_PATHS['abstract_image'], PAGE_CONTENT_WIDTH), kind='image')
     else:
         st.warning("⚠️ Abstract image not found")
     
@@ -388,8 +765,44 @@ def contact_page():
     """, unsafe_allow_html=True)
 
 
+def diagnostics_page():
+    """Display the performance metrics of this app process (hidden page)."""
+    import json
+    from metrics import METRICS_PATH, reset_metrics, snapshot, summary_rows
+    
+    st.title('🩺 Diagnostics')
+    st.markdown("---")
+    
+    data = snapshot()
+    cols = st.columns(3)
+    cols[0].metric("Uptime", f"{(data['time'] - data['started']) / 3600:.1f} h")
+    cols[1].metric("Page runs", sum(h['count'] for h in data['histograms'] if h['name'] == 'page_run'))
+    cols[2].metric("Bytes served", f"{sum(c['value'] for c in data['counters'] if c['name'] == 'bytes_served') / 2**20:.1f} MB")
+    
+    st.subheader("Latency")
+    st.caption("Data loads, directory scans, file reads and rendering, per page (cache misses only)")
+    st.dataframe(summary_rows(data), hide_index=True)
+    
+    st.subheader("Bytes served")
+    st.dataframe([
+        {**counter['labels'], 'KB': round(counter['value'] / 1024, 1)}
+        for counter in data['counters'] if counter['name'] == 'bytes_served'
+    ], hide_index=True)
+    
+    st.caption(f"Also written to `{METRICS_PATH}` every minute; `python api_server.py` serves it at `/api/metrics?source=app`.")
+    cols = st.columns(2)
+    with cols[0]:
+        st.download_button("⬇️ Metrics JSON", json.dumps(data, indent=1), file_name='metrics.json',
+                           mime='application/json', on_click='ignore')
+    with cols[1]:
+        if st.button("Reset metrics"):
+            reset_metrics()
+            st.rerun()
+
+
 def main():
     """Main application function."""
+    run_start = time.perf_counter()
     # Page configuration
     st.set_page_config(
         page_title="Glyco Interactome Network",
@@ -423,22 +836,29 @@ def main():
     st.sidebar.title("🧭 Navigation")
     st.sidebar.markdown("Select a section to explore:")
     
+    pages = ["🏠 Abstract", "🌐 Network", "📊 Protein-Protein Pair", "📧 Contact"]
+    # The diagnostics page is only listed when the URL has ?diagnostics
+    if 'diagnostics' in st.query_params:
+        pages.append("🩺 Diagnostics")
     selection = st.sidebar.radio(
         "Go to",
-        ["🏠 Abstract", "🌐 Network", "📊 Protein-Protein Pair", "📧 Contact"],
+        pages,
         index=0
     )
     
     # Page routing
     try:
-        if selection == "🏠 Abstract":
-            home_page()
-        elif selection == "🌐 Network":
-            network_page()
-        elif selection == "📊 Protein-Protein Pair":
-            figure_page()
-        elif selection == "📧 Contact":
-            contact_page()
+        with page_context(selection):
+            if selection == "🏠 Abstract":
+                home_page()
+            elif selection == "🌐 Network":
+                network_page()
+            elif selection == "📊 Protein-Protein Pair":
+                figure_page()
+            elif selection == "📧 Contact":
+                contact_page()
+            elif selection == "🩺 Diagnostics":
+                diagnostics_page()
     except Exception as e:
         logger.error(f"Error in page rendering: {e}")
         st.error("❌ An error occurred while loading the page. Please try again.")
@@ -447,6 +867,11 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.markdown("**Glyco Interactome Network v1.0**")
     st.sidebar.markdown("*Powered by Streamlit*")
+    
+    report_startup(selection, time.perf_counter() - run_start)
+    # Reads the previous metrics snapshot, so it runs before the first flush
+    _previous_views()
+    flush_metrics()
 
 
 if __name__ == "__main__":
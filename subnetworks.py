@@ -0,0 +1,136 @@
+"""
+On-demand subnetwork rendering.
+
+Renders the part of the interactome selected by proteins, baits and
+phenotype flags (e.g. all prey of CD44 that are ``HM_Up`` or ``S_Down``) as
+a pyvis page, using the same styling and precomputed layout as the
+published networks. Queries are normalized so equivalent selections share
+a cache entry, and rendered pages are kept in a bounded LRU cache tied to
+the interactome version.
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+from config import DATA_PATHS
+from interactome import Interactome, load_interactome
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Number of rendered subnetworks kept in memory (least recently used evicted)
+SUBNETWORK_CACHE_SIZE = 32
+
+# Largest subnetwork rendered as one page; bigger selections are truncated
+MAX_SUBNETWORK_EDGES = 1500
+
+
+@dataclass(frozen=True)
+class SubnetworkQuery:
+    """Normalized subnetwork selection, usable as a cache key."""
+    proteins: Tuple[str, ...] = ()
+    baits: Tuple[str, ...] = ()
+    conditions: Tuple[str, ...] = ()
+    match_all: bool = False
+
+    @classmethod
+    def create(cls, proteins: Iterable[str] = (), baits: Iterable[str] = (),
+               conditions: Iterable[str] = (), match_all: bool = False) -> 'SubnetworkQuery':
+        """Build a query with sorted, de-duplicated filters."""
+        conditions = tuple(sorted(set(conditions)))
+        return cls(
+            proteins=tuple(sorted(set(proteins))),
+            baits=tuple(sorted(set(baits))),
+            conditions=conditions,
+            match_all=match_all and len(conditions) > 1,
+        )
+
+
+@dataclass(frozen=True)
+class Subnetwork:
+    """A rendered subnetwork page."""
+    html: str
+    nodes: int
+    edges: int
+    truncated: bool = False
+
+
+def build_subgraph(interactome: Interactome, edges: Iterable[int]):
+    """
+    Build a NetworkX graph from interactome edge IDs.
+
+    Args:
+        interactome (Interactome): Loaded interactome
+        edges (Iterable[int]): Edge IDs to include
+
+    Returns:
+        networkx.Graph: Graph with ``name`` edge attributes (``Bait_Prey``)
+    """
+    import networkx as nx
+
+    graph = nx.Graph()
+    for bait, prey in interactome.pairs(edges):
+        graph.add_edge(bait, prey, name=f"{bait}_{prey}")
+    return graph
+
+
+def _published_assets() -> str:
+    """Return the asset mode the published network pages were built with."""
+    from build_networks import NETWORK_OPTIONS
+    from data_catalog import get_catalog
+
+    return get_catalog().network_assets or NETWORK_OPTIONS['assets']
+
+
+@lru_cache(maxsize=SUBNETWORK_CACHE_SIZE)
+@timed('render', kind='subnetwork')
+def _render_cached(query: SubnetworkQuery, version: Tuple, assets: str) -> Optional[Subnetwork]:
+    """Render a subnetwork page (cached per interactome version)."""
+    from build_networks import (
+        NETWORK_OPTIONS, _lib_prefix, inline_local_assets, localize_assets, render_graph
+    )
+
+    interactome = load_interactome()
+    if interactome is None or interactome.version != version:
+        raise KeyError(query)
+
+    edges = interactome.select(query.proteins, query.baits,
+                               query.conditions or None, query.match_all)
+    if len(edges) == 0:
+        return None
+    truncated = len(edges) > MAX_SUBNETWORK_EDGES
+    edges = edges[:MAX_SUBNETWORK_EDGES]
+
+    graph = build_subgraph(interactome, edges)
+    baits = [p for p in graph.nodes if interactome.is_bait[interactome.index[p]]]
+    options = dict(NETWORK_OPTIONS, baits=baits, assets=assets)
+    html = render_graph(graph, options)
+    if assets == 'local':
+        # Rendered from a string, so the vendored libraries must be inlined
+        html_dir = DATA_PATHS['network_html']
+        html = inline_local_assets(localize_assets(html, _lib_prefix(html_dir)), html_dir)
+    return Subnetwork(html, graph.number_of_nodes(), graph.number_of_edges(), truncated)
+
+
+def render_subnetwork(query: SubnetworkQuery, assets: Optional[str] = None) -> Optional[Subnetwork]:
+    """
+    Render the subnetwork selected by a query.
+
+    Args:
+        query (SubnetworkQuery): Selection to render
+        assets (str): ``cdn`` or ``local``; defaults to the mode of the
+            published network pages
+
+    Returns:
+        Optional[Subnetwork]: Rendered page, or None if nothing matches
+
+    Raises:
+        KeyError: If the query names an unknown condition
+    """
+    interactome = load_interactome()
+    if interactome is None:
+        return None
+    interactome.condition_mask(query.conditions or None)
+    return _render_cached(query, interactome.version, assets or _published_assets())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Synthetic Interactome Generator for Glyco Interactome Network
+
+Writes DataS3/DataS4-shaped tables and matching GraphML subnetworks for any
+number of baits, prey, phenotypes and replicates, to exercise the app and
+the build scripts at proteome scale:
+
+- baits draw their prey from a shared pool with a skewed popularity, so a
+  few prey are hubs bound by many baits, as in real screens
+- each pair gets a baseline abundance and, in some phenotypes, an effect;
+  replicates add noise around it
+- DataS3 holds the "Normalized by Bait" replicates and the "Relative to HM"
+  values derived from them, with the two-row header of the published table
+- DataS4 and the GraphML subnetworks are produced from DataS3 by
+  ``diff_stats``, so the effect calls are consistent with the tables
+
+The output directory mirrors the repository's data layout (``data/...``,
+``data/graphml/``). Generation is seeded and reproducible.
+
+Usage:
+    python synthetic_data.py [--baits 100] [--prey-per-bait 400] [--prey-pool N]
+                             [--phenotypes HM Neu F S FS] [--replicates 3] [--seed 0] [-o synthetic/]
+"""
+
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import DATA_PATHS, GRAPHML_PATH
+
+# Phenotypes of the published screen; the first one is the reference of
+# the "Relative to HM" values
+DEFAULT_PHENOTYPES = ('HM', 'Neu', 'F', 'S', 'FS')
+
+# Median normalized abundance of a pair, and spread (natural log) across pairs
+BASE_ABUNDANCE = 20000.0
+BASE_SPREAD = 1.0
+
+# Replicate noise (natural log)
+REPLICATE_NOISE = 0.25
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """Size and shape of a synthetic dataset."""
+    baits: int = 4
+    prey_per_bait: int = 39
+    prey_pool: Optional[int] = None  # defaults to half the number of pairs
+    phenotypes: Tuple[str, ...] = DEFAULT_PHENOTYPES
+    replicates: int = 3
+    effect_fraction: float = 0.3     # share of (pair, phenotype) cells with an effect
+    effect_size: float = 1.5         # log2 spread of the effects
+    seed: int = 0
+
+    @property
+    def pool_size(self) -> int:
+        return self.prey_pool or max(self.prey_per_bait, self.baits * self.prey_per_bait // 2)
+
+
+def generate_quant(spec: SyntheticSpec) -> Dict[str, object]:
+    """
+    Generate the DataS3 columns of a synthetic screen.
+
+    Args:
+        spec (SyntheticSpec): Dataset shape
+
+    Returns:
+        Dict[str, object]: Same keys as ``quant_store.parse_quant_table``
+    """
+    if spec.prey_per_bait > spec.pool_size:
+        raise ValueError(f"prey_per_bait ({spec.prey_per_bait}) exceeds the prey pool ({spec.pool_size})")
+    if spec.phenotypes[0] != 'HM':
+        raise ValueError("The first phenotype must be HM, the reference of the relative values")
+
+    rng = np.random.default_rng(spec.seed)
+    baits = [f"BAIT{i + 1}" for i in range(spec.baits)]
+    preys = np.array([f"PREY{i + 1}" for i in range(spec.pool_size)])
+
+    # Zipf-like popularity: low-numbered prey are bound by most baits
+    popularity = 1.0 / np.arange(1, spec.pool_size + 1) ** 0.8
+    popularity /= popularity.sum()
+    chosen = [np.sort(rng.choice(spec.pool_size, spec.prey_per_bait, replace=False, p=popularity))
+              for _ in baits]
+
+    bait = np.repeat(np.array(baits), spec.prey_per_bait)
+    prey = preys[np.concatenate(chosen)]
+    n_pairs, n_phenotypes = len(bait), len(spec.phenotypes)
+
+    base = BASE_ABUNDANCE * np.exp(rng.normal(0.0, BASE_SPREAD, (n_pairs, 1, 1)))
+    effects = np.where(
+        rng.random((n_pairs, n_phenotypes, 1)) < spec.effect_fraction,
+        rng.normal(0.0, spec.effect_size, (n_pairs, n_phenotypes, 1)),
+        0.0,
+    )
+    effects[:, 0] = 0.0
+    noise = rng.normal(0.0, REPLICATE_NOISE, (n_pairs, n_phenotypes, spec.replicates))
+    normalized = np.round(base * 2.0 ** effects * np.exp(noise), 4)
+    relative = np.round(normalized / normalized[:, :1, :] * 100, 2)
+
+    return {
+        'pairs': np.char.add(np.char.add(bait, '_'), prey),
+        'bait': bait,
+        'prey': prey,
+        'bait_id': np.array([f"S{i + 1:05d}" for i in range(spec.baits)]).repeat(spec.prey_per_bait),
+        'prey_id': np.char.add('T', np.char.zfill((np.concatenate(chosen) + 1).astype(str), 5)),
+        'phenotypes': list(spec.phenotypes),
+        'normalized': normalized,
+        'relative': relative,
+    }
+
+
+def write_quant_table(parsed: Dict[str, object], path: str) -> None:
+    """
+    Write DataS3 columns in the published two-row-header layout.
+
+    Args:
+        parsed (Dict[str, object]): Output of ``generate_quant``
+        path (str): Output CSV path
+    """
+    n_pairs, _, n_replicates = parsed['normalized'].shape
+    samples = [f"{phenotype}_{r + 1}" for phenotype in parsed['phenotypes'] for r in range(n_replicates)]
+    id_columns = ['Pair', 'Bait', 'Prey', 'BaitID', 'PreyID']
+    banner = ([f"Total {n_pairs} Interactions"] + [''] * (len(id_columns) - 1)
+              + ['Normalized by Bait (per sample)'] + [''] * (len(samples) - 1)
+              + ['Relative to HM (by Rep.)'] + [''] * (len(samples) - 1))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as quant_file:
+        quant_file.write(','.join(banner) + '\n')
+        quant_file.write(','.join(id_columns + samples + samples) + '\n')
+        ids = zip(parsed['pairs'], parsed['bait'], parsed['prey'], parsed['bait_id'], parsed['prey_id'])
+        normalized = parsed['normalized'].reshape(n_pairs, -1)
+        relative = parsed['relative'].reshape(n_pairs, -1)
+        for row, fields in enumerate(ids):
+            values = [f"{value:g}" for value in normalized[row]] + [f"{value:g}" for value in relative[row]]
+            quant_file.write(','.join(list(fields) + values) + '\n')
+    os.replace(tmp_path, path)
+
+
+def generate_dataset(spec: SyntheticSpec, root: str) -> Dict[str, object]:
+    """
+    Write a synthetic dataset: DataS3, DataS4 and the GraphML subnetworks.
+
+    Args:
+        spec (SyntheticSpec): Dataset shape
+        root (str): Output directory, laid out like the repository's ``data``
+
+    Returns:
+        Dict[str, object]: Output ``paths`` (``quant_data``,
+        ``clustering_data``, ``graphml``), ``pairs``, ``proteins`` and the
+        edge count of every subnetwork (``networks``)
+    """
+    from figure_engine import QuantData
+    from diff_stats import call_effects, calls_frame, compute_stats, write_graphml
+
+    paths = {
+        'quant_data': os.path.join(root, DATA_PATHS['quant_data']),
+        'clustering_data': os.path.join(root, DATA_PATHS['clustering_data']),
+        'graphml': os.path.join(root, GRAPHML_PATH),
+    }
+    os.makedirs(os.path.dirname(paths['quant_data']), exist_ok=True)
+
+    parsed = generate_quant(spec)
+    write_quant_table(parsed, paths['quant_data'])
+
+    data = QuantData(
+        pairs=list(parsed['pairs']),
+        bait=parsed['bait'],
+        prey=parsed['prey'],
+        bait_id=parsed['bait_id'],
+        prey_id=parsed['prey_id'],
+        phenotypes=parsed['phenotypes'],
+        normalized=parsed['normalized'],
+        relative=parsed['relative'],
+        tops=np.full((len(parsed['pairs']), len(parsed['phenotypes'])), np.nan),
+    )
+    stats = compute_stats(data)
+    calls = call_effects(stats)
+    tmp_path = f"{paths['clustering_data']}.tmp"
+    calls_frame(stats, calls).to_csv(tmp_path, index=False, float_format='%.6f', encoding='utf-8-sig')
+    os.replace(tmp_path, paths['clustering_data'])
+    networks = write_graphml(stats, calls, paths['graphml'])
+
+    return {
+        'paths': paths,
+        'pairs': len(data.pairs),
+        'proteins': len(set(data.bait) | set(data.prey)),
+        'networks': networks,
+    }
+
+
+def main() -> int:
+    """Generate a synthetic dataset."""
+    defaults = SyntheticSpec()
+    parser = argparse.ArgumentParser(description="Generate a synthetic interactome for scale testing.")
+    parser.add_argument('--baits', type=int, default=100, help="number of baits")
+    parser.add_argument('--prey-per-bait', type=int, default=400, help="prey bound by every bait")
+    parser.add_argument('--prey-pool', type=int, help="number of distinct prey (default: half the pairs)")
+    parser.add_argument('--phenotypes', nargs='+', default=list(defaults.phenotypes),
+                        help="phenotype names, starting with HM")
+    parser.add_argument('--replicates', type=int, default=defaults.replicates, help="replicates per phenotype")
+    parser.add_argument('--effect-fraction', type=float, default=defaults.effect_fraction,
+                        help="share of pairs and phenotypes with an effect")
+    parser.add_argument('--seed', type=int, default=defaults.seed, help="random seed")
+    parser.add_argument('-o', '--output', default='synthetic', help="output directory")
+    args = parser.parse_args()
+
+    print("🧬 Glyco Interactome Network - Synthetic Data")
+    print("=" * 50)
+
+    spec = SyntheticSpec(
+        baits=args.baits,
+        prey_per_bait=args.prey_per_bait,
+        prey_pool=args.prey_pool,
+        phenotypes=tuple(args.phenotypes),
+        replicates=args.replicates,
+        effect_fraction=args.effect_fraction,
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    try:
+        result = generate_dataset(spec, args.output)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"✅ {result['pairs']} pairs, {result['proteins']} proteins, "
+          f"{len(spec.phenotypes)} phenotypes x {spec.replicates} replicates "
+          f"in {time.perf_counter() - start:.1f} s")
+    for name in ('quant_data', 'clustering_data'):
+        path = result['paths'][name]
+        print(f"   {path}: {os.path.getsize(path) / 1024:.1f} KB")
+    for network, edges in sorted(result['networks'].items()):
+        print(f"   {os.path.join(result['paths']['graphml'], network)}.graphml: {edges} edges")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
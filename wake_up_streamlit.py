@@ -1,41 +1,418 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from streamlit_app import STREAMLIT_APPS
+#!/usr/bin/env python3
+"""
+Uptime Prober for the Streamlit Deployments
+
+Checks every app in ``STREAMLIT_APPS`` concurrently with plain HTTP
+requests (asyncio, standard library only):
+
+- the app page is fetched and searched for the Community Cloud sleep page
+- Streamlit's ``/_stcore/health`` endpoint tells a running app server from
+  a parked one
+- only sleeping apps, and apps whose state is unclear (no sleep page, but
+  no "ok" from the health endpoint either, e.g. behind a proxy or an auth
+  wrapper), are opened in a headless Chrome (Selenium, imported on demand)
+  to press the wake-up button; apps without a button are probed again
+  afterwards
+
+Each run appends one line per app to ``wakeup_log.txt`` with its state and
+response times, and can write the results as JSON. The exit status is 1 if
+an app is down or showed the sleep page and could not be woken; an unclear
+state alone is reported but not counted as a failure.
+
+``--serve-stand-in`` runs a local server imitating an awake (or, with
+``--asleep``, a sleeping) deployment to try the prober without touching the
+real apps.
+
+Usage:
+    python wake_up_streamlit.py [--urls URL ...] [--timeout 30] [--no-browser] [--json results.json]
+    python wake_up_streamlit.py --serve-stand-in 8599 [--asleep]
+"""
+
+import ssl
+import sys
+import json
+import time
+import asyncio
+import argparse
 import datetime
+import urllib.parse
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from config import STREAMLIT_APPS
+
+# Seconds allowed for one HTTP request, redirects included
+PROBE_TIMEOUT = 30.0
+
+# Apps probed at the same time
+MAX_CONCURRENT_PROBES = 20
+
+# Redirects followed per request
+MAX_REDIRECTS = 5
+
+# Response bytes read per request; the sleep page markers are near the top
+MAX_BODY_BYTES = 1 << 20
+
+# Streamlit health endpoint, relative to the app URL; answers "ok" when the
+# app server is running
+HEALTH_PATH = '_stcore/health'
+
+# Text of the Community Cloud page shown instead of a sleeping app
+SLEEP_MARKERS = ('Yes, get this app back up!', 'This app has gone to sleep')
+
+# Wake-up button of the sleep page, and seconds to wait for it in the browser
+WAKE_BUTTON_XPATH = "//button[text()='Yes, get this app back up!']"
+BROWSER_WAIT = 10
+
+LOG_PATH = 'wakeup_log.txt'
+
+USER_AGENT = 'glyco-uptime-probe/1.0'
+
 
-# Set up Selenium webdriver
-options = webdriver.ChromeOptions()
-options.add_argument('--headless')
-driver = webdriver.Chrome(options=options)
+@dataclass(frozen=True)
+class HttpResponse:
+    """Final response of a GET request."""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
 
-# Initialize log file
-with open("wakeup_log.txt", "a") as log_file:
-    log_file.write(f"Execution started at: {datetime.datetime.now()}\n")
 
-    # Iterate through each URL in the list
-    for url in STREAMLIT_APPS:
+@dataclass(frozen=True)
+class ProbeResult:
+    """State of one deployment."""
+    url: str
+    state: str                       # 'up', 'asleep', 'unknown' or 'down'
+    status: Optional[int] = None     # HTTP status of the app page
+    seconds: Optional[float] = None  # app page response time
+    health_seconds: Optional[float] = None
+    detail: str = ''
+    woken: Optional[bool] = None     # set after the browser visit
+
+
+def _decode_chunked(body: bytes) -> bytes:
+    """Decode a chunked transfer-encoded body, keeping what arrived if truncated."""
+    decoded = bytearray()
+    while body:
+        size_line, _, rest = body.partition(b'\r\n')
+        try:
+            size = int(size_line.split(b';')[0], 16)
+        except ValueError:
+            break
+        if size == 0:
+            break
+        decoded += rest[:size]
+        body = rest[size + 2:]
+    return bytes(decoded)
+
+
+async def _get_once(url: str) -> HttpResponse:
+    """Send one GET request and read the response (without following redirects)."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    secure = parts.scheme == 'https'
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, parts.port or (443 if secure else 80),
+        ssl=ssl.create_default_context() if secure else None,
+    )
+    try:
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        writer.write(
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: text/html,*/*\r\n"
+            "Accept-Encoding: identity\r\n"
+            "Connection: close\r\n\r\n".encode('latin-1')
+        )
+        await writer.drain()
+        raw = bytearray()
+        while len(raw) < MAX_BODY_BYTES:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            raw += chunk
+    finally:
+        writer.close()
         try:
-            # Navigate to the webpage
-            driver.get(url)
-            
-            # Wait for the page to load
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    head, _, body = bytes(raw).partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise ValueError(f"Malformed response from {url}")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = _decode_chunked(body)
+    return HttpResponse(url, status, headers, body)
+
+
+async def http_get(url: str) -> HttpResponse:
+    """
+    GET a URL, following redirects.
+
+    Args:
+        url (str): ``http`` or ``https`` URL
+
+    Returns:
+        HttpResponse: Final response; the body is cut at ``MAX_BODY_BYTES``
+
+    Raises:
+        OSError: On connection errors
+        ValueError: On unsupported URLs, malformed responses or too many
+            redirects
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await _get_once(url)
+        if response.status not in (301, 302, 303, 307, 308) or 'location' not in response.headers:
+            return response
+        url = urllib.parse.urljoin(url, response.headers['location'])
+    raise ValueError(f"Too many redirects for {url}")
+
+
+async def probe(url: str, timeout: float = PROBE_TIMEOUT) -> ProbeResult:
+    """
+    Check one deployment.
+
+    Args:
+        url (str): App URL
+        timeout (float): Seconds allowed per request
+
+    Returns:
+        ProbeResult: ``up`` if the health endpoint answers "ok", ``asleep``
+        if the sleep page is shown, ``unknown`` if neither (the health
+        endpoint fails or answers something else), and ``down`` if the page
+        cannot be fetched or returns a server error
+    """
+    start = time.perf_counter()
+    try:
+        page = await asyncio.wait_for(http_get(url), timeout)
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        return ProbeResult(url, 'down', seconds=time.perf_counter() - start,
+                           detail=str(e) or type(e).__name__)
+    seconds = time.perf_counter() - start
+
+    text = page.body.decode('utf-8', 'replace')
+    if any(marker in text for marker in SLEEP_MARKERS):
+        return ProbeResult(url, 'asleep', page.status, seconds, detail='sleep page')
+    if page.status >= 500:
+        return ProbeResult(url, 'down', page.status, seconds, detail=f"HTTP {page.status}")
+
+    base = urllib.parse.urlsplit(page.url)._replace(query='', fragment='').geturl()
+    base = base if base.endswith('/') else base + '/'
+    start = time.perf_counter()
+    try:
+        health = await asyncio.wait_for(http_get(urllib.parse.urljoin(base, HEALTH_PATH)), timeout)
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        return ProbeResult(url, 'unknown', page.status, seconds, time.perf_counter() - start,
+                           detail=f"health check failed: {str(e) or type(e).__name__}")
+    health_seconds = time.perf_counter() - start
+    if health.status == 200 and health.body.strip() == b'ok':
+        return ProbeResult(url, 'up', page.status, seconds, health_seconds)
+    return ProbeResult(url, 'unknown', page.status, seconds, health_seconds,
+                       detail=f"health check returned HTTP {health.status} without \"ok\"")
 
-            # Check if the wake up button exists
+
+async def probe_all(urls: List[str], timeout: float = PROBE_TIMEOUT) -> List[ProbeResult]:
+    """
+    Check deployments concurrently.
+
+    Args:
+        urls (List[str]): App URLs
+        timeout (float): Seconds allowed per request
+
+    Returns:
+        List[ProbeResult]: One result per URL, in order
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+
+    async def limited(url: str) -> ProbeResult:
+        async with semaphore:
+            return await probe(url, timeout)
+
+    return list(await asyncio.gather(*(limited(url) for url in urls)))
+
+
+def wake_with_browser(urls: List[str]) -> Dict[str, Tuple[bool, str]]:
+    """
+    Press the wake-up button of sleeping apps in a headless Chrome.
+
+    Args:
+        urls (List[str]): Sleeping app URLs
+
+    Returns:
+        Dict[str, Tuple[bool, str]]: URL -> (woken, detail)
+    """
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+    except ImportError:
+        return {url: (False, "selenium is not installed") for url in urls}
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    results = {}
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        return {url: (False, f"could not start Chrome: {str(e).strip()}") for url in urls}
+    try:
+        for url in urls:
             try:
-                button = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, "//button[text()='Yes, get this app back up!']"))
+                driver.get(url)
+                button = WebDriverWait(driver, BROWSER_WAIT).until(
+                    EC.element_to_be_clickable((By.XPATH, WAKE_BUTTON_XPATH))
                 )
                 button.click()
-                log_file.write(f"[{datetime.datetime.now()}] Successfully woke up app at: {url}\n")
+                results[url] = (True, "wake-up button pressed")
             except TimeoutException:
-                log_file.write(f"[{datetime.datetime.now()}] Button not found for app at: {url}\n")
-        
-        except Exception as e:
-            log_file.write(f"[{datetime.datetime.now()}] Error for app at {url}: {str(e)}\n")
+                results[url] = (False, "button not found")
+            except Exception as e:
+                results[url] = (False, str(e).strip())
+    finally:
+        driver.quit()
+    return results
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f"{seconds:.2f} s"
+
+
+def log_results(results: List[ProbeResult], path: str = LOG_PATH) -> None:
+    """Append the results of a run to the log file."""
+    now = datetime.datetime.now()
+    with open(path, 'a', encoding='utf-8') as log_file:
+        log_file.write(f"Execution started at: {now}\n")
+        for result in results:
+            line = (f"[{now}] {result.state} at: {result.url} (HTTP {result.status or '-'}, "
+                    f"page {_format_seconds(result.seconds)}, health {_format_seconds(result.health_seconds)})")
+            if result.detail:
+                line += f" {result.detail}"
+            if result.woken is not None:
+                line += " - woken" if result.woken else " - not woken"
+            log_file.write(line + "\n")
+
+
+STAND_IN_APP_PAGE = b"<!DOCTYPE html><html><head><title>Streamlit</title></head><body><div id=\"root\"></div></body></html>"
+
+STAND_IN_SLEEP_PAGE = (
+    b"<!DOCTYPE html><html><head><title>Streamlit</title></head><body>"
+    b"<h3>Zzzz</h3><p>This app has gone to sleep due to inactivity. Would you like to wake it back up?</p>"
+    b"<button>Yes, get this app back up!</button></body></html>"
+)
+
+
+async def serve_stand_in(port: int, asleep: bool = False, host: str = '127.0.0.1') -> None:
+    """
+    Serve a local imitation of a deployment until interrupted.
+
+    The app page is the Streamlit shell (or the sleep page), and the health
+    endpoint answers "ok" only while awake.
+
+    Args:
+        port (int): Port to listen on
+        asleep (bool): Imitate a sleeping app
+        host (str): Interface to bind
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+            path = request.split(b' ', 2)[1].decode('latin-1')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, IndexError):
+            writer.close()
+            return
+        if path.rstrip('/').endswith(HEALTH_PATH):
+            status, body = ('503 Service Unavailable', b'') if asleep else ('200 OK', b'ok')
+            content_type = 'text/plain'
+        else:
+            status, body = '200 OK', STAND_IN_SLEEP_PAGE if asleep else STAND_IN_APP_PAGE
+            content_type = 'text/html; charset=utf-8'
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"🛰️  Stand-in {'sleeping' if asleep else 'awake'} app at http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> int:
+    """Probe the deployments and wake the sleeping ones."""
+    parser = argparse.ArgumentParser(description="Check the Streamlit deployments and wake sleeping apps.")
+    parser.add_argument('--urls', nargs='+', default=STREAMLIT_APPS, help="app URLs to probe")
+    parser.add_argument('--timeout', type=float, default=PROBE_TIMEOUT, help="seconds allowed per request")
+    parser.add_argument('--no-browser', action='store_true', help="only report sleeping apps")
+    parser.add_argument('--log', default=LOG_PATH, help="log file to append to")
+    parser.add_argument('--json', help="write the results as JSON")
+    parser.add_argument('--serve-stand-in', type=int, metavar='PORT',
+                        help="serve a local imitation of a deployment instead of probing")
+    parser.add_argument('--asleep', action='store_true', help="with --serve-stand-in, imitate a sleeping app")
+    args = parser.parse_args()
+
+    if args.serve_stand_in:
+        try:
+            asyncio.run(serve_stand_in(args.serve_stand_in, args.asleep))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    print("🧬 Glyco Interactome Network - Uptime Probe")
+    print("=" * 50)
+    start = time.perf_counter()
+    results = asyncio.run(probe_all(args.urls, args.timeout))
+    probe_seconds = time.perf_counter() - start
+
+    unclear = [result.url for result in results if result.state in ('asleep', 'unknown')]
+    if unclear and not args.no_browser:
+        woken = wake_with_browser(unclear)
+        # The visit may have started an app without a recognisable sleep page
+        recheck = [url for url in unclear if not woken[url][0]]
+        rechecked = {result.url: result for result in asyncio.run(probe_all(recheck, args.timeout))}
+        for url in recheck:
+            if rechecked[url].state == 'up':
+                woken[url] = (True, f"{woken[url][1]}, up after the browser visit")
+        results = [
+            replace(result, woken=woken[result.url][0],
+                    detail=f"{result.detail}; {woken[result.url][1]}".lstrip('; '))
+            if result.url in woken else result
+            for result in results
+        ]
+
+    icons = {'up': '✅', 'asleep': '💤', 'unknown': '❔', 'down': '❌'}
+    for result in results:
+        line = (f"{icons[result.state]} {result.url}: {result.state} "
+                f"(page {_format_seconds(result.seconds)}, health {_format_seconds(result.health_seconds)})")
+        if result.detail:
+            line += f" - {result.detail}"
+        print(line)
+    print(f"⏱️  Probed {len(results)} apps in {probe_seconds:.2f} s")
+
+    log_results(results, args.log)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump([asdict(result) for result in results], json_file, indent=1)
+
+    failed = [
+        result for result in results
+        if result.state == 'down' or (result.state == 'asleep' and not result.woken)
+    ]
+    return 1 if failed else 0
+
 
-# Close the browser
-driver.quit()
+if __name__ == "__main__":
+    sys.exit(main())